@@ -3,8 +3,25 @@ import pandas as pd
 import time
 import re
 import logic
+import analysis
+import broker_pool
+import simulation
+import portfolio_metrics
+import db
+import datetime
 from logger import logger
 
+def _mark_dirty(df, fingerprints=None):
+    """
+    저장 대기 데이터 교체
+    * 배당 지문은 그 지문을 계산한 프레임과 한 쌍으로만 보관 -> 수동 수정으로 프레임이 바뀌면 지문은 버림
+    """
+    st.session_state.df_dirty = df
+    if fingerprints is None:
+        st.session_state.pop('pending_fingerprints', None)
+    else:
+        st.session_state.pending_fingerprints = (df, fingerprints)  # GitHub 저장 후 기록
+
 def render_admin_tools(df_raw, supabase):
     """관리자 전용 패널: 배당금 갱신 및 DB 관리"""
     
@@ -65,7 +82,7 @@ def render_admin_tools(df_raw, supabase):
                             if latest_div:
                                 df_raw.loc[df_raw['종목코드'] == code, '연배당금_크롤링_auto'] = float(latest_div) * 12
                                 st.success("조회값을 저장했습니다.")
-                                st.session_state.df_dirty = df_raw
+                                _mark_dirty(df_raw)
 
             st.divider()
 
@@ -96,14 +113,14 @@ def render_admin_tools(df_raw, supabase):
                 
                 current_price = row.get('현재가', 0)
                 if isinstance(current_price, str): current_price = float(re.sub(r'[^0-9.]', '', current_price) or 0)
-                if not current_price: current_price = logic.get_safe_price(st.session_state.get('broker'), code, category)
+                if not current_price: current_price = logic.get_safe_price(broker_pool.get_broker(), code, category)
                 
                 if current_price and current_price > 0:
                     new_yield = round((new_total / current_price) * 100, 2)
                     df_raw.loc[df_raw['종목코드'] == code, '연배당률'] = new_yield
                     df_raw.loc[df_raw['종목코드'] == code, '연배당률_크롤링'] = new_yield
                     st.success(f"✅ 추가 완료 ({new_total}원 / {new_yield}%)")
-                st.session_state.df_dirty = df_raw
+                _mark_dirty(df_raw)
 
             if col_btn2.button("⚡ 1년치 강제", type="primary", use_container_width=True):
                 new_total = new_div * 12
@@ -113,7 +130,7 @@ def render_admin_tools(df_raw, supabase):
                 
                 current_price = row.get('현재가', 0)
                 if isinstance(current_price, str): current_price = float(re.sub(r'[^0-9.]', '', current_price) or 0)
-                if not current_price: current_price = logic.get_safe_price(st.session_state.get('broker'), code, category)
+                if not current_price: current_price = logic.get_safe_price(broker_pool.get_broker(), code, category)
                 
                 if current_price and current_price > 0:
                     new_yield = round((new_total / current_price) * 100, 2)
@@ -123,7 +140,21 @@ def render_admin_tools(df_raw, supabase):
                     st.success(f"⚡ 적용 완료 ({new_total}원 / {new_yield}%)")
                 else:
                     st.warning("⚠️ 현재가를 가져오지 못해 배당률은 계산되지 않았습니다. (배당금은 저장됨)")
-                st.session_state.df_dirty = df_raw
+                _mark_dirty(df_raw)
+
+        st.markdown("---")
+        st.subheader("📊 시뮬레이션 캐시")
+        memo_stats, memo_size = simulation.get_sim_memo().stats()
+        if memo_stats:
+            for name, (hits, misses) in memo_stats.items():
+                rate = hits / (hits + misses) * 100 if (hits + misses) else 0
+                st.caption(f"**{name}** · 적중 {hits:,} / 미스 {misses:,} ({rate:.1f}%)")
+        else:
+            st.caption("아직 기록이 없습니다.")
+        st.caption(f"저장된 결과: {memo_size}개")
+        if st.button("🧹 캐시 비우기", key="btn_clear_sim_memo", use_container_width=True):
+            simulation.get_sim_memo().clear()
+            st.rerun()
 
         st.markdown("---")
         st.subheader("💾 데이터 저장 및 백업")
@@ -131,6 +162,18 @@ def render_admin_tools(df_raw, supabase):
         csv_data = df_raw.to_csv(index=False).encode('utf-8')
         st.download_button("📂 CSV 백업 다운로드", data=csv_data, file_name=f"stocks_backup.csv", mime='text/csv', use_container_width=True)
 
+        df_dirty = st.session_state.get('df_dirty')
+        if st.button("☁️ 변경 사항 GitHub 저장", key="btn_save_github", disabled=df_dirty is None, use_container_width=True):
+            pending = st.session_state.get('pending_fingerprints')
+            fingerprints = pending[1] if pending and pending[0] is df_dirty else None
+            with st.spinner("저장 중..."):
+                success, msg = logic.save_smart_update(df_dirty, fingerprints)
+            if success:
+                st.session_state.pop('pending_fingerprints', None)
+                st.success(msg)
+            else:
+                st.error(msg)
+
         st.write("") 
         
         # 5. 스마트 업데이트
@@ -143,6 +186,7 @@ def render_admin_tools(df_raw, supabase):
                 options=all_stocks,
                 placeholder="특정 종목만 갱신하려면 선택하세요"
             )
+            incremental = st.checkbox("새 배당 지급이 있는 종목만 갱신 (증분)", value=True, key="chk_incremental_update")
             
             if st.button("🔄 스마트 갱신 시작", key="btn_smart_update", use_container_width=True):
                 targets = selected_targets if selected_targets else None
@@ -152,15 +196,16 @@ def render_admin_tools(df_raw, supabase):
                     my_bar.progress(percent, text=message)
 
                 try:
-                    success, msg, failed_list, new_df = logic.smart_update_and_save(
+                    success, msg, failed_list, new_df, fingerprints = logic.smart_update_and_save(
                         target_names=targets, 
-                        progress_callback=update_progress_ui 
+                        progress_callback=update_progress_ui,
+                        incremental=incremental
                     )
                     my_bar.empty()
 
                     if success:
                         if new_df is not None and not new_df.empty:
-                            st.session_state.df_dirty = new_df
+                            _mark_dirty(new_df, fingerprints)
                         st.success(msg)
                         if failed_list:
                             with st.expander("⚠️ 일부 종목 업데이트 제외 (데이터 없음)"):
@@ -172,6 +217,31 @@ def render_admin_tools(df_raw, supabase):
                     my_bar.empty()
                     st.error(f"실행 중 오류가 발생했습니다: {e}")
 
+def render_portfolio_batch_tools(df, supabase):
+    """관리자 전용: 저장된 포트폴리오 요약(월 배당금/배당률)을 현재 데이터로 일괄 갱신"""
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader("🔁 저장 포트폴리오 재평가")
+        st.caption("모든 사용자의 저장 요약을 현재 시세/배당 기준으로 다시 계산합니다.")
+
+        if st.button("🔄 전체 재평가 및 저장", key="btn_batch_eval", use_container_width=True):
+            with st.spinner("포트폴리오 재평가 중..."):
+                portfolios = db.get_all_portfolios(supabase)
+                if portfolios is None:
+                    st.error("포트폴리오 목록을 불러오지 못했습니다.")
+                    return
+
+                evaluated_at = datetime.datetime.now().isoformat(timespec='seconds')
+                summaries = portfolio_metrics.evaluate_batch(df, portfolios)
+                # 요약만 병합 저장 (읽은 뒤 사용자가 수정한 구성은 덮어쓰지 않음)
+                rows = [{'id': p['id'], 'summary': {**summary, 'evaluated_at': evaluated_at}}
+                        for p, summary in zip(portfolios, summaries)]
+
+                done = db.bulk_update_summaries(supabase, rows)
+                logger.info(f"🔁 포트폴리오 일괄 재평가: {done}/{len(rows)}건 저장")
+                if done == len(rows): st.success(f"✅ {done}건 갱신 완료")
+                else: st.warning(f"⚠️ {len(rows)}건 중 {done}건만 저장되었습니다.")
+
 def render_etf_uploader(supabase):
     """(메인화면) 관리자용 ETF DB 업데이터"""
     st.divider()
@@ -189,6 +259,7 @@ def render_etf_uploader(supabase):
                     
                     supabase.table("etf_holdings").delete().neq("id", 0).execute()
                     supabase.table("etf_holdings").insert(data_to_upload).execute()
+                    analysis.get_holdings_store.clear()  # 구성종목 색인 무효화
                     
                     st.success(f"✅ 업데이트 완료! (총 {len(data_to_upload)}건)")
                     st.balloons()
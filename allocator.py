@@ -0,0 +1,149 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: allocator.py
+설명: AI 로보어드바이저 비중 최적화 (목표 배당률 + 스타일/달러/배당 시기 하드 제약, 후보 조합 여러 개를 한 번에 투영 경사하강)
+"""
+
+import numpy as np
+import constants as C
+
+_TOL = 1e-6  # 제약 판정 허용 오차
+
+# =============================================================================
+# [SECTION 1] 제약 집합 투영
+# =============================================================================
+
+def project_box_simplex(v, lo, hi, total=1.0):
+    """
+    각 행을 {lo <= w <= hi, sum(w) = total} 위로 유클리드 투영 (B x K 배열 일괄)
+    - 해는 w = clip(v - tau, lo, hi) 꼴이고 합계는 tau에 대해 구간별 선형 -> 꺾이는 점 2K개에서 합계를 구해 보간
+    - 고정 비중 칸은 lo = hi, 빈 칸(패딩)은 lo = hi = 0
+    """
+    bp = np.sort(np.concatenate([v - hi, v - lo], axis=1), axis=1)                       # B x 2K (오름차순)
+    sums = np.clip(v[:, None, :] - bp[:, :, None], lo[:, None, :], hi[:, None, :]).sum(axis=2)  # 비증가
+    j = np.clip((sums >= total).sum(axis=1) - 1, 0, bp.shape[1] - 2)[:, None]
+    t0, t1 = np.take_along_axis(bp, j, 1), np.take_along_axis(bp, j + 1, 1)
+    s0, s1 = np.take_along_axis(sums, j, 1), np.take_along_axis(sums, j + 1, 1)
+    frac = np.clip(np.divide(s0 - total, s0 - s1, out=np.zeros_like(s0), where=s0 - s1 > 1e-12), 0.0, 1.0)
+    return np.clip(v - (t0 + frac * (t1 - t0)), lo, hi)
+
+
+def _project_halfspace(w, a, b, free):
+    """a·w >= b 위로 투영 (고정/패딩 칸은 움직이지 않음)"""
+    step = a * free
+    norm = (step * step).sum(axis=1, keepdims=True)
+    short = np.maximum(b - (a * w).sum(axis=1, keepdims=True), 0.0)
+    return w + np.divide(short, norm, out=np.zeros_like(short), where=norm > 0) * step
+
+def project_feasible(v, lo, hi, A, b, free, rounds=None):
+    """
+    {lo <= w <= hi, sum(w) = 1, A·w >= b} 위로 투영 (Dykstra 교대 투영, 제약마다 보정항 1개, 마지막은 항상 박스-심플렉스)
+    - 교집합이 비어 있으면 제약을 만족하지 못한 채 끝남 -> 호출 쪽에서 check_constraints로 걸러냄
+    """
+    M = A.shape[1]
+    x = v
+    incs = [np.zeros_like(v) for _ in range(M + 1)]
+    for _ in range(rounds or C.ALLOC_DYKSTRA_ROUNDS):
+        for m in range(M):
+            y = _project_halfspace(x + incs[m], A[:, m, :], b[:, m:m + 1], free)
+            incs[m], x = x + incs[m] - y, y
+        y = project_box_simplex(x + incs[M], lo, hi)
+        incs[M], x = x + incs[M] - y, y
+    return x
+
+
+# =============================================================================
+# [SECTION 2] 제약 조건 (스타일 하한 / 달러 상한 / 배당 시기 하한 / 종목당 상·하한)
+# =============================================================================
+
+def _bounds(mask, fixed):
+    """
+    종목별 하한/상한 (고정 칸은 lo = hi, 패딩은 0) + 행별 충족 가능 여부
+    * 상한(C.ALLOC_MAX_WEIGHT)은 절대 완화하지 않음 -> 합계 100%를 채울 수 없으면 해당 조합은 불가
+    """
+    is_fixed = mask & ~np.isnan(fixed)
+    free = mask & ~is_fixed
+    fixed_w = np.where(is_fixed, fixed, 0.0)
+    lo = np.where(free, C.ALLOC_MIN_WEIGHT, fixed_w)
+    hi = np.where(free, C.ALLOC_MAX_WEIGHT, fixed_w)
+    ok = ((lo.sum(axis=1) <= 1 + _TOL) & (hi.sum(axis=1) >= 1 - _TOL)
+          & (fixed_w <= C.ALLOC_MAX_WEIGHT + _TOL).all(axis=1) & mask.any(axis=1))
+    return lo, hi, free, ok
+
+def _constraints(mask, style_group, style_min, usd, timing_ok):
+    """제약을 A·w >= b 꼴로 모음 -> (A: B x M x K, b: B x M)"""
+    B, K = mask.shape
+    rows, bounds = [], []
+    if style_group is not None and style_min > 0:
+        rows.append((style_group & mask).astype(float)); bounds.append(style_min)
+    if usd is not None:
+        rows.append(-(usd & mask).astype(float)); bounds.append(-C.ALLOC_USD_MAX)
+    if timing_ok is not None:
+        rows.append((timing_ok & mask).astype(float)); bounds.append(C.ALLOC_TIMING_MIN)
+    if not rows: return np.zeros((B, 0, K)), np.zeros((B, 0))
+    return np.stack(rows, axis=1), np.tile(bounds, (B, 1)).astype(float)
+
+def check_constraints(weights, mask, fixed, style_group=None, style_min=0.0, usd=None, timing_ok=None, tol=_TOL):
+    """행별 제약 충족 여부 (합계 100%, 고정 비중, 종목당 상·하한, 스타일/달러/시기 제약)"""
+    lo, hi, _, ok = _bounds(mask, fixed)
+    A, b = _constraints(mask, style_group, style_min, usd, timing_ok)
+    w = np.where(mask, weights, 0.0)
+    ok &= np.abs(w.sum(axis=1) - 1) <= tol
+    ok &= ((w >= lo - tol) & (w <= hi + tol)).all(axis=1)
+    ok &= ((A * w[:, None, :]).sum(axis=2) >= b - tol).all(axis=1)
+    return ok
+
+
+# =============================================================================
+# [SECTION 3] 비중 최적화 (증강 라그랑지안 + 투영 경사하강)
+# =============================================================================
+
+def allocate_batch(yields, mask, fixed, target, style_group=None, style_min=0.0, usd=None, timing_ok=None):
+    """
+    후보 조합 B개의 비중을 한 번에 계산 (B x K, 조합마다 종목 수가 다르면 mask로 패딩)
+    - yields: 연배당률(%) / fixed: 고정 비중(0~1, 없으면 NaN, 원픽 종목용)
+    - style_group: 스타일 핵심 자산군 여부 (합계 >= style_min)
+    - usd: 달러 자산 여부 (합계 <= C.ALLOC_USD_MAX) / timing_ok: 선택한 배당 시기 여부 (합계 >= C.ALLOC_TIMING_MIN)
+    목적함수: (포트폴리오 배당률/목표 - 1)^2 + 균등 분산 선호
+    제약은 모두 하드 제약: 증강 라그랑지안으로 풀고 마지막에 제약 집합 위로 투영해 검증
+    Returns: (비중 B x K, 목적함수 값 B (제약을 만족할 수 없는 조합은 inf), 포트폴리오 배당률 B)
+    """
+    lo, hi, free, ok = _bounds(mask, fixed)
+    A, b = _constraints(mask, style_group, style_min, usd, timing_ok)
+    y = np.where(mask, yields, 0.0) / max(target, 1e-6)
+
+    # 시작점: 자유 칸에 남은 비중 균등 배분 (상·하한 안쪽으로 투영)
+    remain = 1.0 - np.where(free, 0.0, lo).sum(axis=1, keepdims=True)
+    n_free = np.maximum(free.sum(axis=1, keepdims=True), 1)
+    uniform = np.where(free, remain / n_free, lo)
+    w = project_box_simplex(uniform, lo, hi)
+
+    mu, rho = C.ALLOC_PENALTY, C.ALLOC_SPREAD
+    lam = np.zeros_like(b)
+    sq = lambda a: (a * a).sum(axis=-1)
+    step = 1.0 / (2 * (sq(y) + rho) + mu * sq(A).sum(axis=1))[:, None]
+    inner = max(C.ALLOC_ITERS // C.ALLOC_OUTER, 1)
+
+    for _ in range(C.ALLOC_OUTER):
+        for _ in range(inner):
+            gap_y = (y * w).sum(axis=1, keepdims=True) - 1.0
+            short = b - (A * w[:, None, :]).sum(axis=2)                       # > 0 이면 위반
+            mult = np.maximum(lam + mu * short, 0.0)
+            grad = 2 * gap_y * y + 2 * rho * (w - uniform) - (mult[:, :, None] * A).sum(axis=1)
+            w = project_box_simplex(w - step * grad, lo, hi)
+        lam = np.maximum(lam + mu * (b - (A * w[:, None, :]).sum(axis=2)), 0.0)
+
+    w = project_feasible(w, lo, hi, A, b, free)
+    ok &= check_constraints(w, mask, fixed, style_group, style_min, usd, timing_ok, tol=1e-4)
+
+    objective = ((y * w).sum(axis=1) - 1.0) ** 2 + rho * sq(w - uniform)
+    return w, np.where(ok, objective, np.inf), (np.where(mask, yields, 0.0) * w).sum(axis=1)
+
+def to_percent(weights):
+    """비중(0~1) -> 정수 %, 합계 100 유지 (최대 잔여 방식)"""
+    raw = np.asarray(weights, dtype=float) * 100
+    pct = np.floor(raw + 1e-9).astype(int)
+    short = 100 - pct.sum()
+    if short > 0:
+        pct[np.argsort(-(raw - pct))[:short]] += 1
+    return pct.tolist()
@@ -1,43 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
 import db  # DB 연결 도구
 import constants as C  # 상수 파일
+import classifier  # 종목명 키워드 분류기
 
 # ---------------------------------------------------------
 # 1. [순수 로직] 데이터 계산 및 정제 (UI 코드 없음)
 # ---------------------------------------------------------
 def _get_clean_data(row, col_map):
     """(내부 함수) 행별 데이터 정제 및 섹터 분류"""
-    raw_name = row.get(col_map['stock_name'], '') 
-    name = str(raw_name).upper().strip()
-    
-    # [1] 제외 키워드 체크
-    if any(x in name for x in C.EXCLUDE_KEYWORDS): 
-        if not any(safe in name for safe in C.SECTOR_KEYWORDS['Cash']):
-            return None, None, None
-
-    # [2] 이름 정규화
-    clean_name = name
-    for standard_name, keywords in C.STOCK_NAME_MAPPING.items():
-        if any(k in name for k in keywords):
-            clean_name = standard_name
-            break
-
-    sector = str(row.get(col_map['category'], '기타'))
-    
-    # [3] 섹터 분류
-    if any(k in clean_name for k in C.SECTOR_KEYWORDS['HighYield']) or '고수익' in sector:
-        sector = "🔥 하이일드"
-    elif any(k in clean_name for k in C.SECTOR_KEYWORDS['Cash']):
-        sector = "🛡️ 현금"
-    elif any(k in clean_name for k in C.SECTOR_KEYWORDS['Bond_Long']): 
-        sector = "📉 국채"
-    elif clean_name in C.SECTOR_KEYWORDS['BigTech']: sector = "💻 빅테크"
-    elif '금융' in sector or '은행' in clean_name or '지주' in clean_name: sector = "💰 금융"
-    elif '리츠' in sector or '부동산' in clean_name or '인프라' in clean_name: sector = "🏢 리츠"
-    elif '산업재' in sector or '자동차' in clean_name: sector = "🚗 산업재"
-    elif '필수소비재' in sector: sector = "🛒 소비재"
+    clean_name, sector = classifier.classify_holding(row.get(col_map['stock_name'], ''), row.get(col_map['category'], '기타'))
+    if not clean_name: return None, None, None
 
     try: 
         w_val = row.get(col_map['weight'], 0)
@@ -47,94 +22,198 @@ def _get_clean_data(row, col_map):
     
     return clean_name, sector, weight
 
-def calculate_portfolio_exposure(user_weights):
+def _build_col_map(cols):
+    """DB 컬럼명 표기 차이 흡수 (한글/영문)"""
+    return {
+        'etf_name': next((c for c in cols if c in ['ETF명', 'etf명', 'etf_name']), 'ETF명'),
+        'etf_code': next((c for c in cols if c in ['ETF코드', 'etf코드', 'etf_code']), 'ETF코드'),
+        'stock_name': next((c for c in cols if c in ['보유종목명', '보유종목', 'stock_name']), '보유종목명'),
+        'weight': next((c for c in cols if c in ['비중', 'weight']), '비중'),
+        'category': next((c for c in cols if c in ['분류', 'category']), '분류'),
+    }
+
+def _normalize_key(x):
+    return str(x).replace(' ', '').upper()
+
+class HoldingsStore:
     """
-    [핵심 로직] 사용자 포트폴리오 비중을 받아 실제 구성 종목(Exposure)을 계산
-    Returns: (성공여부, 메시지/데이터, 실패한ETF리스트)
+    ETF 구성종목 색인 (1회 로드 후 재사용)
+    - 정규화된 ETF명/코드 -> ETF명 사전 조회
+    - 부분 일치 검색용 2글자(bigram) 색인
+    - ETF x 구성종목 희소 비중 행렬 (COO: 행=ETF, 열=종목, 값=보정비중)
+      -> 포트폴리오 노출도 = ETF 비중 벡터 x 행렬 (여러 포트폴리오 동시 계산 가능)
     """
-    if not user_weights:
-        return False, "입력된 비중이 없습니다.", []
-
-    total_input = sum(user_weights.values())
-    if total_input == 0: 
-        return False, "총 투자금이 0입니다.", []
-        
-    normalized_weights = {k: (v / total_input) * 100 for k, v in user_weights.items()}
 
-    # 1. DB 연결 및 데이터 가져오기
+    def __init__(self, df_raw, col_map):
+        etf_col = col_map['etf_name']
+        key_names = df_raw[etf_col].astype(str).str.replace(' ', '').str.upper()
+        key_codes = df_raw[col_map['etf_code']].astype(str).str.replace(' ', '').str.upper()
+        weights = pd.to_numeric(df_raw[col_map['weight']], errors='coerce').fillna(0)
+
+        # 1. 사전 색인 (같은 키가 여러 번 나오면 첫 행 기준)
+        self._by_name, self._by_code = {}, {}
+        for key_name, key_code, etf in zip(key_names, key_codes, df_raw[etf_col]):
+            self._by_name.setdefault(key_name, etf)
+            self._by_code.setdefault(key_code, etf)
+
+        # 2. 부분 일치 색인: bigram -> 키 순번 집합 (키 순번 = 첫 등장 순서)
+        self._keys = list(self._by_name)
+        self._grams = {}
+        for i, key in enumerate(self._keys):
+            for g in {key[j:j + 2] for j in range(len(key) - 1)}:
+                self._grams.setdefault(g, set()).add(i)
+        self._fuzzy_memo = {}
+
+        # 3. 희소 비중 행렬 (정제/섹터 분류/비중 보정은 로드 시 1회)
+        scale = {etf: (100.0 / s if s > 0 else 0) for etf, s in weights.groupby(df_raw[etf_col]).sum().items()}
+        self.etf_names = list(scale)
+        etf_pos = {etf: i for i, etf in enumerate(self.etf_names)}
+        self._etf_pos = etf_pos
+
+        stock_pos, names, sectors = {}, [], []
+        rows, cols, vals = [], [], []
+        for etf, row in zip(df_raw[etf_col], df_raw.to_dict('records')):
+            if etf not in etf_pos: continue
+            c_name, sector, w = _get_clean_data(row, col_map)
+            if not c_name: continue
+            if c_name not in stock_pos:
+                stock_pos[c_name] = len(names)
+                names.append(c_name)
+                sectors.append(sector)
+            rows.append(etf_pos[etf])
+            cols.append(stock_pos[c_name])
+            vals.append(w * scale[etf] / 100)
+
+        self.stock_names = np.array(names, dtype=object)
+        self.stock_sectors = np.array(sectors, dtype=object)
+        self._rows = np.array(rows, dtype=np.int64)
+        self._cols = np.array(cols, dtype=np.int64)
+        self._vals = np.array(vals, dtype=float)
+
+    def _find_fuzzy(self, search_key):
+        if search_key not in self._fuzzy_memo:
+            grams = [search_key[j:j + 2] for j in range(len(search_key) - 1)]
+            candidates = set.intersection(*(self._grams.get(g, set()) for g in grams)) if grams else range(len(self._keys))
+            hit = next((self._keys[i] for i in sorted(candidates) if search_key in self._keys[i]), None)
+            self._fuzzy_memo[search_key] = self._by_name[hit] if hit is not None else None
+        return self._fuzzy_memo[search_key]
+
+    def find_etf(self, etf_input):
+        """사용자 입력 ETF명 -> DB상의 ETF명 (별명 -> 이름 -> 코드 -> 부분 일치 순, 없으면 None)"""
+        search_key = _normalize_key(C.ETF_ALIAS_MAP.get(etf_input, etf_input))
+        if search_key in self._by_name: return self._by_name[search_key]
+        if search_key in self._by_code: return self._by_code[search_key]
+        return self._find_fuzzy(search_key)
+
+    def weight_vector(self, user_weights):
+        """
+        {ETF명: 비중} -> ETF 비중 벡터 (행렬의 행 순서)
+        Returns: (벡터, 찾지 못한 ETF 리스트)
+        """
+        x = np.zeros(len(self.etf_names))
+        failed = []
+        for etf_input, u_w in user_weights.items():
+            if u_w <= 0: continue
+            matched = self.find_etf(etf_input)
+            if matched is None or matched not in self._etf_pos:
+                if matched is None: failed.append(etf_input)
+                continue
+            x[self._etf_pos[matched]] += u_w
+        return x, failed
+
+    def exposure(self, X):
+        """
+        희소 행렬 곱: ETF 비중 (E,) 또는 (P, E) -> 종목별 노출 (S,) 또는 (P, S)
+        * 여러 포트폴리오는 (포트폴리오, 종목) 평탄화 인덱스로 bincount 1회에 계산
+        """
+        X = np.asarray(X, dtype=float)
+        n_stocks = len(self.stock_names)
+        if X.ndim == 1:
+            return np.bincount(self._cols, weights=X[self._rows] * self._vals, minlength=n_stocks)
+
+        flat = (np.arange(len(X))[:, None] * n_stocks + self._cols).ravel()
+        contrib = (X[:, self._rows] * self._vals).ravel()
+        return np.bincount(flat, weights=contrib, minlength=len(X) * n_stocks).reshape(len(X), n_stocks)
+
+    def touched(self, x):
+        """비중이 있는 ETF에 한 번이라도 포함된 종목 마스크 (비중 0 종목 포함)"""
+        return np.bincount(self._cols, weights=(x[self._rows] > 0).astype(float), minlength=len(self.stock_names)) > 0
+
+
+@st.cache_resource(ttl=C.HOLDINGS_CACHE_TTL, show_spinner=False)
+def get_holdings_store():
+    """
+    etf_holdings 테이블 전체를 1회 로드하여 색인 생성 (모든 세션 공유)
+    * 관리자 업로드(render_etf_uploader) 시 get_holdings_store.clear()로 무효화
+    * 실패는 캐시하지 않도록 ValueError로 전달
+    """
     supabase = db.init_supabase()
-    if not supabase:
-        return False, "DB 연결 실패", []
+    if not supabase: raise ValueError("DB 연결 실패")
 
     try:
         response = supabase.table("etf_holdings").select("*").execute()
-        if not response.data:
-            return False, "DB 데이터 없음 (etf_holdings)", []
-        df_raw = pd.DataFrame(response.data)
     except Exception as e:
-        return False, f"데이터 로드 오류: {e}", []
-
-    # 2. 컬럼 매핑
-    cols = df_raw.columns.tolist()
-    col_map = {
-        'etf_name': next((c for c in cols if c in ['ETF명', 'etf명', 'etf_name']), 'ETF명'),
-        'etf_code': next((c for c in cols if c in ['ETF코드', 'etf코드', 'etf_code']), 'ETF코드'),
-        'stock_name': next((c for c in cols if c in ['보유종목명', '보유종목', 'stock_name']), '보유종목명'),
-        'weight': next((c for c in cols if c in ['비중', 'weight']), '비중'),
-        'category': next((c for c in cols if c in ['분류', 'category']), '분류'),
-    }
+        raise ValueError(f"데이터 로드 오류: {e}")
+    if not response.data: raise ValueError("DB 데이터 없음 (etf_holdings)")
 
+    df_raw = pd.DataFrame(response.data)
     try:
-        df_raw['KEY_NAME'] = df_raw[col_map['etf_name']].astype(str).str.replace(' ', '').str.upper()
-        df_raw['KEY_CODE'] = df_raw[col_map['etf_code']].astype(str).str.replace(' ', '').str.upper()
-        df_raw['비중_수치'] = pd.to_numeric(df_raw[col_map['weight']], errors='coerce').fillna(0)
+        return HoldingsStore(df_raw, _build_col_map(df_raw.columns.tolist()))
     except KeyError:
-        return False, "DB 컬럼 형식 오류", []
+        raise ValueError("DB 컬럼 형식 오류")
 
-    # 3. 데이터 가공 (Look-through)
-    etf_sums = df_raw.groupby(col_map['etf_name'])['비중_수치'].sum()
-    scale_correction_map = {etf: (100.0 / s if s > 0 else 0) for etf, s in etf_sums.items()}
-
-    exposure = {}
-    failed_etfs = [] 
+def calculate_portfolio_exposure(user_weights):
+    """
+    [핵심 로직] 사용자 포트폴리오 비중을 받아 실제 구성 종목(Exposure)을 계산
+    Returns: (성공여부, 메시지/데이터, 실패한ETF리스트)
+    """
+    if not user_weights:
+        return False, "입력된 비중이 없습니다.", []
 
-    for etf_input, u_w in normalized_weights.items():
-        if u_w <= 0: continue
-        
-        target_name = C.ETF_ALIAS_MAP.get(etf_input, etf_input)
-        search_key = str(target_name).replace(' ', '').upper()
-        
-        items = df_raw[df_raw['KEY_NAME'] == search_key]
-        if items.empty: items = df_raw[df_raw['KEY_CODE'] == search_key]
-        if items.empty: items = df_raw[df_raw['KEY_NAME'].str.contains(search_key, na=False)]
-        
-        if items.empty:
-            failed_etfs.append(etf_input)
-            continue
+    total_input = sum(user_weights.values())
+    if total_input == 0: 
+        return False, "총 투자금이 0입니다.", []
         
-        matched_etf_name = items.iloc[0][col_map['etf_name']]
-        target_items = df_raw[df_raw[col_map['etf_name']] == matched_etf_name]
-        correction_factor = scale_correction_map.get(matched_etf_name, 1.0)
-
-        for _, row in target_items.iterrows():
-            c_name, sector, w = _get_clean_data(row, col_map)
-            if not c_name: continue
-            
-            real_w = (w * correction_factor / 100) * u_w 
-            if c_name not in exposure: exposure[c_name] = {'w': 0, 's': sector}
-            exposure[c_name]['w'] += real_w
+    normalized_weights = {k: (v / total_input) * 100 for k, v in user_weights.items()}
 
-    if not exposure: 
+    # 1. 색인된 구성종목 데이터 (캐시)
+    try:
+        store = get_holdings_store()
+    except ValueError as e:
+        return False, str(e), []
+
+    # 2. 데이터 가공 (Look-through: 희소 행렬 곱 1회)
+    x, failed_etfs = store.weight_vector(normalized_weights)
+    mask = store.touched(x)
+    if not mask.any(): 
         return False, "분석할 보유 데이터가 없습니다.", failed_etfs
 
-    # 4. 결과 DataFrame 생성
-    df_exp = pd.DataFrame([{'종목': k, '비중': v['w'], '섹터': v['s']} for k, v in exposure.items()]).sort_values('비중', ascending=False)
+    # 3. 결과 DataFrame 생성
+    df_exp = pd.DataFrame({
+        '종목': store.stock_names[mask],
+        '비중': store.exposure(x)[mask],
+        '섹터': store.stock_sectors[mask]
+    }).sort_values('비중', ascending=False)
     
     total_exposure = df_exp['비중'].sum()
     if total_exposure > 0: df_exp['비중'] = (df_exp['비중'] / total_exposure) * 100
 
     return True, df_exp, failed_etfs
 
+def calculate_exposure_batch(weight_list):
+    """
+    [배치] 여러 포트폴리오의 노출도를 한 번에 계산 (예: 저장된 포트폴리오 전체 야간 집계)
+    - weight_list: [{ETF명: 비중}, ...]
+    Returns: DataFrame (행=포트폴리오 순번, 열=종목, 값=노출 비중 %), 종목별 섹터 Series
+    """
+    store = get_holdings_store()
+    X = np.vstack([store.weight_vector(w)[0] for w in weight_list]) if weight_list else np.zeros((0, len(store.etf_names)))
+
+    exp = store.exposure(X)
+    totals = exp.sum(axis=1, keepdims=True)
+    exp = np.divide(exp * 100, totals, out=np.zeros_like(exp), where=totals > 0)
+
+    return pd.DataFrame(exp, columns=store.stock_names), pd.Series(store.stock_sectors, index=store.stock_names)
 
 # ---------------------------------------------------------
 # 2. [UI] 화면 렌더링 (로직 함수 호출하여 그리기만 함)
@@ -9,6 +9,7 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import hashlib
+import functools
 import time
 import random
 from streamlit.runtime.scriptrunner import get_script_run_ctx
@@ -28,6 +29,9 @@ import timeline
 import analysis  # 👈 [추가] 자산 분석 모듈 (X-Ray)
 import constants as C
 import simulation
+import dividend_calendar
+import universe
+import portfolio_metrics
 import admin_ui
 # =============================================================================
 # [SECTION 1] 기본 설정 및 초기화
@@ -274,6 +278,7 @@ def render_calculator_page(df):
         recommendation.show_wizard()
     
     all_data = []
+    uni = universe.get_index(df)  # 종목명 -> 행 위치 (반복 필터링 대신 O(1) 조회)
     
     with st.expander("🧮 나만의 배당 포트폴리오 시뮬레이션", expanded=True):
         # 1. 레이아웃 (좌측 총액 / 우측 종목선택)
@@ -385,7 +390,7 @@ def render_calculator_page(df):
 
         # 개별 종목 입력 루프
         if selected:
-            has_foreign_stock = any(df[df['pure_name'] == s_name].iloc[0]['분류'] == '해외' for s_name in selected)
+            has_foreign_stock = any(uni.foreign(s_name) for s_name in selected)
             if has_foreign_stock:
                 st.warning("📢 **잠깐!** 선택하신 종목 중 '해외 상장 ETF'가 포함되어 있습니다. ISA/연금계좌 결과는 참고용으로만 봐주세요.")
 
@@ -410,10 +415,9 @@ def render_calculator_page(df):
                     
                     # 비중 & 배당일 정보 표시
                     current_weight = (val / current_total_view * 100)
-                    stock_match = df[df['pure_name'] == stock]
+                    s_row = uni.row(stock)
                     
-                    if not stock_match.empty:
-                        s_row = stock_match.iloc[0]
+                    if s_row is not None:
                         ex_date_view = s_row.get('배당락일', '-')
                         
                         info_text = f"**종목 비중 {current_weight:.1f}%**"
@@ -422,7 +426,7 @@ def render_calculator_page(df):
                             date_msg = f" | 📅 {ex_date_view}"
                             
                             if len(selected) == 1:
-                                cal_url = logic.get_google_cal_url(stock, ex_date_view)
+                                cal_url = logic.get_google_cal_url(stock, ex_date_view, s_row.get('분류', '국내'))
                                 if cal_url:
                                     st.caption(f"{info_text}{date_msg}")
                                     
@@ -455,9 +459,8 @@ def render_calculator_page(df):
                 for s in selected: weights[s] = 0
 
             for stock in selected:
-                stock_match = df[df['pure_name'] == stock]
-                if not stock_match.empty:
-                    s_row = stock_match.iloc[0]
+                s_row = uni.row(stock)
+                if s_row is not None:
                     w = weights.get(stock, 0)
                     amt = total_invest * (w / 100)
                     all_data.append({
@@ -465,7 +468,9 @@ def render_calculator_page(df):
                         '종목명': stock, '코드': s_row.get('코드', ''), '분류': s_row.get('분류', '국내'),
                         '연배당률': s_row.get('연배당률', 0), '금융링크': s_row.get('금융링크', '#'),
                         '신규상장개월수': s_row.get('신규상장개월수', 0), '현재가': s_row.get('현재가', 0),
-                        '환구분': s_row.get('환구분', '-'), '배당락일': s_row.get('배당락일', '-')
+                        '환구분': s_row.get('환구분', '-'), '배당락일': s_row.get('배당락일', '-'),
+                        '배당기록': s_row.get('배당기록', ''),
+                        '배당시기': s_row.get('배당시기', 'unknown'), '배당락일목록': s_row.get('배당락일목록', ())
                     })
             
             # 사이드바 로드맵
@@ -481,9 +486,10 @@ def render_calculator_page(df):
                 """, unsafe_allow_html=True)
 
             # 결과 요약 (월 배당금)
-            total_y_div = sum([(total_invest * (weights[n]/100) * (df[df['pure_name']==n].iloc[0]['연배당률']/100)) for n in selected])
-            total_m = total_y_div / 12
-            avg_y = sum([(df[df['pure_name']==n].iloc[0]['연배당률'] * (weights[n]/100)) for n in selected])
+            metrics = portfolio_metrics.portfolio_metrics(df, weights, total_invest, st.session_state.get('monthly_expense', 200))
+            total_y_div = metrics.total_y_gross
+            total_m = metrics.total_m_gross
+            avg_y = metrics.avg_yield
 
             st.markdown("### 🎯 포트폴리오 결과")
             st.metric("📈 가중 평균 연배당률", f"{avg_y:.2f}%")
@@ -509,8 +515,7 @@ def render_calculator_page(df):
 
             st.divider()
             
-            # ICS 파일 생성 및 다운로드
-            ics_data = logic.generate_portfolio_ics(all_data)
+            # ICS 파일 다운로드 (파일 내용은 버튼을 누를 때만 생성)
             st.subheader("📅 배당 일정 등록")
             col_d1, col_d2 = st.columns([1.5, 1])
             with col_d1:
@@ -518,6 +523,8 @@ def render_calculator_page(df):
                 st.caption("아래 버튼으로 **모든 종목의 알림**을 한 번에 내 폰/PC 캘린더에 넣으세요.")
             with col_d2:
                 if st.session_state.get("is_logged_in", False):
+                    ics_period = st.selectbox("일정 기간", list(C.ICS_HORIZON_YEARS), key="ics_horizon", label_visibility="collapsed")
+                    ics_data = functools.partial(logic.generate_portfolio_ics, all_data, C.ICS_HORIZON_YEARS[ics_period])
                     st.download_button(label="📥 전체 일정 파일 받기 (.ics)", data=ics_data, file_name="dividend_calendar.ics", mime="text/calendar", use_container_width=True, type="primary")
                 else:
                     if st.button("📥 전체 일정 파일 받기 (.ics)", key="ics_lock_btn", use_container_width=True):
@@ -652,7 +659,7 @@ def render_calculator_page(df):
         # 2. 10년 뒤 자산 시뮬레이션
         elif selected_tab == "💰 10년 뒤 자산 미리보기":
             # [수정] 복잡한 시뮬레이션 UI와 로직은 simulation.py로 이사 갔습니다!
-            simulation.render_10y_sim_page(total_invest, avg_y, saved_monthly)        
+            simulation.render_10y_sim_page(total_invest, avg_y, saved_monthly, df_ana)        
     
 
        
@@ -719,23 +726,10 @@ def render_stocklist_page(df):
     if not df.empty:
         search_options = df.apply(lambda x: f"{x['종목명']} ({x['코드']})", axis=1).tolist()
         
-        # 배당 시기 자동 분류
-        def classify_timing(text):
-            import re
-            t = str(text).strip()
-            if any(k in t for k in ['월초', '초순', '1~']): return "🟢 월초 (1~10일)"
-            if any(k in t for k in ['월말', '마지막', '말일', '하순']): return "🔴 월말 (21~31일)"
-            
-            match = re.search(r'(\d+)', t)
-            if match:
-                day = int(match.group(1))
-                if 1 <= day <= 10: return "🟢 월초 (1~10일)"
-                if 11 <= day <= 20: return "🟡 월중 (11~20일)"
-                if 21 <= day <= 31: return "🔴 월말 (21~31일)"
-                
-            return "⚪ 기타/미정"
-            
-        df['배당시기_temp'] = df['배당락일'].apply(classify_timing)
+        # 배당 시기 자동 분류 (로드 시 계산된 배당시기 컬럼 사용)
+        timing_labels = {'early': "🟢 월초 (1~10일)", 'mid': "🟡 월중 (11~20일)", 'end': "🔴 월말 (21~31일)"}
+        timing = df['배당시기'].astype(str) if '배당시기' in df.columns else df['배당락일'].map(dividend_calendar.lookup_timing)
+        df = df.assign(배당시기_temp=timing.map(timing_labels).fillna("⚪ 기타/미정"))  # 공유 가공 데이터는 수정하지 않음
     else:
         search_options = []
 
@@ -878,18 +872,21 @@ def main():
 
     # 4. 데이터 로드 및 처리
     df_raw = logic.load_stock_data_from_csv()
+    df_snapshot = pd.DataFrame()
     if df_raw.empty: 
-        logger.error("❌ 데이터 로드 실패: CSV 파일이 비어있음")
-        st.stop()
+        df_snapshot = logic.load_snapshot_data()  # CSV를 못 읽으면 마지막 스냅샷으로 표시
+        if df_snapshot.empty:
+            logger.error("❌ 데이터 로드 실패: CSV 파일이 비어있음")
+            st.stop()
 
-    if is_admin:
+    if is_admin and not df_raw.empty:
         admin_ui.render_admin_tools(df_raw, supabase)  # 👈 새 파일(admin_ui)에 있는 함수 호출!
         admin_ui.render_etf_uploader(supabase) # [추가] ETF 업로더도 같이!
         
        
     
     with st.spinner('⚙️ 배당 데이터베이스 엔진 가동 중...'):
-        df_calculated = logic.load_and_process_data(df_raw, is_admin=is_admin)
+        df_calculated = logic.load_and_process_data(df_raw, is_admin=is_admin) if not df_raw.empty else df_snapshot
         st.session_state['shared_df'] = df_calculated 
         
         # 크롤링된 Auto 데이터 동기화
@@ -906,6 +903,9 @@ def main():
 
         df = df_calculated
 
+    if is_admin:
+        admin_ui.render_portfolio_batch_tools(df, supabase)
+
     # 5. 사이드바 및 페이지 라우팅
     with st.sidebar:
         if not st.session_state.is_logged_in: st.markdown("---")
@@ -936,6 +936,8 @@ def main():
                     resp = supabase.table("portfolios").select("*").eq("user_id", uid).order("created_at", desc=True).execute()
                     if resp.data:
                         opts = {f"{p.get('name') or '이름없음'} ({p['created_at'][5:10]} {p['created_at'][11:16]})": p for p in resp.data}
+                        # 현재 시세 기준 요약 (목록 전체를 한 번에 재평가)
+                        live = dict(zip(opts.keys(), portfolio_metrics.evaluate_batch(df, list(opts.values()))))  # opts 기준으로 평가 (같은 이름/시각 항목이 합쳐져도 어긋나지 않음)
                         
                         is_delete_mode = st.toggle("🗑️ 포트폴리오 정리(삭제) 모드")
 
@@ -956,6 +958,8 @@ def main():
 
                         else:
                             sel_name = st.selectbox("항목 선택", list(opts.keys()), label_visibility="collapsed")
+                            now_summary = live[sel_name]
+                            st.caption(f"📊 현재 기준 월 {now_summary['monthly']:,.0f}원 · 연 {now_summary['yield']:.2f}%")
                             
                             if st.button("📂 불러오기", use_container_width=True):
                                 data = opts[sel_name]['ticker_data']
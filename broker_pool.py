@@ -0,0 +1,101 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: broker_pool.py
+설명: 프로세스 공용 한투(KIS) API 클라이언트 (토큰 재사용/사전 갱신, 동시 요청 제한, 초당 호출 제한)
+"""
+
+import threading
+import time
+import pickle
+import mojito
+import streamlit as st
+from logger import logger
+import constants as C
+
+# =============================================================================
+# [SECTION 1] 초당 호출 제한기
+# =============================================================================
+
+class RateLimiter:
+    """최소 호출 간격을 보장하는 스레드 안전 제한기 (초당 N건)"""
+
+    def __init__(self, rate_per_sec):
+        self._interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0: time.sleep(wait)
+
+
+# =============================================================================
+# [SECTION 2] 브로커 풀
+# =============================================================================
+
+def _read_token_expiry():
+    """mojito가 저장한 token.dat에서 만료 시각(epoch) 읽기"""
+    try:
+        with open("token.dat", "rb") as f:
+            return float(pickle.load(f)['timestamp'])
+    except Exception:
+        return None
+
+class BrokerPool:
+    """
+    한투 API 클라이언트 1개를 모든 세션이 공유
+    - 최초 호출 시에만 클라이언트 생성 (토큰 발급 1회)
+    - 만료 10분 전 토큰 재발급
+    - 동시 요청 수 및 초당 호출 수 제한
+    """
+
+    def __init__(self, api_key, api_secret, acc_no, mock=True):
+        self._params = dict(api_key=api_key, api_secret=api_secret, acc_no=acc_no, mock=mock)
+        self._client = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(C.KIS_MAX_CONCURRENT)
+        self._limiter = RateLimiter(C.KIS_RATE_LIMIT_PER_SEC)
+
+    def _get_client(self, force_refresh=False):
+        """클라이언트 반환 (필요 시 생성 또는 토큰 재발급)"""
+        with self._lock:
+            if self._client is None:
+                self._client = mojito.KoreaInvestment(**self._params)
+                self._expires_at = _read_token_expiry() or time.time() + C.KIS_TOKEN_TTL
+                logger.info("🏛️ 한투 API 클라이언트 생성 완료")
+            elif force_refresh or time.time() > self._expires_at - C.KIS_TOKEN_REFRESH_MARGIN:
+                self._client.issue_access_token()
+                self._expires_at = _read_token_expiry() or time.time() + C.KIS_TOKEN_TTL
+                logger.info("🏛️ 한투 API 토큰 재발급 완료")
+            return self._client
+
+    def fetch_price(self, code):
+        """국내 현재가 조회 (mojito.KoreaInvestment.fetch_price 와 동일한 응답)"""
+        with self._semaphore:
+            self._limiter.acquire()
+            resp = self._get_client().fetch_price(code)
+
+            # 토큰 만료 응답이면 즉시 재발급 후 1회 재시도
+            if isinstance(resp, dict) and resp.get('msg_cd') == 'EGW00123':
+                self._limiter.acquire()
+                resp = self._get_client(force_refresh=True).fetch_price(code)
+            return resp
+
+
+@st.cache_resource
+def get_broker():
+    """프로세스 전역 브로커 풀 (secrets 미설정 시 None)"""
+    try:
+        return BrokerPool(
+            api_key=st.secrets["kis"]["app_key"],
+            api_secret=st.secrets["kis"]["app_secret"],
+            acc_no=st.secrets["kis"]["acc_no"],
+            mock=True
+        )
+    except Exception as e:
+        logger.warning(f"KIS Broker Init Skipped: {e}")
+        return None
@@ -0,0 +1,195 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: business_calendar.py
+설명: 거래소 영업일 엔진 (KRX/NYSE 휴장일 비트맵 -> 영업일 판정/이동을 배열 단위 O(1) 조회)
+"""
+
+import datetime
+from functools import lru_cache
+import numpy as np
+import constants as C
+from logger import logger
+
+KRX = 'KRX'    # 한국거래소 (국내 상장)
+NYSE = 'NYSE'  # 뉴욕증권거래소 (해외 상장)
+
+def market_of(category):
+    """종목 분류(국내/해외) -> 거래소"""
+    return NYSE if str(category) == '해외' else KRX
+
+
+# =============================================================================
+# [SECTION 1] 휴장일 표
+# =============================================================================
+
+# KRX: 음력 명절/대체공휴일/임시공휴일은 연도별 표로 관리 (표에 없는 연도는 양력 고정 휴장일만 적용)
+# * 거래소가 다음 해 휴장일을 공시하면 표에 추가 -> 표의 마지막 연도까지만 배당락일/D-4 일정을 계산 (last_reliable_year)
+_KRX_FIXED = [(1, 1), (3, 1), (5, 1), (5, 5), (6, 6), (8, 15), (10, 3), (10, 9), (12, 25), (12, 31)]
+_KRX_HOLIDAYS = {
+    2025: ['01-01', '01-27', '01-28', '01-29', '01-30', '03-03', '05-01', '05-05', '05-06',
+           '06-03', '06-06', '08-15', '10-03', '10-06', '10-07', '10-08', '10-09', '12-25', '12-31'],
+    2026: ['01-01', '02-16', '02-17', '02-18', '03-02', '05-01', '05-05', '05-25', '06-03',
+           '08-17', '09-24', '09-25', '10-05', '10-09', '12-25', '12-31'],
+    2027: ['01-01', '02-08', '02-09', '03-01', '05-05', '05-13', '08-16', '09-14', '09-15',
+           '09-16', '10-04', '10-11', '12-27', '12-31'],
+}
+
+# NYSE: 규칙으로 계산 (임시 휴장일만 별도 표)
+_NYSE_SPECIAL = ['2025-01-09']
+
+def _nth_weekday(year, month, weekday, n):
+    """해당 월 n번째 weekday (n=-1이면 마지막)"""
+    if n > 0:
+        d = datetime.date(year, month, 1)
+        return d + datetime.timedelta(days=(weekday - d.weekday()) % 7 + 7 * (n - 1))
+    d = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return d - datetime.timedelta(days=(d.weekday() - weekday) % 7)
+
+def _easter(year):
+    """부활절 (그레고리력, Anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return datetime.date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+def _observed(d):
+    """토요일 -> 금요일, 일요일 -> 월요일"""
+    if d.weekday() == 5: return d - datetime.timedelta(days=1)
+    if d.weekday() == 6: return d + datetime.timedelta(days=1)
+    return d
+
+def _nyse_holidays(year):
+    days = [
+        _nth_weekday(year, 1, 0, 3),                        # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                        # Washington's Birthday
+        _easter(year) - datetime.timedelta(days=2),         # Good Friday
+        _nth_weekday(year, 5, 0, -1),                       # Memorial Day
+        _observed(datetime.date(year, 7, 4)),               # Independence Day
+        _nth_weekday(year, 9, 0, 1),                        # Labor Day
+        _nth_weekday(year, 11, 3, 4),                       # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),             # Christmas
+    ]
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5: days.append(_observed(new_year))  # 토요일이면 전년 12/31 대체 휴장 없음
+    if year >= 2022: days.append(_observed(datetime.date(year, 6, 19)))  # Juneteenth
+    return days
+
+def last_reliable_year(market=KRX, today=None):
+    """
+    휴장일이 모두 반영된 마지막 연도 (KRX: 휴장일 표의 마지막 해, NYSE: 규칙 계산이라 달력 끝까지)
+    * 표가 올해보다 오래됐으면 올해까지는 양력 고정 휴장일만으로 계산 (일정이 아예 사라지지 않도록)
+    """
+    if market == NYSE: return C.BIZCAL_YEARS[1]
+    return max(max(_KRX_HOLIDAYS), (today or datetime.date.today()).year)
+
+@lru_cache(maxsize=None)
+def warn_unlisted_year(market, year):
+    """휴장일 표에 없는 연도의 일정을 잘라냈을 때 경고 (연도별 1회)"""
+    logger.warning(f"📅 [{market}] {year}년 휴장일 표가 없어 {year}년 이후 배당락일/매수 권장일은 제외합니다. "
+                   f"(business_calendar._KRX_HOLIDAYS에 추가 필요)")
+
+def _krx_holidays(year):
+    if year in _KRX_HOLIDAYS:
+        return [datetime.date.fromisoformat(f"{year}-{md}") for md in _KRX_HOLIDAYS[year]]
+    return [datetime.date(year, m, d) for m, d in _KRX_FIXED]
+
+
+# =============================================================================
+# [SECTION 2] 영업일 비트맵
+# =============================================================================
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+def _to_days(dates):
+    """date / datetime64 / 배열 -> 1970-01-01 기준 일수 (int64 배열)"""
+    return (np.asarray(dates, dtype='datetime64[D]') - _EPOCH).astype(np.int64)
+
+def _from_days(days, scalar):
+    out = _EPOCH + np.asarray(days, dtype=np.int64).astype('timedelta64[D]')
+    return out.item() if scalar else out
+
+class BusinessCalendar:
+    """
+    거래소 영업일 달력 (C.BIZCAL_YEARS 범위, 하루 1칸 비트맵)
+    - _open[i]: i번째 날 영업 여부
+    - _rank[i]: i번째 날까지(포함) 누적 영업일 수
+    - _open_days: 영업일 인덱스 목록 (rank로 바로 찾아감)
+    """
+
+    def __init__(self, market, holidays):
+        start, end = C.BIZCAL_YEARS
+        self.market = market
+        self._base = int(_to_days(datetime.date(start, 1, 1)))
+        days = np.arange(self._base, int(_to_days(datetime.date(end + 1, 1, 1))))
+
+        weekday = (days + 3) % 7  # 1970-01-01 = 목요일(3)
+        self._open = weekday < 5
+        idx = _to_days(sorted(holidays)) - self._base
+        self._open[idx[(idx >= 0) & (idx < len(days))]] = False
+
+        self._rank = np.cumsum(self._open)
+        self._open_days = np.flatnonzero(self._open)
+
+    def _index(self, dates):
+        idx = _to_days(dates) - self._base
+        if idx.size and (idx.min() < 0 or idx.max() >= len(self._open)):
+            raise ValueError(f"영업일 달력 범위({C.BIZCAL_YEARS[0]}~{C.BIZCAL_YEARS[1]}년)를 벗어난 날짜입니다.")
+        return idx
+
+    def _result(self, idx, dates):
+        return _from_days(idx + self._base, np.ndim(dates) == 0)
+
+    def is_business_day(self, dates):
+        """영업일 여부 (스칼라 -> bool, 배열 -> bool 배열)"""
+        out = self._open[self._index(dates)]
+        return bool(out) if np.ndim(dates) == 0 else out
+
+    def roll_back(self, dates):
+        """휴장일이면 직전 영업일로 (영업일은 그대로)"""
+        idx = self._index(dates)
+        return self._result(self._open_days[self._rank[idx] - 1], dates)
+
+    def roll_forward(self, dates):
+        """휴장일이면 다음 영업일로 (영업일은 그대로)"""
+        idx = self._index(dates)
+        return self._result(self._open_days[self._rank[idx] - self._open[idx]], dates)
+
+    def business_days_before(self, dates, n):
+        """n 영업일 전 (기준일 제외, 예: 배당락일 D-4 매수 권장일)"""
+        idx = self._index(dates)
+        return self._result(self._open_days[self._rank[idx] - self._open[idx] - n], dates)
+
+    def business_days_after(self, dates, n):
+        """n 영업일 후 (기준일 제외)"""
+        idx = self._index(dates)
+        return self._result(self._open_days[self._rank[idx] + n - 1], dates)
+
+    def last_business_day(self, years, months):
+        """해당 월 마지막 영업일 (연/월 배열 가능)"""
+        years, months = np.asarray(years), np.asarray(months)
+        first_next = (years - 1970) * 12 + months  # 다음 달 1일 (월 단위 오프셋)
+        month_end = first_next.astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+        return self.roll_back(month_end.item() if month_end.ndim == 0 else month_end)
+
+    def first_business_day(self, years, months):
+        """해당 월 첫 영업일 (연/월 배열 가능)"""
+        years, months = np.asarray(years), np.asarray(months)
+        first = ((years - 1970) * 12 + months - 1).astype('datetime64[M]').astype('datetime64[D]')
+        return self.roll_forward(first.item() if first.ndim == 0 else first)
+
+@lru_cache(maxsize=None)
+def get_calendar(market=KRX):
+    """거래소별 영업일 달력 (프로세스당 1회 생성)"""
+    start, end = C.BIZCAL_YEARS
+    years = range(start, end + 1)
+    if market == NYSE:
+        holidays = [d for y in years for d in _nyse_holidays(y)]
+        holidays += [datetime.date.fromisoformat(s) for s in _NYSE_SPECIAL]
+    else:
+        holidays = [d for y in years for d in _krx_holidays(y)]
+    return BusinessCalendar(market, holidays)
@@ -0,0 +1,106 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: classifier.py
+설명: 종목명 키워드 분류기 (자산 유형 / 환헤지 / 섹터를 1회 스캔으로 판별, 이름별 결과 메모)
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+import constants as C
+
+# =============================================================================
+# [SECTION 1] 통합 패턴 (import 시 1회 컴파일)
+# =============================================================================
+
+def _all_keywords():
+    tables = [C.SECTOR_KEYWORDS, C.STOCK_NAME_MAPPING, C.ASSET_TYPE_KEYWORDS, C.HEDGE_KEYWORDS]
+    keywords = set(C.EXCLUDE_KEYWORDS)
+    for table in tables:
+        for words in table.values(): keywords.update(w.upper() for w in words)
+    return keywords
+
+_KEYWORDS = _all_keywords()
+
+# 전방탐색(?=...)으로 모든 시작 위치에서 가장 긴 키워드를 찾고,
+# 같은 위치에서 시작하는 더 짧은 키워드는 접두어 표로 보충 (Aho-Corasick과 동일한 결과)
+_PATTERN = re.compile("(?=(" + "|".join(re.escape(k) for k in sorted(_KEYWORDS, key=len, reverse=True)) + "))")
+_PREFIXES = {k: frozenset(p for p in _KEYWORDS if k.startswith(p)) for k in _KEYWORDS}
+
+@lru_cache(maxsize=C.CLASSIFIER_CACHE_SIZE)
+def keyword_hits(text):
+    """문자열(대문자)에 포함된 모든 키워드 집합"""
+    hits = set()
+    for m in _PATTERN.finditer(text):
+        hits |= _PREFIXES[m.group(1)]
+    return frozenset(hits)
+
+def _has(hits, words):
+    return not hits.isdisjoint(words)
+
+_UPPER = lambda table: {k: frozenset(w.upper() for w in v) for k, v in table.items()}
+_ASSET = _UPPER(C.ASSET_TYPE_KEYWORDS)
+_HEDGE = _UPPER(C.HEDGE_KEYWORDS)
+_SECTOR = _UPPER(C.SECTOR_KEYWORDS)
+_NAME_MAP = _UPPER(C.STOCK_NAME_MAPPING)
+_EXCLUDE = frozenset(C.EXCLUDE_KEYWORDS)
+
+
+# =============================================================================
+# [SECTION 2] 분류 결과
+# =============================================================================
+
+class Classification(NamedTuple):
+    asset_type: str  # 자산 유형 (🛡️ 커버드콜, 🏦 채권형 ...)
+    hedge: str       # 환헤지 여부 (💲달러(직투), ⚡환노출 ...)
+
+class Holding(NamedTuple):
+    clean_name: str  # 표준 종목명 (제외 대상이면 None)
+    sector: str      # 섹터 (🔥 하이일드, 💻 빅테크 ...)
+
+@lru_cache(maxsize=C.CLASSIFIER_CACHE_SIZE)
+def classify(name, symbol='', category='국내'):
+    """상장 종목 분류: 자산 유형 + 환헤지 여부"""
+    name_hits = keyword_hits(str(name).upper())
+    symbol_hits = keyword_hits(str(symbol).upper())
+
+    if _has(name_hits, _ASSET['CoveredCall']) or _has(symbol_hits, _ASSET['CoveredCall']): asset_type = '🛡️ 커버드콜'
+    elif _has(name_hits, _ASSET['Bond']) or _has(symbol_hits, _ASSET['Bond']): asset_type = '🏦 채권형'
+    elif _has(name_hits, _ASSET['REITs']): asset_type = '🏢 리츠형'
+    elif _has(name_hits, _ASSET['Mixed']): asset_type = '⚖️ 혼합형'
+    else: asset_type = '📈 주식형'
+
+    if category == '해외': hedge = "💲달러(직투)"
+    elif _has(name_hits, _HEDGE['Unhedged']): hedge = "⚡환노출"
+    elif _has(name_hits, _HEDGE['Hedged']): hedge = "🛡️환헤지(H)"
+    elif _has(name_hits, _HEDGE['Foreign']): hedge = "⚡환노출"
+    else: hedge = "-"
+
+    return Classification(asset_type, hedge)
+
+@lru_cache(maxsize=C.CLASSIFIER_CACHE_SIZE)
+def classify_holding(name, raw_sector='기타'):
+    """ETF 구성종목 분류: 제외 여부, 이름 정규화, 섹터"""
+    name = str(name).upper().strip()
+    hits = keyword_hits(name)
+
+    # [1] 제외 키워드 체크 (현금성 자산은 예외)
+    if _has(hits, _EXCLUDE) and not _has(hits, _SECTOR['Cash']):
+        return Holding(None, None)
+
+    # [2] 이름 정규화
+    clean_name = next((std for std, words in _NAME_MAP.items() if _has(hits, words)), name)
+    if clean_name != name: hits = keyword_hits(clean_name)
+
+    # [3] 섹터 분류
+    sector = str(raw_sector)
+    if _has(hits, _SECTOR['HighYield']) or '고수익' in sector: sector = "🔥 하이일드"
+    elif _has(hits, _SECTOR['Cash']): sector = "🛡️ 현금"
+    elif _has(hits, _SECTOR['Bond_Long']): sector = "📉 국채"
+    elif clean_name in C.SECTOR_KEYWORDS['BigTech']: sector = "💻 빅테크"
+    elif '금융' in sector or _has(hits, _SECTOR['Financial']): sector = "💰 금융"
+    elif '리츠' in sector or _has(hits, _SECTOR['RealEstate']): sector = "🏢 리츠"
+    elif '산업재' in sector or _has(hits, _SECTOR['Industrial']): sector = "🚗 산업재"
+    elif '필수소비재' in sector: sector = "🛒 소비재"
+
+    return Holding(clean_name, sector)
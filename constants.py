@@ -14,6 +14,76 @@ SIMULATION_YEARS = [3, 5, 10, 15, 20, 30]
 INFLATION_RATE = 0.025            # 물가상승률 (2.5%)
 ISA_YEARLY_CAP = 20000000         # ISA 연간 납입 한도 (현재 2천만원)
 ISA_TOTAL_CAP = 100000000         # ISA 총 납입 한도 (현재 1억원)
+SIM_MEMO_SIZE = 512               # 시뮬레이션 결과 메모 최대 개수 (세션 공유)
+PORTFOLIO_METRICS_MEMO_SIZE = 256 # 포트폴리오 지표 메모 개수 (계산기/로드맵/사이드바 공용)
+
+# 📆 배당 캘린더(.ics) 내보내기
+ICS_HORIZON_YEARS = {'올해': 1, '2년': 2, '3년': 3}  # 일정 기간 선택지 (올해 포함 N년)
+ICS_EVENT_CACHE_SIZE = 8192       # (종목, 배당락일)별 일정 텍스트 메모 개수
+BUY_LEAD_BUSINESS_DAYS = 4        # 매수 권장일 = 배당락일 N 영업일 전 (D-4)
+BIZCAL_YEARS = (2000, 2100)       # 영업일 달력 비트맵 범위 (연도)
+
+# 🎲 몬테카를로 시뮬레이션 (주가·환율·배당컷 변동)
+MC_PATHS = 10000                  # 경로 수
+MC_CHUNK = 2000                   # 한 번에 생성할 경로 수 (메모리 상한)
+MC_SEED = 42                      # 재실행 시 같은 결과가 나오도록 고정
+MC_FX_VOL = 0.08                  # 원/달러 연 변동성 (달러 노출 비중만큼 반영)
+MC_CUT_THRESHOLD = 0.95           # 직전 대비 5% 이상 감소한 지급은 배당컷으로 간주
+# 자산유형: (연 기대 가격수익률, 연 가격 변동성, 연 배당 변동성, 연 배당컷 확률, 배당컷 크기)
+MC_ASSET_PARAMS = {
+    '🛡️ 커버드콜': (-0.02, 0.14, 0.10, 0.15, 0.10),
+    '🏦 채권형': (0.00, 0.10, 0.05, 0.05, 0.05),
+    '🏢 리츠형': (0.00, 0.18, 0.08, 0.10, 0.10),
+    '⚖️ 혼합형': (0.02, 0.10, 0.05, 0.05, 0.05),
+    '📈 주식형': (0.04, 0.18, 0.06, 0.05, 0.10),
+}
+
+# 🤖 AI 로보어드바이저 비중 최적화 (후보 조합 일괄 투영 경사하강)
+ALLOC_STYLE_MIN = {'safe': (('bond',), 0.5), 'growth': (('growth',), 0.5), 'flow': (('cov',), 0.3)}  # 스타일별 (핵심 자산군, 최소 비중)
+ALLOC_USD_MAX = 0.5               # 달러 자산 최대 비중
+ALLOC_TIMING_MIN = 0.7            # 선택한 배당 시기 종목 최소 비중 (시기 지정 시)
+ALLOC_MAX_WEIGHT = 0.5            # 종목(=지수)당 최대 비중
+ALLOC_MIN_WEIGHT = 0.1            # 종목당 최소 비중
+ALLOC_CANDIDATES = 48             # 한 번에 평가할 후보 조합 수
+ALLOC_ITERS = 120                 # 투영 경사하강 반복 횟수 (전체)
+ALLOC_OUTER = 8                   # 증강 라그랑지안 승수 갱신 횟수
+ALLOC_DYKSTRA_ROUNDS = 200        # 마지막 제약 집합 투영 반복 횟수
+ALLOC_TOP = 3                     # 목적함수 상위 몇 개 조합 중에서 제시할지 (다른 조합 버튼용)
+ALLOC_RESAMPLE_ROUNDS = 3         # 제약을 만족하는 조합이 없을 때 후보 추첨 횟수 (완화 단계마다, 첫 회 포함)
+ALLOC_RELAX_ORDER = ('timing', 'style', 'usd')  # 그래도 없으면 이 순서로 누적 완화 (종목당 상·하한은 완화하지 않음)
+ALLOC_PENALTY = 20.0              # 증강 라그랑지안 벌점 계수
+ALLOC_SPREAD = 0.05               # 균등 분산 선호 계수 (한 종목 쏠림 방지)
+
+# 💹 가격 캐시 설정 (장중에는 짧게, 장 마감 후에는 길게)
+PRICE_TTL_MARKET_OPEN = 300       # 장중 가격 유효시간 (5분)
+PRICE_TTL_MARKET_CLOSED = 21600   # 장 마감 후 가격 유효시간 (6시간)
+PRICE_TTL_FAILED = 60             # 조회 실패 종목 재시도 간격 (1분)
+PROCESSED_DATA_CACHE_SIZE = 4     # 가공 데이터 보관 개수 (원본 버전 x 관리자 여부, 프로세스 공유)
+
+# 💾 가공 데이터 스냅샷 (새 워커 콜드 스타트용)
+SNAPSHOT_FILE = "stocks_snapshot.parquet"
+SNAPSHOT_SAVE_INTERVAL = 600      # 스냅샷 저장 최소 간격 (10분)
+SNAPSHOT_MAX_AGE = 604800         # 이보다 오래된 스냅샷은 사용하지 않음 (7일)
+
+# 🏛️ 한투(KIS) API 호출 제한
+KIS_RATE_LIMIT_PER_SEC = 2        # 초당 호출 한도 (모의투자 기준)
+KIS_MAX_CONCURRENT = 3            # 동시 요청 수 상한
+KIS_TOKEN_REFRESH_MARGIN = 600    # 토큰 만료 10분 전 미리 재발급
+KIS_TOKEN_TTL = 86400             # 토큰 유효시간 (만료 정보가 없을 때 기본값, 24시간)
+
+# 🌐 HTTP 연결 풀 설정 (네이버 API 공용)
+HTTP_POOL_SIZE = 20               # 호스트당 유지할 keep-alive 연결 수
+HTTP_MAX_PER_HOST = 8             # 호스트당 동시 요청 수 상한
+HTTP_RETRY_TOTAL = 2              # 일시 장애(429/5xx, 연결 오류) 재시도 횟수
+HTTP_RETRY_BACKOFF = 0.3          # 재시도 대기 (0.3초, 0.6초 ... 지수 증가)
+
+# 🛰️ 스마트 갱신 크롤러 (데이터 소스별 동시 실행 수 / 최소 요청 간격 초)
+SENSOR_CONCURRENCY = {'국내': 8, '해외': 4}       # 국내: 네이버 API, 해외: YFinance
+SENSOR_MIN_INTERVAL = {'국내': 0.05, '해외': 0.1}
+DIVIDEND_FINGERPRINT_FILE = "dividend_fingerprints.json"  # 종목별 최근 배당 지문 (증분 갱신용)
+
+# 🧺 ETF 구성종목 색인 (실제 보유 종목 분석)
+HOLDINGS_CACHE_TTL = 21600        # 색인 유지시간 (6시간, 관리자 업로드 시 즉시 무효화)
 
 # ---------------------------------------------------------
 # 🧹 데이터 정제 및 필터링 키워드 (리팩토링 추가)
@@ -42,10 +112,30 @@ SECTOR_KEYWORDS = {
     'HighYield': ['하이일드', 'USHY', 'JNK', 'HYG'],
     'Cash': ['BIL', 'SHV', 'SGOV', '초단기', 'CD금리', 'KOFR', '머니마켓', '현금', '예금'],
     'Bond_Long': ['국채', '채권', 'TLT', '30년'],
-    'BigTech': ['엔비디아', '애플', '마이크로소프트', '구글(알파벳)', '메타', '테슬라', '아마존', '브로드컴']
+    'BigTech': ['엔비디아', '애플', '마이크로소프트', '구글(알파벳)', '메타', '테슬라', '아마존', '브로드컴'],
+    'Financial': ['은행', '지주'],
+    'RealEstate': ['부동산', '인프라'],
+    'Industrial': ['자동차']
+}
+
+# 4. 자산 유형 분류 키워드 (종목명/종목코드 기준, 위에서부터 우선 적용)
+ASSET_TYPE_KEYWORDS = {
+    'CoveredCall': ['커버드콜', 'COVERED', 'QYLD', 'JEPI', 'JEPQ', 'NVDY', 'TSLY', 'QQQI', '타겟위클리'],
+    'Bond': ['채권', '국채', 'BOND', 'TLT', '하이일드', 'HI-YIELD'],
+    'REITs': ['리츠', 'REITS', 'INFRA', '인프라'],
+    'Mixed': ['혼합']
 }
 
-# 4. ETF 이름 매핑 (DB 검색용 별명)
+# 5. 환헤지 판별 키워드 (국내 상장 종목 대상)
+HEDGE_KEYWORDS = {
+    'Unhedged': ['환노출', 'UNHEDGED'],
+    'Hedged': ['(H)', '헤지'],
+    'Foreign': ['미국', 'GLOBAL', 'S&P500', '나스닥', '국제']
+}
+
+CLASSIFIER_CACHE_SIZE = 20000  # 종목명별 분류 결과 메모 개수 (ETF 구성종목 포함)
+
+# 6. ETF 이름 매핑 (DB 검색용 별명)
 ETF_ALIAS_MAP = {
     "KODEX 미국30년국채타겟커버드콜(합성)": "KODEX 미국30년국채액티브(H)",
     "ACE 미국30년국채액티브(H)": "ACE 미국30년국채액티브",
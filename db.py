@@ -12,6 +12,7 @@ import time
 import os
 from streamlit.runtime.scriptrunner import get_script_run_ctx
 from cryptography.fernet import Fernet
+from logger import logger
 
 # ---------------------------------------------------------
 # [SECTION 1] 보안 강화된 토큰 저장소 (암호화 공정)
@@ -169,6 +170,51 @@ def update_portfolio(supabase: Client, portfolio_id: str, data: dict):
     query = supabase.table("portfolios").update(data).eq("id", portfolio_id)
     return safe_execute(query)
 
+def get_all_portfolios(supabase: Client, page_size: int = 1000):
+    """전체 포트폴리오 조회 (일괄 재평가용, 페이지 단위) -> 실패 시 None"""
+    rows, start = [], 0
+    while True:
+        query = supabase.table("portfolios").select("id, ticker_data").order("id").range(start, start + page_size - 1)
+        resp = safe_execute(query)
+        if resp is None: return None
+        rows.extend(resp.data)
+        if len(resp.data) < page_size: return rows
+        start += page_size
+
+def _merge_summaries_per_row(supabase: Client, chunk: list):
+    """RPC가 없을 때의 대체 경로: 최신 ticker_data를 다시 읽어 summary만 바꿔 건별 저장 -> 반영된 건수"""
+    resp = safe_execute(supabase.table("portfolios").select("id, ticker_data").in_("id", [r['id'] for r in chunk]))
+    if resp is None: return 0
+    latest = {str(row['id']): row.get('ticker_data') for row in resp.data}
+    done = 0
+    for r in chunk:
+        if r['id'] not in latest: continue
+        ticker_data = latest[r['id']] if isinstance(latest[r['id']], dict) else {}
+        if update_portfolio(supabase, r['id'], {"ticker_data": {**ticker_data, 'summary': r['summary']}}) is not None:
+            done += 1
+    return done
+
+def bulk_update_summaries(supabase: Client, summaries: list, chunk_size: int = 500):
+    """
+    여러 포트폴리오의 요약(ticker_data.summary)만 일괄 갱신 -> 반영된 건수
+    - summaries: [{'id', 'summary'}, ...] / 구성(composition) 등 나머지 필드는 DB 쪽 최신 값 유지
+    - merge_portfolio_summaries RPC(supabase/migrations)로 청크 단위 병합, RPC 호출이 실패하면 건별 갱신으로 전환
+    """
+    done, use_rpc = 0, True
+    for i in range(0, len(summaries), chunk_size):
+        chunk = [{'id': str(r['id']), 'summary': r['summary']} for r in summaries[i:i + chunk_size]]
+        if use_rpc:
+            try:
+                resp = supabase.rpc("merge_portfolio_summaries", {"rows": chunk}).execute()
+                done += int(resp.data or 0)
+                continue
+            except Exception as e:
+                logger.error(f"❌ merge_portfolio_summaries RPC 실패 -> 건별 갱신으로 전환 "
+                             f"(supabase/migrations/*_merge_portfolio_summaries.sql 적용 필요): {e}")
+                use_rpc = False
+        done += _merge_summaries_per_row(supabase, chunk)
+    return done
+
 # ---------------------------------------------------------
 # [SECTION 5] 분석 및 로그 기능 (출입 명부)
 # ---------------------------------------------------------
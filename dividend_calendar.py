@@ -0,0 +1,166 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: dividend_calendar.py
+설명: 배당락일 텍스트 정규화 (규칙 1회 해석 -> 배당 시기/향후 배당락일을 컬럼으로 미리 계산)
+"""
+
+import re
+import calendar
+import datetime
+from functools import lru_cache
+from typing import NamedTuple
+import pandas as pd
+import business_calendar
+
+# =============================================================================
+# [SECTION 1] 배당락일 규칙 해석
+# =============================================================================
+
+# 규칙 종류
+RULE_DATE = 'date'            # 특정 날짜 (2026-03-15)
+RULE_MONTH_END = 'month_end'  # 매월 말일/마지막 영업일
+RULE_MONTH_START = 'month_start'  # 매월 초
+RULE_DAY = 'day'              # 매월 N일
+RULE_UNKNOWN = 'unknown'
+
+_END_KEYWORDS = ['말일', '월말', '마지막', '하순', 'END']
+_START_KEYWORDS = ['매월 초', '월초', '초순', '1~3일', 'BEGIN']
+
+class ExDateRule(NamedTuple):
+    kind: str               # 규칙 종류 (RULE_*)
+    day: int                # RULE_DAY: N일 / RULE_DATE: 일자 / 그 외 0
+    business_adjusted: bool  # 영업일 기준 (주말이면 직전 영업일로 당김)
+    fixed: datetime.date = None  # RULE_DATE 전용
+
+def standardize_date_format(date_str):
+    """
+    날짜 문자열 정규화 (YYYY.MM.DD 등 -> YYYY-MM-DD)
+    """
+    s = str(date_str).strip()
+    if re.match(r'^\d{4}-\d{2}-\d{2}$', s):
+        return s
+
+    s = s.replace('.', '-').replace('/', '-')
+    match = re.match(r'^(\d{4})-(\d{1,2})-(\d{1,2})$', s)
+    if match:
+        y, m, d = match.groups()
+        return f"{y}-{m.zfill(2)}-{d.zfill(2)}"
+
+    return s
+
+@lru_cache(maxsize=4096)
+def parse_rule(text):
+    """배당락일 텍스트 -> ExDateRule (같은 문구는 1회만 해석)"""
+    s = standardize_date_format(str(text))
+    business = '영업일' in s
+
+    try:
+        fixed = datetime.datetime.strptime(s, "%Y-%m-%d").date()
+        return ExDateRule(RULE_DATE, fixed.day, False, fixed)
+    except ValueError:
+        pass
+
+    if any(k in s for k in _END_KEYWORDS): return ExDateRule(RULE_MONTH_END, 0, business)
+    if any(k in s for k in _START_KEYWORDS): return ExDateRule(RULE_MONTH_START, 0, business)
+    if '중순' in s: return ExDateRule(RULE_DAY, 15, business)
+
+    day_match = re.search(r'(\d+)', s)
+    if day_match and ('매월' in s or '일' in s):
+        return ExDateRule(RULE_DAY, max(1, min(int(day_match.group(1)), 31)), business)
+    return ExDateRule(RULE_UNKNOWN, 0, business)
+
+def timing_category(rule):
+    """배당 시기 분류: 'early'(1~10일) / 'mid'(11~20일) / 'end'(21일~말일) / 'unknown'"""
+    if rule.kind == RULE_MONTH_END: return 'end'
+    if rule.kind == RULE_MONTH_START: return 'early'
+    if rule.kind in (RULE_DAY, RULE_DATE):
+        if rule.day <= 10: return 'early'
+        if rule.day <= 20: return 'mid'
+        return 'end'
+    return 'unknown'
+
+def representative_day(rule):
+    """대표 일자 (월초 1, 월말 30, 미정 15)"""
+    if rule.kind == RULE_MONTH_END: return 30
+    if rule.kind == RULE_MONTH_START: return 1
+    if rule.kind in (RULE_DAY, RULE_DATE): return min(rule.day, 30)
+    return 15
+
+
+# =============================================================================
+# [SECTION 2] 향후 배당락일 계산
+# =============================================================================
+
+def ex_date_in_month(rule, year, month, market=business_calendar.KRX):
+    """해당 월의 예상 배당락일 (영업일 기준 규칙은 거래소 휴장일 반영, 규칙이 없으면 None)"""
+    last_day = calendar.monthrange(year, month)[1]
+    if rule.kind == RULE_MONTH_END: d = datetime.date(year, month, last_day)
+    elif rule.kind == RULE_MONTH_START: d = datetime.date(year, month, 1)
+    elif rule.kind == RULE_DAY: d = datetime.date(year, month, min(rule.day, last_day))
+    else: return None
+    if not rule.business_adjusted: return d
+
+    cal = business_calendar.get_calendar(market)
+    return cal.first_business_day(year, month) if rule.kind == RULE_MONTH_START else cal.roll_back(d)
+
+def next_ex_dates(text, today=None, count=12, market=business_calendar.KRX):
+    """오늘 이후(오늘 포함) 예상 배당락일 최대 count개 (특정 날짜 규칙은 해당 날짜 1개, 휴장일 표가 있는 연도까지만)"""
+    return _next_ex_dates(str(text), today or datetime.date.today(), count, market)
+
+@lru_cache(maxsize=4096)
+def _next_ex_dates(text, today, count, market):
+    rule = parse_rule(text)
+    if rule.kind == RULE_DATE: return (rule.fixed,) if rule.fixed >= today else ()
+    if rule.kind == RULE_UNKNOWN: return ()
+
+    last_year = business_calendar.last_reliable_year(market, today)
+    dates, offset = [], 0
+    while len(dates) < count:
+        month_idx = today.month - 1 + offset
+        year = today.year + month_idx // 12
+        if year > last_year:  # 휴장일 표가 없는 연도는 영업일 보정이 틀리므로 제외
+            business_calendar.warn_unlisted_year(market, year)
+            break
+        d = ex_date_in_month(rule, year, month_idx % 12 + 1, market)
+        if d >= today: dates.append(d)
+        offset += 1
+    return tuple(dates)
+
+def next_ex_date(text, today=None, market=business_calendar.KRX):
+    """가장 가까운 예상 배당락일 (특정 날짜 규칙은 지났어도 그 날짜, 없으면 None)"""
+    rule = parse_rule(text)
+    if rule.kind == RULE_DATE: return rule.fixed
+    dates = next_ex_dates(text, today, market=market)
+    return dates[0] if dates else None
+
+
+# =============================================================================
+# [SECTION 3] 데이터 로드 단계 정규화 (컬럼 추가)
+# =============================================================================
+
+def normalize_calendar(df, col='배당락일', today=None):
+    """
+    배당락일 텍스트 컬럼을 구조화된 컬럼으로 변환 (고유 문구/거래소별 1회 계산, 분류 컬럼으로 KRX/NYSE 구분)
+    - 배당규칙: 규칙 종류 / 배당일: N일 / 영업일기준: bool
+    - 배당시기: early/mid/end/unknown / 배당락일목록: 향후 12회 예상 배당락일 (tuple)
+    """
+    if df.empty or col not in df.columns: return df
+
+    today = today or datetime.date.today()
+    texts = df[col].fillna('-').astype(str)
+    uniques = {t: parse_rule(t) for t in texts.unique()}
+
+    df['배당규칙'] = texts.map(lambda t: uniques[t].kind)
+    df['배당일'] = texts.map(lambda t: uniques[t].day)
+    df['영업일기준'] = texts.map(lambda t: uniques[t].business_adjusted)
+    df['배당시기'] = texts.map(lambda t: timing_category(uniques[t]))
+    markets = df['분류'].map(business_calendar.market_of) if '분류' in df.columns else pd.Series(business_calendar.KRX, index=df.index)
+    df['배당락일목록'] = [next_ex_dates(t, today, market=m) for t, m in zip(texts, markets)]
+    return df
+
+def lookup_timing(row_or_text):
+    """행(배당시기 컬럼 보유) 또는 배당락일 텍스트 -> 배당 시기"""
+    if isinstance(row_or_text, (dict, pd.Series)) and '배당시기' in row_or_text:
+        return row_or_text['배당시기']
+    text = row_or_text.get('배당락일', '-') if isinstance(row_or_text, (dict, pd.Series)) else row_or_text
+    return timing_category(parse_rule(str(text)))
@@ -0,0 +1,52 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: http_client.py
+설명: 공용 HTTP 세션 (keep-alive 연결 풀, 호스트별 동시 요청 제한, 일관된 재시도 정책)
+"""
+
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import streamlit as st
+import constants as C
+
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
+def _build_session():
+    """연결 풀과 재시도 정책이 장착된 세션 생성"""
+    retry = Retry(
+        total=C.HTTP_RETRY_TOTAL,
+        backoff_factor=C.HTTP_RETRY_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=C.HTTP_POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_session():
+    """프로세스 전역 세션 (모든 세션/스레드 공유)"""
+    return _build_session()
+
+def _host_semaphore(host):
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(C.HTTP_MAX_PER_HOST)
+        return _host_limits[host]
+
+def get(url, headers=None, timeout=5, **kwargs):
+    """
+    requests.get 대체 함수
+    - 같은 호스트로의 연결은 keep-alive로 재사용 (TCP/TLS 핸드셰이크 생략)
+    - 호스트별 동시 요청 수를 제한하여 차단(429) 방지
+    """
+    with _host_semaphore(urlparse(url).netloc):
+        return get_session().get(url, headers=headers, timeout=timeout, **kwargs)
@@ -7,15 +7,19 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import yfinance as yf
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-import mojito 
+import asyncio
+import threading
+from collections import OrderedDict
 import datetime 
 import calendar 
+from functools import lru_cache
 from urllib.parse import quote
 import re
-import requests
+import http_client
 import base64
 import json
 from github import Github
@@ -23,6 +27,13 @@ from logger import logger
 import sqlite3 
 import sys
 import constants as C
+import price_cache
+import snapshot
+import universe
+import broker_pool
+import classifier
+import dividend_calendar
+import business_calendar
 
 # =============================================================================
 # [SECTION 1] 날짜 계산 및 캘린더 유틸리티
@@ -32,188 +43,111 @@ def standardize_date_format(date_str):
     """
     날짜 문자열 정규화 (YYYY.MM.DD 등 -> YYYY-MM-DD)
     """
-    s = str(date_str).strip()
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', s):
-        return s
-    
-    s = s.replace('.', '-').replace('/', '-')
-    match = re.match(r'^(\d{4})-(\d{1,2})-(\d{1,2})$', s)
-    if match:
-        y, m, d = match.groups()
-        return f"{y}-{m.zfill(2)}-{d.zfill(2)}"
-    
-    return s 
+    return dividend_calendar.standardize_date_format(date_str)
 
-def parse_dividend_date(date_str):
+def parse_dividend_date(date_str, category='국내'):
     """
     배당락일 파싱 (월초/월말/특정일 텍스트를 실제 날짜 객체로 변환)
+    * 규칙 해석은 dividend_calendar에서 문구별 1회만 수행, 영업일 기준 문구는 거래소 휴장일 반영
     """
-    s = standardize_date_format(str(date_str))
-    today = datetime.date.today()
-    
-    # 1. 표준 날짜 형식 시도
-    try:
-        return datetime.datetime.strptime(s, "%Y-%m-%d").date()
-    except ValueError:
-        pass
-    
-    # 2. 텍스트 패턴 분석 (말일, 월초 등)
-    is_end_of_month = any(k in s for k in ['말일', '월말', '마지막', '하순', 'END'])
-    is_start_of_month = any(k in s for k in ['매월 초', '월초', '1~3일', 'BEGIN'])
-    
-    day_match = re.search(r'(\d+)', s)
-    
-    if is_end_of_month or is_start_of_month or (day_match and ('매월' in s or '일' in s)):
-        try:
-            if is_end_of_month:
-                day = calendar.monthrange(today.year, today.month)[1]
-            elif is_start_of_month:
-                day = 1 
-            else:
-                day = int(day_match.group(1))
-            
-            # 날짜 보정 (2월 30일 방지 등)
-            try:
-                last_day_actual = calendar.monthrange(today.year, today.month)[1]
-                safe_day = min(day, last_day_actual)
-                target_date = datetime.date(today.year, today.month, safe_day)
-            except ValueError:
-                target_date = today 
-            
-            # 이미 지난 날짜면 다음 달로 설정
-            if target_date < today:
-                next_month = today.month + 1 if today.month < 12 else 1
-                year = today.year if today.month < 12 else today.year + 1
-                last_day_next = calendar.monthrange(year, next_month)[1]
-                
-                if is_end_of_month:
-                    real_day = last_day_next
-                elif is_start_of_month:
-                    real_day = 1
-                else:
-                    real_day = min(day, last_day_next)
-                    
-                return datetime.date(year, next_month, real_day)
-            
-            return target_date
-        except Exception as e:
-            # [방어 운전] 날짜 파싱 실패 시 로그 남김
-            logger.debug(f"Date Parsing Warning ({s}): {e}")
-            pass
-            
-    return None 
-
-def generate_portfolio_ics(portfolio_data):
+    return dividend_calendar.next_ex_date(str(date_str), market=business_calendar.market_of(category))
+
+def buy_date_before(ex_date, category='국내'):
+    """D-4 매수 권장일 (배당락일 N 영업일 전, 거래소 휴장일 반영)"""
+    cal = business_calendar.get_calendar(business_calendar.market_of(category))
+    return cal.business_days_before(ex_date, C.BUY_LEAD_BUSINESS_DAYS)
+
+_ICS_HEADER = "\n".join([
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//DividendPange//Portfolio//KO",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH"
+])
+
+@lru_cache(maxsize=C.ICS_EVENT_CACHE_SIZE)
+def _ics_event(name, event_date, category='국내'):
     """
-    전체 포트폴리오 캘린더 파일(.ics) 생성 (D-4 알림 포함)
+    종목별 배당락일 1건 -> (D-4 매수 권장일, VEVENT 텍스트)
+    * (종목, 배당락일) 단위로 메모하여 재실행 시 문자열을 다시 만들지 않음
     """
-    ics_content = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//DividendPange//Portfolio//KO",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH"
-    ]
+    # D-4 매수 권장일 계산 (영업일 기준)
+    buy_date = buy_date_before(event_date, category)
+
+    dt_start = buy_date.strftime("%Y%m%d")
+    dt_end = (buy_date + datetime.timedelta(days=1)).strftime("%Y%m%d")
     
-    today = datetime.date.today()
-    current_year = today.year
+    description = (
+        f"예상 배당락일: {event_date}\\n\\n"
+        f"💰 [{name}] 배당 수령을 위해 계좌를 확인하세요.\\n\\n"
+        f"🛑 [필독] 투자 유의사항\\n"
+        f"이 알림은 과거 데이터를 기반으로 생성된 '예상 일정'입니다.\\n"
+        f"운용사 정책 변경으로 실제 배당일이 바뀔 수 있습니다.\\n"
+        f"안전한 투자를 위해, 매수 전 반드시 '운용사 공식 홈페이지' 공시를 확인해주세요."
+    )
     
+    return buy_date, "\n".join([
+        "BEGIN:VEVENT",
+        f"DTSTART;VALUE=DATE:{dt_start}",
+        f"DTEND;VALUE=DATE:{dt_end}",
+        f"SUMMARY:🔔 [{name}] 배당락 D-4 (매수 권장)",
+        f"DESCRIPTION:{description}",
+        "END:VEVENT"
+    ])
+
+def iter_portfolio_ics(portfolio_data, years=1, today=None):
+    """
+    포트폴리오 캘린더(.ics)를 VEVENT 단위로 순차 생성 (years: 올해 포함 몇 년치 일정)
+    """
+    today = today or datetime.date.today()
+    last_year = today.year + max(int(years), 1) - 1
+    months = (last_year - today.year) * 12 + (12 - today.month) + 1  # 기간 내 최대 회차
+
+    yield _ICS_HEADER
     for item in portfolio_data:
         name = item.get('종목', '배당주')
         date_info = str(item.get('배당락일', '-')).strip()
         if date_info in ['-', 'nan', 'None', '']: continue
+        category = item.get('분류', '국내')
+        market = business_calendar.market_of(category)
+        item_last_year = min(last_year, business_calendar.last_reliable_year(market, today))  # 휴장일 표가 있는 연도까지만
 
-        is_end_of_month = any(k in date_info for k in ['말일', '월말', '마지막', '30일', '31일', '하순'])
-        is_start_of_month = any(k in date_info for k in ['매월 초', '월초', '1~3일'])
-        day_match = re.search(r'(\d+)', date_info)
-        
-        target_day = None
-        if is_end_of_month: target_day = 'END'
-        elif is_start_of_month: target_day = 1
-        elif day_match:
-            target_day = int(day_match.group(1))
-        
-        fixed_date_obj = None
-        if '-' in date_info or '.' in date_info:
-             parsed = parse_dividend_date(date_info)
-             if parsed: fixed_date_obj = parsed
-
-        # 향후 12개월 일정 생성
-        if target_day is not None or fixed_date_obj:
-            check_idx = 0
-            if fixed_date_obj:
-                 pass 
-
-            while check_idx < 12:
-                month_calc = today.month + check_idx
-                year = current_year + (month_calc - 1) // 12
-                month = (month_calc - 1) % 12 + 1
-                check_idx += 1 
-                
-                if year > current_year: break
-                
-                try:
-                    last_day_of_month = calendar.monthrange(year, month)[1]
-                    
-                    if target_day == 'END':
-                        safe_day = last_day_of_month
-                    elif isinstance(target_day, int):
-                        safe_day = min(target_day, last_day_of_month)
-                    else:
-                        continue 
-                    
-                    event_date = datetime.date(year, month, safe_day)
-                    
-                    # D-4 매수 권장일 계산 (주말 제외)
-                    buy_date = event_date - datetime.timedelta(days=4)
-                    while buy_date.weekday() >= 5: 
-                        buy_date -= datetime.timedelta(days=1)
-                    
-                    if buy_date < today: continue
-                        
-                    dt_start = buy_date.strftime("%Y%m%d")
-                    dt_end = (buy_date + datetime.timedelta(days=1)).strftime("%Y%m%d")
-                    
-                    description = (
-                        f"예상 배당락일: {event_date}\\n\\n"
-                        f"💰 [{name}] 배당 수령을 위해 계좌를 확인하세요.\\n\\n"
-                        f"🛑 [필독] 투자 유의사항\\n"
-                        f"이 알림은 과거 데이터를 기반으로 생성된 '예상 일정'입니다.\\n"
-                        f"운용사 정책 변경으로 실제 배당일이 바뀔 수 있습니다.\\n"
-                        f"안전한 투자를 위해, 매수 전 반드시 '운용사 공식 홈페이지' 공시를 확인해주세요."
-                    )
-                    
-                    ics_content.extend([
-                        "BEGIN:VEVENT",
-                        f"DTSTART;VALUE=DATE:{dt_start}",
-                        f"DTEND;VALUE=DATE:{dt_end}",
-                        f"SUMMARY:🔔 [{name}] 배당락 D-4 (매수 권장)",
-                        f"DESCRIPTION:{description}",
-                        "END:VEVENT"
-                    ])
-                    
-                except ValueError:
-                    continue
+        # 로드 시 계산된 배당락일목록(12회)으로 충분하면 그대로, 부족하면 규칙 조회
+        ex_dates = item.get('배당락일목록') or ()
+        if months > len(ex_dates):
+            ex_dates = dividend_calendar.next_ex_dates(date_info, today, count=months, market=market)
 
-    ics_content.append("END:VCALENDAR")
-    return "\n".join(ics_content)
+        for event_date in ex_dates:
+            if event_date.year > item_last_year:
+                if event_date.year <= last_year: business_calendar.warn_unlisted_year(market, event_date.year)
+                break
 
-def get_google_cal_url(stock_name, date_str):
+            buy_date, event = _ics_event(name, event_date, category)
+            if buy_date < today: continue
+            yield event
+
+    yield "END:VCALENDAR"
+
+def generate_portfolio_ics(portfolio_data, years=1):
+    """
+    전체 포트폴리오 캘린더 파일(.ics) 생성 (D-4 알림 포함)
+    * 다운로드 버튼에 functools.partial로 넘기면 클릭 시에만 생성됨
+    """
+    return "\n".join(iter_portfolio_ics(portfolio_data, years))
+
+def get_google_cal_url(stock_name, date_str, category='국내'):
     """
     구글 캘린더 등록 링크 생성 (단건)
     """
     try:
-        target_date = parse_dividend_date(date_str)
+        target_date = parse_dividend_date(date_str, category)
         if not target_date: return None
         
         if isinstance(target_date, datetime.date):
-            safe_buy_date = target_date - datetime.timedelta(days=4) 
+            safe_buy_date = buy_date_before(target_date, category)
         else:
             return None
 
-        while safe_buy_date.weekday() >= 5:
-            safe_buy_date -= datetime.timedelta(days=1)
-
         start_str = safe_buy_date.strftime("%Y%m%d")
         end_str = (safe_buy_date + datetime.timedelta(days=1)).strftime("%Y%m%d")
         
@@ -245,7 +179,7 @@ def _fetch_naver_price(code):
     try:
         headers = {"User-Agent": "Mozilla/5.0", "Referer": "https://m.stock.naver.com/"}
         url = f"https://api.stock.naver.com/etf/{code}/basic"
-        res = requests.get(url, headers=headers, timeout=2)
+        res = http_client.get(url, headers=headers, timeout=2)
         if res.status_code == 200:
             data = res.json()
             if 'result' in data and 'closePrice' in data['result']:
@@ -316,37 +250,183 @@ def get_safe_price(broker, code, category):
         time.sleep(0.3)
     return None
 
+def _fetch_naver_prices_bulk(codes, chunk_size=40):
+    """
+    네이버 실시간 폴링 API 일괄 가격 조회 (여러 종목을 요청 1회로)
+    Returns: {코드: 가격}
+    """
+    prices = {}
+    headers = {"User-Agent": "Mozilla/5.0", "Referer": "https://finance.naver.com/"}
+
+    for i in range(0, len(codes), chunk_size):
+        chunk = codes[i:i + chunk_size]
+        try:
+            url = f"https://polling.finance.naver.com/api/realtime?query=SERVICE_ITEM:{','.join(chunk)}"
+            res = http_client.get(url, headers=headers, timeout=3)
+            if res.status_code != 200: continue
+
+            areas = res.json().get('result', {}).get('areas', [])
+            for area in areas:
+                for item in area.get('datas', []):
+                    code, price = str(item.get('cd', '')).strip(), item.get('nv')
+                    if code and price: prices[code] = int(price)
+        except Exception as e:
+            # [방어 운전] 묶음 단위 실패 시 해당 묶음만 건너뜀 (개별 백업 경로로 넘어감)
+            logger.debug(f"Naver Bulk Price Fail ({len(chunk)} codes): {e}")
+    return prices
+
+def _fetch_yf_prices_bulk(tickers):
+    """
+    YFinance 일괄 다운로드 (해외 전 종목을 요청 1회로)
+    Returns: {티커: 가격}
+    """
+    if not tickers: return {}
+
+    for attempt in range(3):
+        try:
+            data = yf.download(tickers, period="5d", progress=False, threads=True, auto_adjust=False)
+            if data is None or data.empty: return {}
+
+            close = data['Close']
+            if isinstance(close, pd.Series): close = close.to_frame(name=tickers[0])
+            last = close.ffill().iloc[-1]
+            return {str(t): float(p) for t, p in last.items() if pd.notna(p) and p > 0}
+
+        except sqlite3.OperationalError:
+            # DB 잠금 에러 발생 시 대기 후 재시도
+            if attempt < 2: time.sleep(0.5)
+        except Exception as e:
+            logger.warning(f"YFinance Bulk Download Fail ({len(tickers)} tickers): {e}")
+            break
+    return {}
+
+def fetch_prices_batch(broker, items):
+    """
+    [일괄 가격 엔진] (코드, 분류) 목록을 데이터 소스별로 묶어 한 번에 조회
+    - 국내: 네이버 일괄 조회 -> (누락분) 한투 API -> (누락분) YFinance(.KS) 일괄
+    - 해외: YFinance 일괄 다운로드 -> (누락분) 개별 조회
+    Returns: {(코드, 분류): 가격 또는 None}
+    """
+    domestic = sorted({code for code, cat in items if cat == '국내' and code})
+    overseas = sorted({code for code, cat in items if cat != '국내' and code})
+
+    # 1. 국내: 묶음 요청으로 대부분 해결
+    dom_prices = _fetch_naver_prices_bulk(domestic)
+
+    missing = [c for c in domestic if c not in dom_prices]
+    if missing and broker is not None:
+        def _kis(code):
+            try:
+                resp = broker.fetch_price(code)
+                if resp and isinstance(resp, dict) and resp.get('output') and resp['output'].get('stck_prpr'):
+                    return code, int(resp['output']['stck_prpr'])
+            except Exception as e:
+                logger.warning(f"KIS Price Error ({code}): {e}")
+            return code, None
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            for code, price in executor.map(_kis, missing):
+                if price: dom_prices[code] = price
+        missing = [c for c in domestic if c not in dom_prices]
+
+    if missing:
+        ks_prices = _fetch_yf_prices_bulk([f"{c}.KS" for c in missing])
+        for c in missing:
+            if ks_prices.get(f"{c}.KS"): dom_prices[c] = ks_prices[f"{c}.KS"]
+
+    # 2. 해외: 전 종목 1회 다운로드 후 누락분만 개별 재시도
+    ovs_prices = _fetch_yf_prices_bulk(overseas)
+    for code in overseas:
+        if code not in ovs_prices:
+            ovs_prices[code] = get_safe_price(broker, code, '해외')
+
+    return {
+        (code, cat): (dom_prices.get(code) if cat == '국내' else ovs_prices.get(code))
+        for code, cat in items
+    }
+
 def classify_asset(row):
     """종목명 기반 자산 유형 분류 (커버드콜, 리츠, 채권 등)"""
-    name, symbol = str(row.get('종목명', '')).upper(), str(row.get('종목코드', '')).upper()
-    
-    if any(k in name or k in symbol for k in ['커버드콜', 'COVERED', 'QYLD', 'JEPI', 'JEPQ', 'NVDY', 'TSLY', 'QQQI', '타겟위클리']): return '🛡️ 커버드콜'
-    if any(k in name or k in symbol for k in ['채권', '국채', 'BOND', 'TLT', '하이일드', 'HI-YIELD']): return '🏦 채권형'
-    if '리츠' in name or 'REITS' in name or 'INFRA' in name or '인프라' in name: return '🏢 리츠형'
-    if '혼합' in name: return '⚖️ 혼합형'
-    return '📈 주식형'
+    return classifier.classify(row.get('종목명', ''), row.get('종목코드', '')).asset_type
 
 def get_hedge_status(name, category):
     """환헤지 여부 판별"""
-    name_str = str(name).upper()
-    if category == '해외': return "💲달러(직투)"
-    if "환노출" in name_str or "UNHEDGED" in name_str: return "⚡환노출"
-    if any(x in name_str for x in ["(H)", "헤지"]): return "🛡️환헤지(H)"
-    return "⚡환노출" if any(x in name_str for x in ['미국', 'GLOBAL', 'S&P500', '나스닥', '국제']) else "-"
+    return classifier.classify(name, '', category).hedge
+
+def classify_asset_vec(names, symbols):
+    """classify_asset 의 벡터 버전 (종목명/종목코드 Series -> 자산 유형 Series)"""
+    return pd.Series([classifier.classify(n, s).asset_type for n, s in zip(names, symbols)], index=names.index)
+
+def get_hedge_status_vec(names, categories):
+    """get_hedge_status 의 벡터 버전"""
+    return pd.Series([classifier.classify(n, '', c).hedge for n, c in zip(names, categories)], index=names.index)
 
 
 # =============================================================================
 # [SECTION 3] 메인 데이터 로드 및 처리 (우선순위 엔진)
 # =============================================================================
 
-@st.cache_data(ttl=1800, show_spinner=False)
+def _fetch_prices_for_cache(items):
+    """가격 캐시용 일괄 조회 함수 (공용 브로커 풀 사용)"""
+    return fetch_prices_batch(broker_pool.get_broker(), items)
+
+class _ProcessedStore:
+    """가공 데이터 공유 보관소 {(원본 버전, 관리자 여부): (가격 캐시 세대, 가공 데이터, 가격 조회 항목)} (최근 N개)"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None: self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > C.PROCESSED_DATA_CACHE_SIZE: self._entries.popitem(last=False)
+
+@st.cache_resource
+def _get_processed_store():
+    return _ProcessedStore()
+
+def _raw_version(df_raw):
+    """원본 데이터 내용 지문 (관리자 수정 등으로 값이 바뀌면 달라짐)"""
+    values = pd.util.hash_pandas_object(df_raw.astype(str), index=True).to_numpy()
+    return hash((tuple(df_raw.columns), values.tobytes()))
+
 def load_and_process_data(df_raw, is_admin=False):
     """
     CSV 데이터를 불러와 포맷팅하고, 우선순위 로직에 따라 최종 표시 값을 결정함.
     [우선순위] 신규상장 > Auto(크롤링) > TTM(과거실적) > Manual(수동)
+    * 결과는 (원본 버전, 가격 캐시 세대) 단위로 프로세스 공유 -> 같은 데이터면 rerun/세션이 달라도 같은 DataFrame 객체
+      (UniverseIndex 등 객체 기준 캐시가 그대로 적중, 반환된 DataFrame은 수정하지 말 것)
+    * 캐시 적중 시에도 가격 캐시를 확인해 만료 가격은 백그라운드 갱신 -> 갱신되면 세대가 바뀌어 다음 호출에서 재가공
     """
     if df_raw.empty: return pd.DataFrame()
 
+    cache, store = price_cache.get_price_cache(), _get_processed_store()
+    key = (_raw_version(df_raw), is_admin)
+    entry = store.get(key)
+    if entry is not None:
+        generation, result, items = entry
+        cache.get_prices(items, _fetch_prices_for_cache)
+        if generation == cache.generation: return result
+
+    result, items, generation = _process_data(df_raw, is_admin)
+    store.put(key, (generation, result, items))
+    return result
+
+def _process_data(df_raw, is_admin):
+    """
+    가공 본체 -> (가공 데이터, 가격 조회 항목 [(코드, 분류), ...], 가격을 읽은 시점의 캐시 세대)
+    * 가격은 세션 공유 캐시(price_cache)에서 읽으므로 df_raw가 바뀌어도 재조회하지 않음
+    * 행 단위 반복 없이 전체 프레임을 벡터 연산으로 처리 (네트워크 구간은 가격 조회 1곳)
+    """
+
     # 1. 컬럼명 공백 제거
     df_raw.columns = df_raw.columns.str.strip()
     
@@ -376,116 +456,97 @@ def load_and_process_data(df_raw, is_admin=False):
     except Exception as e:
         logger.error(f"Data Preprocessing Error: {e}")
 
-    # 2. 브로커(한투 API) 초기화
-    try:
-        broker = mojito.KoreaInvestment(
-            api_key=st.secrets["kis"]["app_key"],
-            api_secret=st.secrets["kis"]["app_secret"],
-            acc_no=st.secrets["kis"]["acc_no"],
-            mock=True 
+    # 2. [1단계: 벡터 연산] 가격과 무관한 컬럼을 전체 프레임에 대해 한 번에 계산
+    def col(name, default):
+        return df_raw[name].astype(str) if name in df_raw.columns else pd.Series(default, index=df_raw.index)
+
+    def num(name):
+        return df_raw[name].astype(float) if name in df_raw.columns else pd.Series(0.0, index=df_raw.index)
+
+    codes = col('종목코드', '').str.strip()
+    names = col('종목명', '').str.strip()
+    categories = df_raw['분류'].fillna('국내').astype(str).str.strip() if '분류' in df_raw.columns else pd.Series('국내', index=df_raw.index)
+    is_domestic = (categories == '국내').to_numpy()
+
+    auto_val = num('연배당금_크롤링_auto').to_numpy()
+    ttm_rate = num('TTM_연배당률(크롤링)').to_numpy()
+    manual_val = num('연배당금').to_numpy()
+    old_crawled = num('연배당금_크롤링').to_numpy()
+    months = num('신규상장개월수').astype(int).to_numpy()
+
+    asset_types = classify_asset_vec(names, codes)
+    csv_types = col('유형', '-')
+    final_types = np.select(
+        [asset_types.str.contains('채권'), asset_types.str.contains('커버드콜'), asset_types.str.contains('리츠')],
+        ['채권', '커버드콜', '리츠'], default=csv_types
+    )
+
+    # 3. [2단계: 네트워크] 가격 조회 (세션 공유 캐시 -> 없는 종목만 분류/데이터 소스별 일괄 조회)
+    items = list(dict.fromkeys(zip(codes, categories)))
+    price_map, generation = price_cache.get_price_cache().get_prices(items, _fetch_prices_for_cache, with_generation=True)
+    price = np.array([price_map.get(key) or 0 for key in zip(codes, categories)], dtype=float)
+
+    # 4. [핵심] 표시 우선순위 결정 (행 단위 if/elif 대신 마스크로 일괄 결정)
+    # 0순위: 신규 상장주 (초기 데이터 부족 시 수동 월할 계산)
+    # 1순위: Auto (자동 크롤링 값, -1.0이면 잠금 처리되어 건너뜀)
+    # 2순위: TTM (과거 12개월 실적 기반 역산)
+    # 3순위: 수동 입력값
+    # 4순위: 구버전 크롤링 데이터
+    is_new = (months > 0) & (months < 12) & (manual_val > 0)
+    is_auto = ~is_new & (auto_val > 0)
+    is_ttm = ~is_new & ~is_auto & (ttm_rate > 0) & (price > 0)
+    is_manual = ~is_new & ~is_auto & ~is_ttm & (manual_val > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        target_div = np.select(
+            [is_new, is_auto, is_ttm, is_manual],
+            [manual_val / np.where(months > 0, months, 1) * 12, auto_val, price * (ttm_rate / 100), manual_val],
+            default=old_crawled
         )
-    except:
-        broker = None
-
-    results = [None] * len(df_raw)
-    
-    # 3. 행별 병렬 처리 함수
-    def process_row(idx, row):
-        try:
-            code = str(row.get('종목코드', '')).strip()
-            name = str(row.get('종목명', '')).strip()
-            category = str(row.get('분류', '국내')).strip()
-            
-            # 가격 조회
-            price = get_safe_price(broker, code, category)
-            if not price: price = 0 
-
-            # 데이터 추출
-            auto_val = float(row.get('연배당금_크롤링_auto', 0) or 0)
-            ttm_rate = float(row.get('TTM_연배당률(크롤링)', 0) or 0)
-            manual_val = float(row.get('연배당금', 0) or 0)
-            old_crawled = float(row.get('연배당금_크롤링', 0) or 0)
-            months = int(row.get('신규상장개월수', 0))
-
-            # [핵심] 표시 우선순위 결정 로직
-            # 0순위: 신규 상장주 (초기 데이터 부족 시 수동 월할 계산)
-            if 0 < months < 12 and manual_val > 0:
-                target_div = (manual_val / months) * 12
-                display_name = f"{name} ⭐({months}개월)"
-            
-            # 1순위: Auto (자동 크롤링 값, -1.0이면 잠금 처리되어 건너뜀)
-            elif auto_val > 0: 
-                target_div = auto_val
-                display_name = name
-                
-            # 2순위: TTM (과거 12개월 실적 기반 역산)
-            elif ttm_rate > 0 and price > 0: 
-                target_div = price * (ttm_rate / 100)
-                display_name = f"{name} (TTM)"
-                
-            # 3순위: 수동 입력값
-            elif manual_val > 0: 
-                target_div = manual_val
-                display_name = name
-                
-            # 4순위: 구버전 크롤링 데이터
-            else: 
-                target_div = old_crawled
-                display_name = name
-
-            # 수익률 계산
-            yield_val = (target_div / price * 100) if price > 0 else 0
-
-            if is_admin and (yield_val < 2.0 or yield_val > 25.0): display_name = f"🚫 {display_name}"
-
-            # 포맷팅
-            if category == '국내':
-                price_fmt = f"{int(price):,}원"
-                div_fmt = f"{int(target_div):,}원"
-            else:
-                price_fmt = f"${price:.2f}"
-                div_fmt = f"${target_div:.2f}"
-
-            csv_type = str(row.get('유형', '-'))
-            auto_asset_type = classify_asset(row) 
-            
-            final_type = csv_type
-            if '채권' in auto_asset_type: final_type = '채권'
-            elif '커버드콜' in auto_asset_type: final_type = '커버드콜'
-            elif '리츠' in auto_asset_type: final_type = '리츠'
-
-            return idx, {
-                '코드': code, 
-                '종목명': display_name,
-                '연배당금': div_fmt,
-                '블로그링크': str(row.get('블로그링크', '#')),
-                '금융링크': f"https://finance.naver.com/item/main.naver?code={code}" if category == '국내' else f"https://finance.yahoo.com/quote/{code}",
-                '현재가': price_fmt, 
-                '연배당률': yield_val,
-                '환구분': get_hedge_status(name, category),
-                '배당락일': str(row.get('배당락일', '-')), 
-                '분류': category,
-                '유형': final_type, 
-                '자산유형': auto_asset_type,
-                '캘린더링크': None, 
-                'pure_name': name.replace("🚫 ", "").replace(" (필터대상)", ""), 
-                '신규상장개월수': months,
-                '배당기록': str(row.get('배당기록', '')),
-                '검색라벨': str(row.get('검색라벨', f"[{code}] {display_name}"))
-            }
-        except Exception as e:
-            logger.error(f"Row Processing Error ({idx}): {e}")
-            return idx, None
-
-    # ThreadPool로 병렬 실행
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(process_row, idx, row): idx for idx, row in df_raw.iterrows()}
-        for future in as_completed(futures):
-            idx, result = future.result()
-            results[idx] = result
-
-    final_data = [r for r in results if r is not None]
-    return pd.DataFrame(final_data).sort_values('연배당률', ascending=False) if final_data else pd.DataFrame()
+        yield_val = np.where(price > 0, target_div / np.where(price > 0, price, 1) * 100, 0.0)
+
+    display_names = np.where(is_new, names + " ⭐(" + pd.Series(months, index=df_raw.index).astype(str) + "개월)",
+                             np.where(is_ttm, names + " (TTM)", names))
+    if is_admin:
+        display_names = np.where((yield_val < 2.0) | (yield_val > 25.0), "🚫 " + pd.Series(display_names), display_names)
+
+    # 5. 결과 조립 (금액은 숫자로 유지, 통화 표시는 universe.view에서)
+    search_labels = col('검색라벨', '').to_numpy() if '검색라벨' in df_raw.columns else \
+        ("[" + codes + "] " + pd.Series(display_names, index=df_raw.index)).to_numpy()
+
+    result = pd.DataFrame({
+        '코드': codes.to_numpy(),
+        '종목명': display_names,
+        '연배당금': target_div,
+        '블로그링크': col('블로그링크', '#').to_numpy(),
+        '금융링크': np.where(is_domestic, "https://finance.naver.com/item/main.naver?code=" + codes, "https://finance.yahoo.com/quote/" + codes),
+        '현재가': price,
+        '연배당률': yield_val,
+        '환구분': get_hedge_status_vec(names, categories).to_numpy(),
+        '배당락일': col('배당락일', '-').to_numpy(),
+        '분류': categories.to_numpy(),
+        '유형': final_types,
+        '자산유형': asset_types.to_numpy(),
+        'pure_name': names.str.replace("🚫 ", "", regex=False).str.replace(" (필터대상)", "", regex=False).to_numpy(),
+        '신규상장개월수': months,
+        '배당기록': col('배당기록', '').to_numpy(),
+        '검색라벨': search_labels
+    })
+    # 배당락일 규칙/시기/향후 일정 컬럼 (고유 문구별 1회 계산, 이후 화면에서는 조회만)
+    result = universe.to_universe(dividend_calendar.normalize_calendar(result))
+    if result.empty: return pd.DataFrame(), items, generation
+
+    result = result.sort_values('연배당률', ascending=False)
+    if not is_admin: snapshot.save_snapshot_if_stale(result)
+    return result, items, generation
+
+def load_snapshot_data():
+    """CSV를 읽을 수 없을 때 마지막 스냅샷의 가공 데이터로 대체 (없으면 빈 DataFrame)"""
+    loaded = snapshot.load_snapshot(max_age=float('inf'))
+    if not loaded: return pd.DataFrame()
+    df, _, meta = loaded
+    logger.warning(f"💾 CSV 대신 스냅샷 사용 (저장 시각: {datetime.datetime.fromtimestamp(meta['saved_at']):%Y-%m-%d %H:%M})")
+    return df
 
 
 # =============================================================================
@@ -565,13 +626,7 @@ def fetch_dividend_yield_hybrid(code, category):
         current_price = 0
         resp = None
         try:
-            broker = mojito.KoreaInvestment(
-                api_key=st.secrets["kis"]["app_key"],
-                api_secret=st.secrets["kis"]["app_secret"],
-                acc_no=st.secrets["kis"]["acc_no"],
-                mock=True
-            )
-            resp = broker.fetch_price(code)
+            resp = broker_pool.get_broker().fetch_price(code)
             if resp and 'output' in resp:
                 current_price = float(resp['output'].get('stck_prpr', 0) or 0)
         except Exception as e:
@@ -592,7 +647,7 @@ def fetch_dividend_yield_hybrid(code, category):
                 "Referer": f"https://m.stock.naver.com/domestic/stock/{code}/analysis"
             }
             hist_url = f"https://m.stock.naver.com/api/etf/{code}/dividend/history?page=1&pageSize=200&firstPageSize=200"
-            r = requests.get(hist_url, headers=headers, timeout=6)
+            r = http_client.get(hist_url, headers=headers, timeout=6)
             if r.status_code == 200:
                 j = r.json()
                 items = []
@@ -711,6 +766,17 @@ def fetch_dividend_yield_hybrid(code, category):
 # [SECTION 7] 스마트 업데이트 (전체 종목 갱신)
 # =============================================================================
 
+def _parse_dividend_items(j):
+    """네이버 배당 내역 응답(JSON)에서 항목 리스트 추출 (응답 구조 편차 대응)"""
+    items = []
+    if isinstance(j, dict):
+        items = j.get("result") or j.get("items") or j.get("data") or []
+        if isinstance(items, dict): 
+            items = items.get("items") or []
+    elif isinstance(j, list):
+        items = j
+    return items if isinstance(items, list) else []
+
 def _fetch_domestic_sensor(code):
     """국내 ETF 센서: 네이버 API 파싱"""
     from datetime import datetime, timedelta
@@ -724,25 +790,18 @@ def _fetch_domestic_sensor(code):
         # 현재가
         price = 0
         price_url = f"https://api.stock.naver.com/etf/{code}/basic"
-        r_p = requests.get(price_url, headers=headers, timeout=5)
+        r_p = http_client.get(price_url, headers=headers, timeout=5)
         if r_p.status_code == 200:
             price = float(r_p.json().get('result', {}).get('closePrice', 0))
 
         # 배당 내역
         hist_url = f"https://m.stock.naver.com/api/etf/{code}/dividend/history?page=1&pageSize=200&firstPageSize=200"
-        res = requests.get(hist_url, headers=headers, timeout=5)
+        res = http_client.get(hist_url, headers=headers, timeout=5)
 
         auto_amt, ttm_rate = 0.0, 0.0
 
         if res.status_code == 200:
-            j = res.json()
-            items = []
-            if isinstance(j, dict):
-                items = j.get("result") or j.get("items") or j.get("data") or []
-                if isinstance(items, dict): 
-                    items = items.get("items") or []
-            elif isinstance(j, list):
-                items = j
+            items = _parse_dividend_items(res.json())
 
             if items:
                 # [Auto] 최신 배당금 연환산
@@ -839,6 +898,78 @@ def _fetch_overseas_sensor(code):
         logger.debug(f"Overseas Sensor Error ({code}): {e}")
         return 0.0, 0.0
 
+def _load_fingerprints():
+    """종목별 배당 지문(최근 지급일/금액/ETag) 로드"""
+    try:
+        with open(C.DIVIDEND_FINGERPRINT_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _save_fingerprints(fingerprints):
+    try:
+        with open(C.DIVIDEND_FINGERPRINT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fingerprints, f, ensure_ascii=False)
+    except Exception as e:
+        logger.warning(f"Fingerprint Save Fail: {e}")
+
+def _probe_domestic_fingerprint(code, etag=None):
+    """
+    국내 ETF 최신 지급 1건만 조회하여 지문 생성 (전체 200건 대신 1건)
+    - 저장된 ETag가 있으면 조건부 요청 (304 = 변경 없음)
+    Returns: {'date', 'amount', 'etag'} / 변경 없음이면 {'not_modified': True} / 실패 시 None
+    """
+    headers = {
+        "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X)",
+        "Referer": f"https://m.stock.naver.com/domestic/stock/{code}/analysis"
+    }
+    if etag: headers["If-None-Match"] = etag
+
+    try:
+        url = f"https://m.stock.naver.com/api/etf/{code}/dividend/history?page=1&pageSize=1&firstPageSize=1"
+        res = http_client.get(url, headers=headers, timeout=5)
+        if res.status_code == 304: return {'not_modified': True}
+        if res.status_code != 200: return None
+
+        items = _parse_dividend_items(res.json())
+        if not items: return None
+        first = items[0]
+        amount = next((str(first[k]).replace(',', '') for k in ("dividendAmount", "dividend", "distribution", "amount", "value", "payAmount") if first.get(k) is not None), '')
+        return {
+            'date': str(first.get('playDate') or first.get('date', '')),
+            'amount': amount,
+            'etag': res.headers.get('ETag')
+        }
+    except Exception as e:
+        logger.debug(f"Domestic Probe Error ({code}): {e}")
+        return None
+
+def _probe_overseas_fingerprints(codes):
+    """
+    해외 전 종목의 최근 배당을 1회 일괄 다운로드로 조회하여 지문 생성
+    Returns: {티커: {'date', 'amount'}} (배당 기록이 없거나 실패한 종목은 제외)
+    """
+    if not codes: return {}
+    try:
+        data = yf.download(codes, period="3mo", actions=True, progress=False, threads=True)
+        if data is None or data.empty or 'Dividends' not in data.columns.get_level_values(0): return {}
+
+        divs = data['Dividends']
+        if isinstance(divs, pd.Series): divs = divs.to_frame(name=codes[0])
+
+        fingerprints = {}
+        for code, series in divs.items():
+            paid = series[series.fillna(0) > 0]
+            if not paid.empty:
+                fingerprints[str(code)] = {'date': str(paid.index[-1].date()), 'amount': f"{float(paid.iloc[-1]):.6f}"}
+        return fingerprints
+    except Exception as e:
+        logger.warning(f"Overseas Probe Fail ({len(codes)} tickers): {e}")
+        return {}
+
+def _same_fingerprint(old, new):
+    return bool(old and new) and old.get('date') == new.get('date') and old.get('amount') == new.get('amount')
+
 def reset_auto_data(code):
     """Auto 데이터를 -1.0으로 설정하여 스마트 갱신에서 보호(잠금)"""
     try:
@@ -856,17 +987,69 @@ def reset_auto_data(code):
     except Exception as e:
         return False, f"❌ 오류 발생: {e}"
 
-def smart_update_and_save(target_names=None, progress_callback=None):
+class _AsyncRateLimiter:
+    """호스트(데이터 소스)별 최소 요청 간격 보장 (asyncio용)"""
+
+    def __init__(self, min_interval):
+        self._interval = min_interval
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0: await asyncio.sleep(delay)
+
+
+async def _crawl_sensors(jobs, on_result, fingerprints=None):
+    """
+    [비동기 크롤러] 센서 호출을 데이터 소스별 동시 실행 수/요청 간격 제한 하에 병렬 실행
+    - jobs: [(idx, code, category, fingerprint), ...]
+    - on_result: 완료되는 순서대로 (idx, val, rate, error, fingerprint) 를 전달받는 콜백
+      (val이 None이면 배당 내역 변경 없음으로 건너뛴 종목)
+    - fingerprints: 저장된 지문 (주어지면 국내 종목은 최신 1건만 먼저 확인하여 변경 시에만 전체 조회)
+    """
+    semaphores = {src: asyncio.Semaphore(n) for src, n in C.SENSOR_CONCURRENCY.items()}
+    limiters = {src: _AsyncRateLimiter(t) for src, t in C.SENSOR_MIN_INTERVAL.items()}
+
+    async def _run(idx, code, category, fingerprint):
+        src = '국내' if category == '국내' else '해외'
+        sensor = _fetch_domestic_sensor if src == '국내' else _fetch_overseas_sensor
+        async with semaphores[src]:
+            try:
+                if fingerprints is not None and src == '국내':
+                    saved = fingerprints.get(code)
+                    await limiters[src].wait()
+                    fingerprint = await asyncio.to_thread(_probe_domestic_fingerprint, code, (saved or {}).get('etag'))
+                    if fingerprint and (fingerprint.get('not_modified') or _same_fingerprint(saved, fingerprint)):
+                        return idx, None, None, None, saved
+
+                await limiters[src].wait()
+                val, rate = await asyncio.to_thread(sensor, code)
+                return idx, val, rate, None, fingerprint
+            except Exception as e:
+                return idx, 0.0, 0.0, e, None
+
+    tasks = [asyncio.create_task(_run(*job)) for job in jobs]
+    for future in asyncio.as_completed(tasks):
+        on_result(*(await future))
+
+
+def smart_update_and_save(target_names=None, progress_callback=None, incremental=True):
     """
     [리팩토링] 전체/선택 종목 배당 정보 업데이트
     - progress_callback: 진행 상황을 보고할 무전기 (함수)
     - UI 요소(st.progress 등) 제거됨
+    - 센서 호출은 비동기 크롤러로 병렬 실행, 완료되는 순서대로 진행 상황 보고
+    - incremental: 저장된 배당 지문(최근 지급일/금액)과 비교하여 새 지급이 있는 종목만 재계산
+    Returns: (성공 여부, 메시지, 실패 종목, 갱신된 df, 갱신된 지문 또는 None)
     """
-    import time
-    
     try:
         df = load_stock_data_from_csv()
-        if df.empty: return False, "❌ CSV 파일을 찾을 수 없습니다.", [], None
+        if df.empty: return False, "❌ CSV 파일을 찾을 수 없습니다.", [], None, None
         
         if 'TTM_연배당률(크롤링)' not in df.columns:
             df['TTM_연배당률(크롤링)'] = 0.0
@@ -877,84 +1060,105 @@ def smart_update_and_save(target_names=None, progress_callback=None):
         else:
             total_count = len(df)
 
-        success_count = 0
-        fail_count = 0
-        protected_count = 0
+        counts = {'success': 0, 'fail': 0, 'protected': 0, 'unchanged': 0, 'progress': 0}
+        fingerprints = _load_fingerprints() if incremental else None
         failed_list = []
-        
-        # [수정 2] 진행률 바를 위한 별도 카운터
-        progress_idx = 0
+        jobs = []
+
+        def report(name):
+            counts['progress'] += 1
+            if progress_callback:
+                # (진행률 0.0~1.0,  메시지 텍스트)
+                progress_callback(min(counts['progress'] / total_count, 1.0), f"🔄 [{counts['progress']}/{total_count}] {name} 데이터 수집 완료")
 
         for idx, row in df.iterrows():
-            code = str(row['종목코드']).strip()
             name = row['종목명']
-            category = str(row.get('분류', '국내')).strip()
             
             # [수정 3] 선택된 목록에 없으면 건너뛰기
             if target_names and name not in target_names:
                 continue
-            
-            # -----------------------------------------------------------
-            # [핵심] 무전기(Callback)로 진행 상황 보고하기
-            # -----------------------------------------------------------
-            progress_idx += 1
-            if progress_callback:
-                # (진행률 0.0~1.0,  메시지 텍스트)
-                progress_callback(progress_idx / total_count, f"🔄 [{progress_idx}/{total_count}] {name} 데이터 수집 중...")
-            # -----------------------------------------------------------
 
             # 신규 상장 종목은 건너뜀
             try: months = int(row.get('신규상장개월수', 0))
             except: months = 0
             if 0 < months < 12:
-                protected_count += 1
+                counts['protected'] += 1
+                report(name)
                 continue
-            
+
+            jobs.append((idx, str(row['종목코드']).strip(), str(row.get('분류', '국내')).strip(), None))
+
+        def on_result(idx, val, rate, error, fingerprint):
+            name = df.at[idx, '종목명']
+            report(name)
+
+            if val is None:
+                counts['unchanged'] += 1
+                return
+
+            if error is not None:
+                logger.error(f"Sensor Error ({name}): {error}") # [수정] 로그 추가
+                counts['fail'] += 1
+                failed_list.append(name)
+                return
+
             # 잠금 상태 확인 (-1.0)
-            current_auto = float(row.get('연배당금_크롤링_auto', 0) or 0)
+            current_auto = float(df.at[idx, '연배당금_크롤링_auto'] or 0)
+            data_updated = False
             
-            try:
-                # 센서 작동
-                if category == '국내':
-                    val, rate = _fetch_domestic_sensor(code)
-                else:
-                    val, rate = _fetch_overseas_sensor(code)
-                
-                data_updated = False
-                
-                # 1) Auto 값 저장 (잠금 상태가 아닐 때만)
-                if current_auto == -1.0:
-                    pass 
-                elif val > 0:
-                    df.at[idx, '연배당금_크롤링_auto'] = float(val)
-                    data_updated = True
-                
-                # 2) TTM 값 저장 (무조건 최신화)
-                if rate > 0:
-                    df.at[idx, 'TTM_연배당률(크롤링)'] = float(rate)
-                    data_updated = True
-                
-                if data_updated:
-                    success_count += 1
-                elif current_auto == -1.0:
-                    protected_count += 1
-                else:
-                    fail_count += 1
-                    failed_list.append(name)
-                    
-            except Exception as e:
-                logger.error(f"Sensor Error ({name}): {e}") # [수정] 로그 추가
-                fail_count += 1
-                failed_list.append(name)
+            # 1) Auto 값 저장 (잠금 상태가 아닐 때만)
+            if current_auto == -1.0:
+                pass 
+            elif val > 0:
+                df.at[idx, '연배당금_크롤링_auto'] = float(val)
+                data_updated = True
+            
+            # 2) TTM 값 저장 (무조건 최신화)
+            if rate > 0:
+                df.at[idx, 'TTM_연배당률(크롤링)'] = float(rate)
+                data_updated = True
             
-            time.sleep(0.05) # 서버 부하 방지용 최소 대기
+            if data_updated:
+                counts['success'] += 1
+                code = df.at[idx, '종목코드']
+                if fingerprints is not None and fingerprint:
+                    fingerprints[str(code).strip()] = fingerprint
+            elif current_auto == -1.0:
+                counts['protected'] += 1
+            else:
+                counts['fail'] += 1
+                failed_list.append(name)
+
+        # 증분 모드: 해외 종목은 최근 배당을 일괄 조회하여 새 지급이 없는 종목 제외
+        if fingerprints is not None:
+            overseas = [job for job in jobs if job[2] != '국내']
+            probed = _probe_overseas_fingerprints([job[1] for job in overseas])
+            jobs = [job for job in jobs if job[2] == '국내']
+            for idx, code, category, _ in overseas:
+                if _same_fingerprint(fingerprints.get(code), probed.get(code)):
+                    on_result(idx, None, None, None, None)
+                else:
+                    jobs.append((idx, code, category, probed.get(code)))
+
+        # 센서 작동 (비동기 병렬)
+        asyncio.run(_crawl_sensors(jobs, on_result, fingerprints))
 
-        # [수정 4] 데이터(df) 반환
-        return True, f"✨ 완료! (성공:{success_count}, 실패:{fail_count}, 🔒보호:{protected_count})", failed_list, df
+        # [수정 4] 데이터(df) + 갱신된 지문 반환 (지문은 CSV 저장 성공 후에만 기록 -> save_smart_update)
+        return True, f"✨ 완료! (성공:{counts['success']}, 실패:{counts['fail']}, 🔒보호:{counts['protected']}, ⏭️변경없음:{counts['unchanged']})", failed_list, df, fingerprints
             
     except Exception as e:
         # [수정 5] 에러 시에도 형식을 맞춰서 반환
-        return False, f"오류 발생: {e}", [], None
+        return False, f"오류 발생: {e}", [], None, None
+
+def save_smart_update(df, fingerprints=None):
+    """
+    갱신된 데이터를 GitHub CSV에 저장한 뒤 배당 지문 기록
+    * 저장하지 않거나 실패하면 지문도 그대로 -> 다음 증분 갱신에서 해당 종목을 다시 조회
+    """
+    success, msg = save_to_github(df)
+    if success and fingerprints is not None:
+        _save_fingerprints(fingerprints)
+    return success, msg
 
 
 def update_dividend_rolling(current_history_str, new_dividend_amount):
@@ -0,0 +1,121 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: portfolio_metrics.py
+설명: 포트폴리오 지표 계산 커널 (계산기/로드맵/사이드바 공용, 비중 벡터 1회 연산 + 결과 메모)
+"""
+
+import weakref
+from functools import lru_cache
+from typing import NamedTuple
+import numpy as np
+import constants as C
+import universe
+
+TIMING_LABELS = ["월초(1~10일)", "월중(11~20일)", "월말(21~말일)"]
+_TIMING_BUCKET = np.array([0, 1, 2, 1])  # 배당시기 코드(early/mid/end/unknown) -> 버킷 (미정은 월중으로 집계)
+
+class PortfolioMetrics(NamedTuple):
+    avg_yield: float          # 가중 평균 연배당률 (세전, %)
+    net_yield: float          # 투자금 대비 세후 연배당률 (%)
+    total_y_gross: float      # 연 배당금 (세전/ISA)
+    total_y_net: float        # 연 배당금 (세후)
+    total_m_gross: float      # 월 배당금 (세전/ISA)
+    total_m_net: float        # 월 배당금 (세후)
+    timing_data: dict         # 입금 시기별 세후 연 배당금 {TIMING_LABELS: 금액}
+    user_expense_real: float  # 월 지출 (원)
+    coverage: float           # 생활비 방어율 (월 세후 배당 / 월 지출)
+    gap: float                # 월 부족액 (음수면 초과)
+    needed_capital: float     # 부족액을 메우는 데 필요한 추가 투자금
+
+def weight_vector(uni, weights):
+    """{종목명: 비중(%)} -> 유니버스 행 순서에 맞춘 비중 배열 (없는 종목/0 이하 비중은 제외)"""
+    w = np.zeros(len(uni.yields))
+    items = [(uni.pos(name), float(v)) for name, v in weights.items() if v and v > 0]
+    items = [(pos, v) for pos, v in items if pos is not None]
+    if items:
+        pos, vals = zip(*items)
+        np.add.at(w, np.array(pos, dtype=np.intp), vals)
+    return w
+
+_universes = weakref.WeakValueDictionary()  # {내용 지문: UniverseIndex} (메모 키에는 지문만 남겨 인덱스를 붙잡지 않음)
+
+@lru_cache(maxsize=C.PORTFOLIO_METRICS_MEMO_SIZE)
+def _compute(token, weights_key, total_invest, monthly_expense):
+    uni = _universes[token]
+    w = weight_vector(uni, dict(weights_key))
+
+    # 종목별 연 배당금 (세전) -> 시기별 합계는 bincount 1회
+    gross = total_invest * (w / 100) * (uni.yields / 100)
+    net = gross * C.AFTER_TAX_RATIO
+    buckets = np.bincount(_TIMING_BUCKET[uni.timing], weights=net, minlength=3)
+
+    total_y_gross, total_y_net = float(gross.sum()), float(net.sum())
+    total_m_net = total_y_net / 12
+    net_yield = (total_y_net / total_invest * 100) if total_invest > 0 else 0
+    user_expense_real = monthly_expense * 10000
+
+    coverage = (total_m_net / user_expense_real) if user_expense_real > 0 else 0
+    gap = user_expense_real - total_m_net
+    needed_capital = (gap * 12) / (net_yield / 100) if gap > 0 and net_yield > 0 else 0
+
+    return PortfolioMetrics(
+        avg_yield=float(w @ uni.yields) / 100,
+        net_yield=net_yield,
+        total_y_gross=total_y_gross,
+        total_y_net=total_y_net,
+        total_m_gross=total_y_gross / 12,
+        total_m_net=total_m_net,
+        timing_data=dict(zip(TIMING_LABELS, buckets.tolist())),
+        user_expense_real=user_expense_real,
+        coverage=coverage,
+        gap=gap,
+        needed_capital=needed_capital,
+    )
+
+def portfolio_metrics(df, weights, total_invest, monthly_expense=0):
+    """
+    포트폴리오 지표 일괄 계산 (같은 내용의 가공 데이터 + 같은 비중/금액이면 메모된 결과 반환)
+    - weights: {종목명: 비중(%)}, monthly_expense: 월 지출(만원)
+    """
+    uni = universe.get_index(df)
+    _universes[uni.token] = uni
+    weights_key = tuple(sorted((k, float(v)) for k, v in weights.items()))
+    return _compute(uni.token, weights_key, float(total_invest), float(monthly_expense))
+
+
+# =============================================================================
+# [SECTION 2] 저장된 포트폴리오 일괄 재평가
+# =============================================================================
+
+def evaluate_batch(df, portfolios):
+    """
+    저장된 포트폴리오를 현재 데이터로 일괄 재평가 (포트폴리오×종목 희소 비중 행렬 -> 1회 연산)
+    - portfolios: Supabase portfolios 행 목록 (ticker_data의 total_money/composition/monthly_expense 사용)
+    Returns: 입력 순서대로 summary dict 목록 {'monthly', 'yield', 'monthly_net', 'coverage', 'missing'}
+    """
+    uni = universe.get_index(df)
+    n = len(portfolios)
+    invest, expense, missing = np.zeros(n), np.zeros(n), np.zeros(n, dtype=np.int32)
+    rows, cols, vals = [], [], []
+
+    for i, p in enumerate(portfolios):
+        data = p.get('ticker_data') or {}
+        invest[i] = float(data.get('total_money') or 0)
+        expense[i] = float(data.get('monthly_expense') or 0)
+        for name, w in (data.get('composition') or {}).items():
+            if not w or float(w) <= 0: continue
+            pos = uni.pos(name)
+            if pos is None: missing[i] += 1; continue
+            rows.append(i); cols.append(pos); vals.append(float(w))
+
+    rows, cols, vals = np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(vals)
+    avg_yield = np.bincount(rows, weights=vals * uni.yields[cols], minlength=n) / 100
+    monthly = invest * (avg_yield / 100) / 12
+    monthly_net = monthly * C.AFTER_TAX_RATIO
+    expense_real = expense * 10000
+    coverage = np.divide(monthly_net, expense_real, out=np.zeros(n), where=expense_real > 0)
+
+    return [
+        {'monthly': float(m), 'yield': float(y), 'monthly_net': float(mn), 'coverage': float(cv), 'missing': int(ms)}
+        for m, y, mn, cv, ms in zip(monthly, avg_yield, monthly_net, coverage, missing)
+    ]
@@ -0,0 +1,149 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: price_cache.py
+설명: 세션 간 공유되는 가격 캐시 (시장별 TTL + Stale-While-Revalidate)
+"""
+
+import threading
+import time
+import datetime
+import pytz
+import streamlit as st
+from logger import logger
+import constants as C
+import snapshot
+
+# =============================================================================
+# [SECTION 1] 장 운영 시간 판별
+# =============================================================================
+
+# 분류별 거래소 시간대 및 정규장 시간 (시작, 종료)
+MARKET_HOURS = {
+    '국내': ('Asia/Seoul', datetime.time(9, 0), datetime.time(15, 30)),
+    '해외': ('America/New_York', datetime.time(9, 30), datetime.time(16, 0)),
+}
+
+def is_market_open(category, now=None):
+    """해당 분류의 거래소가 정규장 시간인지 확인 (주말 제외)"""
+    tz_name, open_t, close_t = MARKET_HOURS.get(category, MARKET_HOURS['해외'])
+    now = now or datetime.datetime.now(pytz.utc)
+    local = now.astimezone(pytz.timezone(tz_name))
+    if local.weekday() >= 5: return False
+    return open_t <= local.time() <= close_t
+
+def get_price_ttl(category, now=None):
+    """장중에는 짧은 TTL, 장 마감 후에는 긴 TTL 반환 (초)"""
+    return C.PRICE_TTL_MARKET_OPEN if is_market_open(category, now) else C.PRICE_TTL_MARKET_CLOSED
+
+
+# =============================================================================
+# [SECTION 2] 가격 캐시 본체
+# =============================================================================
+
+class PriceCache:
+    """
+    (코드, 분류) 단위 가격 캐시
+    - 처음 보는 종목: 동기 조회 (동시 요청은 한 번만 조회하도록 직렬화)
+    - 유효시간이 지난 종목: 마지막 가격을 즉시 반환하고 백그라운드에서 1개 스레드만 갱신
+    """
+
+    def __init__(self):
+        self._data = {}  # {(코드, 분류): (가격, 조회시각)}
+        self._lock = threading.Lock()
+        self.generation = 0  # 가격이 바뀔 때마다 증가 (가공 데이터 재계산 판단용)
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+
+    def _split(self, items):
+        """캐시에 없는 종목과 유효시간이 지난 종목 분리 (조회 실패 기록은 짧은 재시도 간격 적용)"""
+        now = time.time()
+        missing, stale = [], []
+        with self._lock:
+            for key in items:
+                entry = self._data.get(key)
+                if entry is None:
+                    missing.append(key)
+                elif now - entry[1] > (C.PRICE_TTL_FAILED if entry[0] is None else get_price_ttl(key[1])):
+                    stale.append(key)
+        return missing, stale
+
+    def _store(self, prices):
+        """
+        조회 결과 저장
+        * 조회 실패(None)는 마지막 정상 가격을 덮어쓰지 않음 (조회시각도 그대로 -> 다음 요청에서 다시 갱신 시도)
+        """
+        now = time.time()
+        with self._lock:
+            changed = False
+            for key, price in prices.items():
+                old = self._data.get(key)
+                if price is None and old is not None and old[0] is not None: continue
+                changed |= old is None or old[0] != price
+                self._data[key] = (price, now)
+            if changed: self.generation += 1
+
+    def _refresh_in_background(self, items, fetcher):
+        """유효시간이 지난 종목을 백그라운드에서 갱신 (동시에 1개 스레드만)"""
+        with self._lock:
+            if self._refreshing: return
+            self._refreshing = True
+
+        def _worker():
+            try:
+                self._store(fetcher(items))
+                logger.info(f"💹 가격 캐시 백그라운드 갱신 완료 ({len(items)}건)")
+            except Exception as e:
+                logger.error(f"Price Cache Refresh Error: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def seed(self, prices, fetched_at):
+        """저장된 가격을 조회시각과 함께 채움 (이미 있는 종목은 유지, 유효시간이 지났으면 다음 조회 때 백그라운드 갱신)"""
+        with self._lock:
+            changed = False
+            for key, price in prices.items():
+                if key in self._data: continue
+                self._data[key] = (price, fetched_at)
+                changed = True
+            if changed: self.generation += 1
+
+    def get_prices(self, items, fetcher, with_generation=False):
+        """
+        가격 일괄 반환
+        - items: [(코드, 분류), ...]
+        - fetcher: items를 받아 {(코드, 분류): 가격} 을 돌려주는 일괄 조회 함수
+        - with_generation: True면 (가격, 읽은 시점의 캐시 세대) 반환
+        """
+        items = list(dict.fromkeys(items))
+        missing, stale = self._split(items)
+
+        if missing:
+            with self._fetch_lock:
+                # 대기하는 동안 다른 세션이 이미 채웠을 수 있으므로 재확인
+                missing, _ = self._split(missing)
+                if missing: self._store(fetcher(missing))
+
+        if stale:
+            self._refresh_in_background(stale, fetcher)
+
+        with self._lock:
+            prices = {key: self._data.get(key, (None, 0))[0] for key in items}
+            return (prices, self.generation) if with_generation else prices
+
+
+@st.cache_resource
+def get_price_cache():
+    """
+    프로세스 전역 가격 캐시 (모든 세션 공유)
+    * 새 워커는 스냅샷 가격으로 시작 -> 첫 화면은 네트워크 대기 없이 표시, 갱신은 백그라운드
+    """
+    cache = PriceCache()
+    loaded = snapshot.load_snapshot()
+    if loaded:
+        _, prices, meta = loaded
+        cache.seed(prices, meta['saved_at'])
+        logger.info(f"💾 스냅샷 가격으로 캐시 시작 ({len(prices)}건)")
+    return cache
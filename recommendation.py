@@ -7,11 +7,16 @@
 
 import streamlit as st
 import pandas as pd
-import re
-import random
+from functools import lru_cache
+from typing import NamedTuple
+import weakref
 import time
 import numpy as np
-import requests
+import http_client
+import dividend_calendar
+import universe
+import allocator
+import constants as C
 import xml.etree.ElementTree as ET
 
 # ===========================================================
@@ -23,7 +28,7 @@ def _get_latest_blog_info():
     """네이버 RSS 피드에서 최신 분석글 수집"""
     try:
         rss_url = "https://rss.blog.naver.com/dividenpange.xml"
-        response = requests.get(rss_url, timeout=5)
+        response = http_client.get(rss_url, timeout=5)
         root = ET.fromstring(response.content)
         item = root.find(".//item")
         if item is not None:
@@ -35,27 +40,10 @@ def _get_latest_blog_info():
     return "배당팽이 투자 일지", "https://blog.naver.com/dividenpange"
 
 def _parse_day_category(date_str):
-    """배당락일 문자열 분석"""
-    s = str(date_str).strip()
-    if any(k in s for k in ['말일', '마지막', '30일', '31일', '29일', '28일', '하순']): return 'end'
-    if any(k in s for k in ['초', '1일', '5일']): return 'early'
-    if any(k in s for k in ['중순']): return 'mid'
-    numbers = re.findall(r'\d+', s)
-    if numbers:
-        day = int(numbers[-1])
-        if 1 <= day <= 10: return 'early'
-        if 11 <= day <= 20: return 'mid'
-        if 21 <= day <= 31: return 'end'
-    return 'unknown'
-
-def _check_timing_match(row_date, user_timing):
-    """배당 시기 매칭 여부 확인"""
-    if user_timing == 'mix': return True
-    cat = _parse_day_category(row_date)
-    if user_timing == 'mid': return cat == 'mid'
-    elif user_timing == 'end': return cat in ['end', 'early']
-    return True
+    """배당락일 문자열 분석 (early/mid/end/unknown, 규칙 해석은 dividend_calendar 공용)"""
+    return dividend_calendar.lookup_timing(str(date_str).strip())
 
+@lru_cache(maxsize=4096)
 def _get_core_index_name(name):
     """지수 명칭 추출 (중복 방지용)"""
     managers = ['ACE', 'TIGER', 'KODEX', 'SOL', 'RISE', 'PLUS', 'TIMEFOLIO', 'ARIRANG', 'HANARO', 'KBSTAR']
@@ -69,14 +57,14 @@ def _generate_share_text(title, picks, weights, df, blog_title, blog_url):
     text = f"🐌 [AI 분석 포트폴리오]\n\n📌 컨셉: {title}\n"
     total_avg_yld = 0
 
+    uni = universe.get_index(df)
     for stock in picks:
         # 데이터프레임 검색 안전장치
-        matched = df[df['pure_name'] == stock]
-        if matched.empty: continue
-        row = matched.iloc[0]
+        row = uni.row(stock)
+        if row is None: continue
         
         w = weights.get(stock, 0)
-        total_avg_yld += (row['연배당률'] * w / 100)
+        total_avg_yld += (uni.yield_of(stock) * w / 100)
         text += f"- {stock}: {w}% (연 {row['연배당률']:.2f}%)\n"
 
     text += f"\n📈 예상 평균 배당률: 연 {total_avg_yld:.2f}%\n"
@@ -88,16 +76,173 @@ def _generate_share_text(title, picks, weights, df, blog_title, blog_url):
 # [SECTION 2] AI 스마트 추천 엔진 (핵심 로직)
 # ===========================================================
 
+# 자산유형 -> 자산군 (위에서부터 우선 적용)
+_CLUSTER_RULES = [('채권', 'bond'), ('리츠', 'reit'), ('커버드콜', 'cov'), ('배당성장', 'growth'), ('주식', 'growth'), ('고배당', 'income')]
+# 스타일별 자산군 가산점 / 쿼터
+_STYLE_BONUS = {'safe': {'bond': 50, 'reit': 30}, 'growth': {'growth': 50, 'bond': -100}, 'flow': {'cov': 50, 'reit': 40, 'income': 20}}
+_STYLE_QUOTAS = {'safe': ['bond', 'reit'], 'growth': ['growth'], 'flow': ['cov', 'reit']}
+_TOP_N = 5  # 상위 N개 중 무작위 선택 (다른 조합 버튼용)
+# 완화한 제약 -> 결과 타이틀 표시 (C.ALLOC_RELAX_ORDER 순서)
+_RELAX_TITLES = {'timing': '날짜 유연', 'style': '자산군 비중 완화', 'usd': '달러 비중 완화'}
+
+class _Features(NamedTuple):
+    """추천용 종목 특성 (유니버스 행 순서, 가공 데이터 1개당 1회 계산)"""
+    names: np.ndarray       # pure_name
+    yields: np.ndarray      # 연배당률 (숫자 아님 -> NaN)
+    foreign: np.ndarray     # 해외 상장
+    cluster: np.ndarray     # 자산군 (bond/reit/cov/growth/income/etc)
+    timing: np.ndarray      # 배당 시기 (early/mid/end/unknown)
+    core: np.ndarray        # 지수 명칭 코드 (같은 지수 중복 방지)
+    usd: np.ndarray         # 달러 자산 (해외 상장/환노출)
+    high_yield: np.ndarray  # 하이일드 종목
+    schd: np.ndarray        # 배당다우존스 종목
+
+_features = weakref.WeakKeyDictionary()  # {UniverseIndex: _Features}
+
+def _build_features(df):
+    names = df['pure_name'].astype(str)
+    category = df['분류'].astype(str) if '분류' in df.columns else pd.Series('국내', index=df.index)
+    asset = df['자산유형'].astype(str) if '자산유형' in df.columns else pd.Series('', index=df.index)
+    if '배당시기' in df.columns:
+        timing = df['배당시기'].astype(str)
+    else:
+        dates = df['배당락일'].fillna('').astype(str)
+        timing = dates.map({t: _parse_day_category(t) for t in dates.unique()})
+
+    cluster = np.select([asset.str.contains(k, regex=False) for k, _ in _CLUSTER_RULES],
+                        [c for _, c in _CLUSTER_RULES], default='etc')
+    _, core = np.unique([_get_core_index_name(n) for n in names], return_inverse=True)
+    foreign = (category == '해외').to_numpy()
+    usd = foreign | (((names.str.contains('미국') | names.str.contains('글로벌')) & ~names.str.contains('(H)', regex=False))
+                     | names.str.contains('환노출')).to_numpy()
+
+    return _Features(
+        names=names.to_numpy(object),
+        yields=pd.to_numeric(df['연배당률'], errors='coerce').to_numpy(np.float64),
+        foreign=foreign,
+        cluster=cluster,
+        timing=timing.to_numpy(object),
+        core=core.reshape(-1),
+        usd=usd,
+        high_yield=names.str.contains('하이일드').to_numpy(),
+        schd=names.str.contains('배당다우존스').to_numpy(),
+    )
+
+def _get_features(df):
+    uni = universe.get_index(df)
+    feats = _features.get(uni)
+    if feats is None:
+        feats = _features[uni] = _build_features(df)
+    return uni, feats
+
+def _timing_mask(timing_arr, user_timing):
+    """배당 시기 매칭 마스크 (15일: mid만 / 월말: end, early 모두 인정)"""
+    if user_timing == 'mid': return timing_arr == 'mid'
+    if user_timing == 'end': return (timing_arr == 'end') | (timing_arr == 'early')
+    return np.ones(len(timing_arr), dtype=bool)
+
+def _top_k(score, mask, k=_TOP_N):
+    """mask 안에서 점수 상위 k개 위치 (argpartition, 정렬 없음)"""
+    idx = np.flatnonzero(mask)
+    if idx.size > k: idx = idx[np.argpartition(score[idx], -k)[-k:]]
+    return idx
+
+def _draw_picks(f, score, valid, style, wanted_count, focus_pos, rng):
+    """후보 조합 1개 선발 (원픽 -> SCHD -> 스타일 쿼터 -> 나머지, 이미 뽑은 종목/같은 지수는 제외) -> 행 위치 목록"""
+    picks = []
+    picked = np.zeros(len(score), dtype=bool)
+    core_used = np.zeros(f.core.max() + 1 if len(f.core) else 1, dtype=bool)
+
+    def _take(pos):
+        picks.append(int(pos))
+        picked[pos] = True
+        core_used[f.core[pos]] = True
+
+    def _candidates(mask):
+        return mask & valid & ~picked & ~core_used[f.core]
+
+    # (1) 원픽 반영
+    for pos in focus_pos: _take(pos)
+
+    # (2) SCHD 강제 (성장형)
+    if style == 'growth' and not f.schd[focus_pos].any():
+        top = _top_k(score, _candidates(f.schd), 2)
+        if top.size: _take(rng.choice(top))
+
+    # (3) 쿼터 채우기
+    for q_type in _STYLE_QUOTAS.get(style, []):
+        if len(picks) >= wanted_count: break
+        top = _top_k(score, _candidates(f.cluster == q_type))
+        if top.size: _take(rng.choice(top))
+
+    # (4) 나머지 채우기
+    while len(picks) < wanted_count:
+        top = _top_k(score, _candidates(True))
+        if not top.size: break
+        _take(rng.choice(top))
+    return picks
+
+def _draw_sets(f, score, valid, style, wanted_count, focus_pos, rng):
+    """후보 조합 C.ALLOC_CANDIDATES개 추첨 (같은 종목 구성은 1번만)"""
+    draws = [_draw_picks(f, score, valid, style, wanted_count, focus_pos, rng) for _ in range(C.ALLOC_CANDIDATES)]
+    return list({frozenset(d): d for d in draws}.values())
+
+def _allocate(f, sets, focus_pos, total_focus_weight, calc_target, style, timing, rng, relaxed=()):
+    """
+    후보 조합들의 비중을 일괄 최적화 -> 제약을 만족하는 조합 중 1개 (이름 목록, {이름: 정수 %})
+    - relaxed: 빼고 풀 제약 ('timing' / 'style' / 'usd', C.ALLOC_RELAX_ORDER 참고)
+    * 정수 %로 반올림한 뒤에도 제약을 다시 확인 / 만족하는 조합이 없으면 (None, None)
+    """
+    width = max(len(d) for d in sets)
+    if width == 0: return None, None
+
+    pick_pos = np.zeros((len(sets), width), dtype=np.intp)
+    mask = np.zeros((len(sets), width), dtype=bool)
+    for i, d in enumerate(sets):
+        pick_pos[i, :len(d)], mask[i, :len(d)] = d, True
+
+    fixed = np.full(pick_pos.shape, np.nan)
+    if focus_pos:
+        fixed[mask & np.isin(pick_pos, focus_pos)] = (total_focus_weight // len(focus_pos)) / 100
+    style_clusters, style_min = C.ALLOC_STYLE_MIN.get(style, ((), 0.0))
+    if 'style' in relaxed: style_min = 0.0
+    if 'timing' in relaxed: timing = 'mix'
+    cons = dict(
+        style_group=np.isin(f.cluster[pick_pos], style_clusters), style_min=style_min,
+        usd=None if 'usd' in relaxed else f.usd[pick_pos],
+        timing_ok=_timing_mask(f.timing[pick_pos].ravel(), timing).reshape(pick_pos.shape) if timing != 'mix' else None,
+    )
+    weights, objective, _ = allocator.allocate_batch(np.nan_to_num(f.yields[pick_pos]), mask, fixed, calc_target, **cons)
+
+    order = [i for i in np.argsort(objective) if np.isfinite(objective[i])]
+    shown = []
+    for i in order:
+        pct = np.zeros(width)
+        pct[mask[i]] = allocator.to_percent(weights[i, mask[i]])
+        row = lambda a: None if a is None else a[i:i + 1]
+        if allocator.check_constraints(pct[None] / 100, mask[i:i + 1], fixed[i:i + 1],
+                                       row(cons['style_group']), style_min, row(cons['usd']), row(cons['timing_ok']))[0]:
+            shown.append((i, pct))
+        if len(shown) >= C.ALLOC_TOP: break
+    if not shown: return None, None
+
+    i, pct = shown[rng.integers(len(shown))]
+    ranked = sorted(zip(pick_pos[i, mask[i]], pct[mask[i]]), key=lambda x: x[1], reverse=True)
+    return [str(f.names[pos]) for pos, _ in ranked], {str(f.names[pos]): int(p) for pos, p in ranked}
+
 def get_smart_recommendation(df, user_choices):
     """
     토스(Toss) 스타일 추천 엔진
     - 순수 계산 로직만 존재 (st.write 없음)
+    - 종목 특성은 가공 데이터당 1회 계산, 점수는 배열 연산, 선발은 argpartition + 지수 중복 제외
+    - 비중은 후보 조합 C.ALLOC_CANDIDATES개를 allocator로 한 번에 최적화 (목표 배당률 + 스타일/달러/시기 하드 제약)
     """
     target_yield = user_choices.get('target_yield', 7.0)
     style = user_choices.get('style', 'balance')
     wanted_count = user_choices.get('count', 3)
     timing = user_choices.get('timing', 'mix')
     include_foreign = user_choices.get('include_foreign', True)
+    rng = np.random.default_rng()
     
     # 1. Safety Lock (사용자 욕심 억제)
     calc_target = target_yield 
@@ -106,190 +251,58 @@ def get_smart_recommendation(df, user_choices):
     elif style == 'flow': calc_target = min(target_yield, 20.0) 
     
     # 2. 기초 데이터 준비
+    uni, f = _get_features(df)
     focus_labels = user_choices.get('focus_stock_labels', [])
     total_focus_weight = user_choices.get('focus_weight', 0)
     focus_real_names = []
     
-    if focus_labels:
-        for lbl in focus_labels:
-            match = df[df['검색라벨'] == lbl]
-            if not match.empty: focus_real_names.append(match.iloc[0]['pure_name'])
+    for lbl in focus_labels:
+        match = uni.row_by_label(lbl)
+        if match is not None: focus_real_names.append(match['pure_name'])
 
     # 3. 유니버스 필터링
-    df['연배당률'] = pd.to_numeric(df['연배당률'], errors='coerce')
-    pool = df.dropna(subset=['연배당률'])
-    pool = pool[(pool['연배당률'] > 0) & (pool['연배당률'] <= 35.0)].copy()
-    
-    if not include_foreign:
-        pool = pool[pool['분류'] == '국내']
-        
-    pool['temp_date_str'] = pool['배당락일'].fillna('').astype(str)
-
-    # 4. 점수 산정
-    pool['yield_diff'] = abs(pool['연배당률'] - calc_target)
-    pool['score'] = 100 - (pool['yield_diff'] * 15)
-    
-    if timing != 'mix':
-        is_timing_match = pool['temp_date_str'].apply(lambda x: _check_timing_match(x, timing))
-        pool.loc[is_timing_match, 'score'] += 40
-    
-    pool['score'] += [random.uniform(0, 5) for _ in range(len(pool))]
-    
-    # 5. 자산군(Cluster) 분류
-    def get_cluster(row):
-        asset_type = str(row.get('자산유형', ''))
-        if '채권' in asset_type: return 'bond'
-        if '리츠' in asset_type: return 'reit'
-        if '커버드콜' in asset_type: return 'cov'
-        if '배당성장' in asset_type or '주식' in asset_type: return 'growth'
-        if '고배당' in asset_type: return 'income'
-        return 'etc'
-
-    pool['cluster'] = pool.apply(get_cluster, axis=1)
-
-    # 6. 스타일별 쿼터 및 가산점
-    quotas = []
-    forced_schd = False 
-    
-    if style == 'safe':
-        pool = pool[pool['연배당률'] <= 12.0]
-        quotas = ['bond', 'reit'] 
-        pool.loc[pool['cluster'] == 'bond', 'score'] += 50
-        pool.loc[pool['cluster'] == 'reit', 'score'] += 30
-        for idx, row in pool.iterrows():
-            if '하이일드' in str(row['pure_name']): pool.at[idx, 'score'] -= 50
-
-    elif style == 'growth':
-        forced_schd = True
-        quotas = ['growth']
-        pool.loc[pool['cluster'] == 'growth', 'score'] += 50
-        pool.loc[pool['cluster'] == 'bond', 'score'] -= 100
-
-    elif style == 'flow':
-        quotas = ['cov', 'reit'] 
-        pool.loc[pool['cluster'] == 'cov', 'score'] += 50   
-        pool.loc[pool['cluster'] == 'reit', 'score'] += 40  
-        pool.loc[pool['cluster'] == 'income', 'score'] += 20
-
-    # 7. 종목 선발
-    final_picks = []
-    picked_names = set(focus_real_names)
-    picked_core_indices = [_get_core_index_name(n) for n in focus_real_names]
-    
-    # (1) 원픽 반영
-    final_picks.extend(focus_real_names)
-    
-    # (2) SCHD 강제 (성장형)
-    if forced_schd:
-        if not any("배당다우존스" in core for core in picked_core_indices):
-            schd_candidates = pool[pool['pure_name'].str.contains("배당다우존스")].sort_values('score', ascending=False)
-            if not schd_candidates.empty:
-                best_schd = schd_candidates.head(2).sample(1).iloc[0]
-                final_picks.append(best_schd['pure_name'])
-                picked_names.add(best_schd['pure_name'])
-                picked_core_indices.append(_get_core_index_name(best_schd['pure_name']))
-
-    # (3) 쿼터 채우기
-    for q_type in quotas:
-        if len(final_picks) >= wanted_count: break
-        candidates = pool[
-            (pool['cluster'] == q_type) & 
-            (~pool['pure_name'].isin(picked_names))
-        ].sort_values('score', ascending=False)
-        
-        top_candidates = candidates.head(5)
-        if not top_candidates.empty:
-            shuffled = top_candidates.sample(frac=1)
-            for _, row in shuffled.iterrows():
-                core = _get_core_index_name(row['pure_name'])
-                if core not in picked_core_indices: 
-                    final_picks.append(row['pure_name'])
-                    picked_names.add(row['pure_name'])
-                    picked_core_indices.append(core)
-                    break 
-
-    # (4) 나머지 채우기
-    while len(final_picks) < wanted_count:
-        candidates = pool[~pool['pure_name'].isin(picked_names)].sort_values('score', ascending=False)
-        if candidates.empty: break
-        
-        top_n = candidates.head(5)
-        shuffled = top_n.sample(frac=1)
-        found = False
-        for _, row in shuffled.iterrows():
-            core = _get_core_index_name(row['pure_name'])
-            if core not in picked_core_indices:
-                final_picks.append(row['pure_name'])
-                picked_names.add(row['pure_name'])
-                picked_core_indices.append(core)
-                found = True
-                break
-        if not found: break
-
-    # 8. 비중 최적화
-    selected_pool = pool[pool['pure_name'].isin(final_picks)].copy()
-    pick_weights = {}
-    
-    def _is_usd_asset(row):
-        name = str(row['pure_name'])
-        cat = str(row['분류'])
-        if cat == '해외': return True
-        if ('미국' in name or '글로벌' in name) and '(H)' not in name: return True
-        if '환노출' in name: return True
-        return False
-    
-    ranked_picks = []
-    for p in final_picks:
-        row = selected_pool[selected_pool['pure_name']==p].iloc[0]
-        priority = 0
-        if "배당다우존스" in p and style == 'growth': priority = 10 
-        elif style == 'safe' and "채권" in p: priority = 8       
-        elif style == 'flow' and "커버드콜" in p: priority = 8   
-        else: priority = row['score'] / 20 
-        
-        if _is_usd_asset(row): priority -= 1000 
-        if p in focus_real_names: priority += 2000
-        ranked_picks.append((p, priority))
-    
-    ranked_picks.sort(key=lambda x: x[1], reverse=True)
-    ordered_names = [x[0] for x in ranked_picks]
-    
-    if focus_real_names:
-        w_focus = total_focus_weight // len(focus_real_names)
-        for n in focus_real_names: pick_weights[n] = w_focus
-        rem_quota = 100 - (w_focus * len(focus_real_names))
-        
-        ai_picks = [p for p in final_picks if p not in focus_real_names]
-        if ai_picks:
-            ai_picks_sorted = [n for n in ordered_names if n in ai_picks]
-            if len(ai_picks) == 1: w_dist = [rem_quota]
-            elif len(ai_picks) == 2: w_dist = [int(rem_quota*0.6), rem_quota - int(rem_quota*0.6)]
-            else: w_dist = [rem_quota // len(ai_picks)] * len(ai_picks)
-            
-            for i, name in enumerate(ai_picks_sorted):
-                if i < len(w_dist): pick_weights[name] = w_dist[i]
-                else: pick_weights[name] = 0
-    else:
-        if len(ordered_names) == 1: ratios = [100]
-        elif len(ordered_names) == 2: ratios = [60, 40]
-        elif len(ordered_names) == 3: ratios = [50, 30, 20] 
-        elif len(ordered_names) == 4: ratios = [40, 30, 20, 10]
-        else: ratios = [100]
-        
-        for i, name in enumerate(ordered_names):
-            if i < len(ratios): pick_weights[name] = ratios[i]
-            else: pick_weights[name] = 0
-
-    # 9. 결과 타이틀
-    is_timing_compromised = False
-    if timing != 'mix':
-        for pick in final_picks:
-            d_str = selected_pool[selected_pool['pure_name'] == pick]['temp_date_str'].iloc[0]
-            if not _check_timing_match(d_str, timing):
-                is_timing_compromised = True; break
+    with np.errstate(invalid='ignore'):
+        valid = (f.yields > 0) & (f.yields <= 35.0)
+        if style == 'safe': valid &= f.yields <= 12.0
+    if not include_foreign: valid &= ~f.foreign
+
+    # 4. 점수 산정 (배당률 근접도 + 시기 + 무작위 + 스타일별 자산군 가산점)
+    score = 100 - np.abs(f.yields - calc_target) * 15
+    if timing != 'mix': score += 40 * _timing_mask(f.timing, timing)
+    score += rng.uniform(0, 5, len(score))
+    for cluster, bonus in _STYLE_BONUS.get(style, {}).items():
+        score += bonus * (f.cluster == cluster)
+    if style == 'safe': score -= 50 * f.high_yield
+
+    # 5. 종목 선발 (후보 조합 여러 개, 원픽 종목은 모든 조합에 포함)
+    focus_pos = [uni.pos(n) for n in focus_real_names if uni.pos(n) is not None]
+
+    # 6. 비중 최적화 (목표 배당률 + 스타일/달러/배당 시기 하드 제약 -> 제약을 만족하는 조합 중 목적함수 상위 1개 제시)
+    #    만족하는 조합이 없으면 후보를 다시 추첨 (C.ALLOC_RESAMPLE_ROUNDS회), 그래도 없으면 C.ALLOC_RELAX_ORDER 순서로 제약을 하나씩 더 풂
+    style_clusters, style_min = C.ALLOC_STYLE_MIN.get(style, ((), 0.0))
+    no_op = {'timing': timing == 'mix', 'style': style_min <= 0, 'usd': False}
+    stages = [()] + [C.ALLOC_RELAX_ORDER[:i + 1] for i, k in enumerate(C.ALLOC_RELAX_ORDER) if not no_op[k]]
+    final_picks, relaxed = None, ()
+    for relaxed in stages:
+        for _ in range(C.ALLOC_RESAMPLE_ROUNDS):
+            sets = _draw_sets(f, score, valid, style, wanted_count, focus_pos, rng)
+            final_picks, pick_weights = _allocate(f, sets, focus_pos, total_focus_weight, calc_target, style, timing, rng, relaxed)
+            if final_picks is not None: break
+        if final_picks is not None: break
+    if final_picks is None:
+        return "조건에 맞는 종목 없음", [], {}
+
+    # 7. 결과 타이틀 (실제로 기준을 벗어난 제약만 표시)
+    pick_pos = uni.positions(final_picks)
+    share = lambda m: sum(pick_weights[n] for n, hit in zip(final_picks, m) if hit) / 100
+    compromised = {
+        'timing': timing != 'mix' and not _timing_mask(f.timing[pick_pos], timing).all(),
+        'style': 'style' in relaxed and share(np.isin(f.cluster[pick_pos], style_clusters)) < style_min,
+        'usd': 'usd' in relaxed and share(f.usd[pick_pos]) > C.ALLOC_USD_MAX,
+    }
 
     timing_badge = {"mid": "15일 배당", "end": "월말 배당", "mix": "맞춤"}
-    prefix = "(날짜 유연) " if is_timing_compromised else ""
+    prefix = "".join(f"({_RELAX_TITLES[k]}) " for k in C.ALLOC_RELAX_ORDER if compromised[k])
     theme_title = f"{prefix}{timing_badge.get(timing, '맞춤')} 포트폴리오"
         
     return theme_title, final_picks, pick_weights     
@@ -392,7 +405,15 @@ def show_wizard():
         selected_favs = st.multiselect("최애 종목 선택", options=stock_list, max_selections=max_fav)
 
         if selected_favs:
-            focus_weight = st.slider(f"💰 선택 종목 합계 비중 (%)", 5, 50, 20, step=5)
+            # 나머지 종목이 종목당 최대/최소 비중 안에서 채울 수 있는 범위만 허용
+            n_free = wanted_cnt - len(selected_favs)
+            w_min = max(5, int(100 - n_free * C.ALLOC_MAX_WEIGHT * 100))
+            w_max = min(50, int(100 - n_free * C.ALLOC_MIN_WEIGHT * 100))
+            if w_min < w_max:
+                focus_weight = st.slider(f"💰 선택 종목 합계 비중 (%)", w_min, w_max, min(max(20, w_min), w_max), step=5)
+            else:
+                focus_weight = w_max
+                st.caption(f"💡 종목당 최대 비중({int(C.ALLOC_MAX_WEIGHT * 100)}%) 제한으로 선택 종목 비중은 {focus_weight}%로 고정됩니다.")
             st.success(f"✅ 선택하신 종목에 총 {focus_weight}%를 고정 배치합니다.")
             st.session_state.wiz_data['focus_stock_labels'] = selected_favs
             st.session_state.wiz_data['focus_weight'] = focus_weight
@@ -415,7 +436,7 @@ def show_wizard():
         title, picks, weights = cached.get("title"), cached.get("picks"), cached.get("weights")
 
         if not picks or title == "조건에 맞는 종목 없음":
-            st.error("❌ 종목을 찾지 못했습니다."); st.button("처음으로", on_click=reset_wizard); return
+            st.error("❌ 종목당 비중 조건(최소/최대)을 만족하는 조합을 찾지 못했습니다. 종목 수나 원픽 비중을 바꿔 보세요."); st.button("처음으로", on_click=reset_wizard); return
 
         st.success(f"**{title}**")
         
@@ -423,12 +444,22 @@ def show_wizard():
             with st.container(border=True):
                 st.caption("🔍 **설계 노트**")
                 st.caption("목표 달성을 위해, 선택하신 배당 시기 외에도 수익성이 좋은 종목을 일부 포함하여 최적화했습니다.")
+        if "(자산군 비중 완화)" in title:
+            with st.container(border=True):
+                st.caption("🔍 **설계 노트**")
+                st.caption("선택하신 스타일의 핵심 자산군 중 조건에 맞는 종목이 부족해, 최소 비중 기준을 낮춰 구성했습니다.")
+        if "(달러 비중 완화)" in title:
+            with st.container(border=True):
+                st.caption("🔍 **설계 노트**")
+                st.caption(f"원화 자산만으로는 조건을 맞추기 어려워 달러 자산 비중이 {C.ALLOC_USD_MAX:.0%}를 넘습니다. 환율 변동에 유의하세요.")
         
         blog_title, blog_url = _get_latest_blog_info()
         share_text = _generate_share_text(title, picks, weights, df, blog_title, blog_url)
 
+        uni = universe.get_index(df)
         for stock in picks:
-            row = df[df['pure_name'] == stock].iloc[0]
+            row = uni.row(stock)
+            if row is None: continue
             w = weights.get(stock, 0)
             
             months = int(row.get('신규상장개월수', 0))
@@ -8,16 +8,101 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
+import numpy as np
 import random
+import threading
+from collections import OrderedDict
 import constants as C
 
+# =======================================================
+# [PART 0] 시뮬레이션 결과 메모 (세션 공유 LRU)
+# =======================================================
+
+class SimulationMemo:
+    """
+    양자화한 입력값을 키로 시뮬레이션 결과를 재사용 (모든 세션 공유, 개수 제한 LRU)
+    * 반환값은 여러 세션이 공유하므로 호출부에서 수정하지 않음
+    """
+
+    def __init__(self, max_entries):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._max = max_entries
+        self.hits, self.misses = {}, {}
+
+    def get_or_compute(self, name, key, compute):
+        key = (name,) + key
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits[name] = self.hits.get(name, 0) + 1
+                return self._data[key]
+
+        value = compute()
+        with self._lock:
+            self.misses[name] = self.misses.get(name, 0) + 1
+            self._data[key] = value
+            while len(self._data) > self._max: self._data.popitem(last=False)
+        return value
+
+    def stats(self):
+        """{이름: (적중, 미스)} 및 현재 저장 개수"""
+        with self._lock:
+            names = sorted(set(self.hits) | set(self.misses))
+            return {n: (self.hits.get(n, 0), self.misses.get(n, 0)) for n in names}, len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits, self.misses = {}, {}
+
+@st.cache_resource
+def get_sim_memo():
+    """프로세스 전역 시뮬레이션 메모"""
+    return SimulationMemo(C.SIM_MEMO_SIZE)
+
+def _q_amount(x):
+    """금액 양자화 (1만원 단위)"""
+    return int(round(float(x) / 10000)) * 10000
+
+def _q_rate(y):
+    """배당률 양자화 (0.01%p 단위)"""
+    return round(float(y), 2)
+
 # =======================================================
 # [PART 1] 목표 배당 달성 역산기 (Logic)
 # =======================================================
 
-def calculate_goal_simulation(target_monthly_goal, avg_y, total_invest, use_start_money):
+GOAL_MAX_MONTHS = 720  # 60년 제한
+
+def solve_months_to_goal(start_balance, required_asset, monthly_rate, monthly_add=0.0, max_months=GOAL_MAX_MONTHS):
+    """
+    [해석해] 목표 자산 도달까지 걸리는 개월 수 (스칼라 또는 배열, 브로드캐스팅 지원)
+    - 재투자만: B0 * q^n >= R  ->  n = log(R / B0) / log(q)   (q = 1 + 월 세후 배당률)
+    - 월 적립 포함 (연금 공식): B_n = (B0 + c/g) * q^n - c/g  ->  n = log((R + c/g) / (B0 + c/g)) / log(q)
+    * 도달 불가 또는 max_months 초과 시 max_months 반환, 이미 도달했으면 0
+    """
+    B0, R, g, c = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (start_balance, required_asset, monthly_rate, monthly_add)))
+    months = np.full(B0.shape, float(max_months))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = g > 0
+        shift = np.where(growth, c / np.where(growth, g, 1), 0.0)
+        n_growth = np.log((R + shift) / (B0 + shift)) / np.log1p(np.where(growth, g, 0.0))
+        n_flat = (R - B0) / c  # 배당률 0: 적립만으로 도달
+
+        n = np.where(growth, n_growth, np.where(c > 0, n_flat, np.inf))
+        n = np.ceil(np.round(n, 9))  # 경계값의 부동소수 오차로 1개월 더 세지 않도록
+
+    months = np.where(np.isfinite(n) & (n < max_months), n, months)
+    months = np.where(B0 >= R, 0, months)
+    months = months.astype(int)
+    return months if months.ndim else int(months)
+
+def calculate_goal_simulation(target_monthly_goal, avg_y, total_invest, use_start_money, monthly_add=0):
     """
     [로직] 목표 월 배당금을 받으려면 얼마가 필요한지 계산
+    - target_monthly_goal: 스칼라 또는 배열 (배열이면 목표별 결과를 배열로 반환)
     """
     # 1. 초기 자산 설정
     start_balance = total_invest if use_start_money else 0
@@ -27,143 +112,326 @@ def calculate_goal_simulation(target_monthly_goal, avg_y, total_invest, use_star
     monthly_yld = avg_y / 100 / 12  
     
     # 3. 목표 자산 계산 (공식: 목표월세후 / (월이율 * 세후비율))
-    if avg_y > 0:
-        required_asset = target_monthly_goal / (monthly_yld * tax_factor)
-    else:
-        required_asset = 0
+    target = np.asarray(target_monthly_goal, dtype=float)
+    required_asset = target / (monthly_yld * tax_factor) if avg_y > 0 else np.zeros_like(target)
         
-    # 4. 달성 기간 시뮬레이션 (단순 복리 가정)
-    current_bal = start_balance
-    months_passed = 0
-    max_months = 720 # 60년 제한
-    
-    if required_asset > 0 and current_bal < required_asset:
-        while months_passed < max_months:
-            if current_bal >= required_asset: break
-            # 월 배당금 재투자
-            div_reinvest = current_bal * monthly_yld * tax_factor
-            current_bal += div_reinvest
-            months_passed += 1
+    # 4. 달성 기간 (해석해, 단순 복리 가정)
+    months_passed = solve_months_to_goal(start_balance, required_asset, monthly_yld * tax_factor, monthly_add)
+    months_passed = np.where(required_asset > 0, months_passed, 0)
             
     # 5. 결과 정리
-    gap_money = max(0, required_asset - start_balance)
-    progress_rate = (start_balance / required_asset * 100) if required_asset > 0 else 0
+    gap_money = np.maximum(0, required_asset - start_balance)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        progress_rate = np.where(required_asset > 0, start_balance / required_asset * 100, 0)
     
+    unwrap = (lambda v: v.item()) if target.ndim == 0 else (lambda v: v)
     return {
-        "required_asset": required_asset,
-        "gap_money": gap_money,
-        "progress_rate": min(progress_rate, 100.0),
+        "required_asset": unwrap(required_asset),
+        "gap_money": unwrap(gap_money),
+        "progress_rate": unwrap(np.minimum(progress_rate, 100.0)),
         "actual_start_bal": start_balance,
-        "months_passed": months_passed,
-        "is_impossible": months_passed >= max_months
+        "months_passed": unwrap(months_passed),
+        "is_impossible": unwrap(months_passed >= GOAL_MAX_MONTHS)
     }
 
 
+def memo_goal_simulation(target_monthly_goal, avg_y, total_invest, use_start_money, monthly_add=0):
+    """calculate_goal_simulation 메모 버전 (스칼라 목표 전용)"""
+    args = (_q_amount(target_monthly_goal), _q_rate(avg_y), _q_amount(total_invest), bool(use_start_money), _q_amount(monthly_add))
+    return get_sim_memo().get_or_compute('goal', args, lambda: calculate_goal_simulation(*args))
+
+
 # =======================================================
 # [PART 2] 10년 자산 시뮬레이션 (Logic)
 # =======================================================
 
-def run_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, apply_inflation):
+def _compound(start_bal, adds, growth):
     """
-    [로직] ISA/일반 계좌별 미래 자산 성장 시뮬레이션
+    월초 납입 후 월말 복리 성장: b[m] = (b[m-1] + adds[m]) * growth
+    누적곱 G[m] 기준 b[m] = G[m] * (b[0] + Σ adds[j] / G[j-1]) 로 한 번에 계산
     """
-    reinvest_ratio = 100 
-    months_sim = years * 12
-    monthly_yld = avg_y / 100 / 12
-    
-    isa_exempt = 200 if is_isa else 0
-        
-    isa_bal = start_money if (is_isa and start_money <= C.ISA_TOTAL_CAP) else 0
-    general_bal = max(0, start_money - C.ISA_TOTAL_CAP) if is_isa else start_money
-    
-    if not is_isa:
-        isa_bal = 0
-        general_bal = start_money
+    G = np.cumprod(np.broadcast_to(growth[:, None], adds.shape), axis=1)
+    G_prev = np.concatenate([np.ones((len(G), 1)), G[:, :-1]], axis=1)
+    bal = G * (start_bal[:, None] + np.cumsum(adds / G_prev, axis=1))
+    return np.concatenate([start_bal[:, None], bal], axis=1)
 
-    isa_principal = isa_bal
-    general_principal = general_bal
-    
-    total_tax_paid_general = 0
-    sim_data = [{"년차": 0, "자산총액": (isa_bal + general_bal)/10000, "총원금": (isa_principal + general_principal)/10000, "실제월배당": 0}]
-    
-    year_tracker = 0
-    yearly_contribution = 0
+def simulate_paths(start_money, monthly_add, months, avg_y, is_isa):
+    """
+    [벡터 엔진] ISA/일반 계좌 월별 잔고 경로 계산 (월 단위 반복문 없음)
+    - start_money, monthly_add, avg_y, is_isa: 스칼라 또는 (P,) 배열 -> P개 조건을 한 번에 계산
+    - ISA 납입: 연간 한도(해마다 초기화)로 자른 누적 납입액을 총 한도로 다시 자른 구간별 스케줄
+    Returns: 각 (P, months+1) 배열 (0열 = 시작 시점, tax_general 은 일반 계좌 누적 세금)
+    """
+    start, add, yld, isa = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(start_money, dtype=float)), np.atleast_1d(np.asarray(monthly_add, dtype=float)),
+        np.atleast_1d(np.asarray(avg_y, dtype=float)), np.atleast_1d(np.asarray(is_isa, dtype=bool))
+    )
+    monthly_yld = yld / 100 / 12
 
-    for m in range(1, months_sim + 1):
-        if m // 12 > year_tracker:
-            yearly_contribution = 0
-            year_tracker = m // 12
-        
-        if is_isa:
-            remaining_isa_yearly = max(0, C.ISA_YEARLY_CAP - yearly_contribution)
-            remaining_isa_total = max(0, C.ISA_TOTAL_CAP - isa_principal)
-            
-            actual_isa_add = min(monthly_add, remaining_isa_yearly, remaining_isa_total)
-            actual_general_add = monthly_add - actual_isa_add
-            
-            isa_bal += actual_isa_add
-            isa_principal += actual_isa_add
-            yearly_contribution += actual_isa_add
-            general_bal += actual_general_add
-            general_principal += actual_general_add
-        else:
-            general_bal += monthly_add
-            general_principal += monthly_add
+    isa0 = np.where(isa & (start <= C.ISA_TOTAL_CAP), start, 0.0)
+    gen0 = np.where(isa, np.maximum(0, start - C.ISA_TOTAL_CAP), start)
 
-        div_isa = isa_bal * monthly_yld
-        isa_bal += div_isa 
-        
-        div_gen = general_bal * monthly_yld
-        this_tax = div_gen * C.TAX_RATE_GENERAL 
-        total_tax_paid_general += this_tax
-        reinvest_gen = (div_gen - this_tax) * (reinvest_ratio / 100)
-        general_bal += reinvest_gen
-        
-        sim_data.append({
-            "년차": m / 12, 
-            "자산총액": (isa_bal + general_bal) / 10000, 
-            "총원금": (isa_principal + general_principal) / 10000, 
-            "실제월배당": div_isa + div_gen
-        })
-        
-    final_asset = isa_bal + general_bal
-    final_principal = isa_principal + general_principal
-    profit_isa = isa_bal - isa_principal
-    monthly_div_final = sim_data[-1]['실제월배당']
-    
-    if is_isa:
-        taxable_isa = max(0, profit_isa - (isa_exempt * 10000))
-        tax_isa = taxable_isa * C.TAX_RATE_ISA_OVER 
-        real_money = final_asset - tax_isa
-        tax_msg = f"예상 세금 {tax_isa/10000:,.0f}만원 (9.9% 분리과세)"
-        monthly_pocket = monthly_div_final 
-    else:
-        real_money = final_asset
-        tax_msg = f"기납부 세금 {total_tax_paid_general/10000:,.0f}만원 (15.4% 원천징수)"
-        monthly_pocket = monthly_div_final * C.AFTER_TAX_RATIO
+    # 1. ISA 납입 스케줄 (연간 한도는 12, 24, 36...개월째에 초기화)
+    m = np.arange(1, months + 1)
+    year = m // 12
+    k = m - np.where(year == 0, 0, 12 * year - 1)  # 해당 납입 연도의 몇 번째 달인지 (1부터)
+    yearly_cum = np.minimum(k * add[:, None], C.ISA_YEARLY_CAP)
+    yearly_prev = np.minimum((k - 1) * add[:, None], C.ISA_YEARLY_CAP)
+    isa_cum = np.minimum(np.cumsum(yearly_cum - yearly_prev, axis=1), np.maximum(0, C.ISA_TOTAL_CAP - isa0)[:, None])
+    isa_cum = np.where(isa[:, None], isa_cum, 0.0)
+
+    isa_add = np.diff(isa_cum, axis=1, prepend=0.0)
+    gen_add = add[:, None] - isa_add
+
+    # 2. 잔고 경로 (ISA: 배당 전액 재투자 / 일반: 15.4% 원천징수 후 재투자)
+    isa_bal = _compound(isa0, isa_add, 1 + monthly_yld)
+    gen_bal = _compound(gen0, gen_add, 1 + monthly_yld * (1 - C.TAX_RATE_GENERAL))
+
+    # 3. 월 배당금 (납입 직후 잔고 기준) 및 일반 계좌 누적 세금
+    div_isa = (isa_bal[:, :-1] + isa_add) * monthly_yld[:, None]
+    div_gen = (gen_bal[:, :-1] + gen_add) * monthly_yld[:, None]
+    zeros = np.zeros((len(start), 1))
+
+    return {
+        "years": np.arange(months + 1) / 12,
+        "isa_bal": isa_bal,
+        "general_bal": gen_bal,
+        "isa_principal": np.concatenate([isa0[:, None], isa0[:, None] + isa_cum], axis=1),
+        "general_principal": np.concatenate([gen0[:, None], gen0[:, None] + np.cumsum(gen_add, axis=1)], axis=1),
+        "monthly_div": np.concatenate([zeros, div_isa + div_gen], axis=1),
+        "tax_general": np.concatenate([zeros, np.cumsum(div_gen * C.TAX_RATE_GENERAL, axis=1)], axis=1)
+    }
+
+def summarize_paths(paths, m, is_isa, apply_inflation):
+    """
+    경로 배열의 m개월 시점 요약 (벡터: P개 조건 동시)
+    - ISA: 비과세 200만원 초과 수익에 9.9% 분리과세 / 일반: 기납부 세금 표시, 월 배당 세후 환산
+    Returns: 각 (P,) 배열 dict
+    """
+    is_isa = np.asarray(is_isa, dtype=bool)
+    isa_bal, general_bal = paths['isa_bal'][:, m], paths['general_bal'][:, m]
+    final_principal = paths['isa_principal'][:, m] + paths['general_principal'][:, m]
+    monthly_div = paths['monthly_div'][:, m]
+
+    tax_isa = np.maximum(0, isa_bal - paths['isa_principal'][:, m] - 200 * 10000) * C.TAX_RATE_ISA_OVER
+    real_money = np.where(is_isa, isa_bal + general_bal - tax_isa, isa_bal + general_bal)
+    monthly_pocket = np.where(is_isa, monthly_div, monthly_div * C.AFTER_TAX_RATIO)
 
     if apply_inflation:
-        discount_rate = (1.0 + C.INFLATION_RATE) ** years
-        real_money = real_money / discount_rate
-        monthly_pocket = monthly_pocket / discount_rate
+        discount_rate = (1.0 + C.INFLATION_RATE) ** (m / 12)
+        real_money, monthly_pocket = real_money / discount_rate, monthly_pocket / discount_rate
 
     return {
-        "df": pd.DataFrame(sim_data),
         "real_money": real_money,
         "final_principal": final_principal,
         "monthly_pocket": monthly_pocket,
+        "tax_isa": tax_isa,
+        "tax_general": paths['tax_general'][:, m],
+        "general_bal": general_bal
+    }
+
+def _build_result(paths, row, years, is_isa, apply_inflation):
+    """경로 배열의 row번째 조건을 years년까지 잘라 화면용 결과 dict 구성"""
+    m = years * 12
+    one = {k: v[row:row + 1, :m + 1] for k, v in paths.items() if k != 'years'}
+    summary = {k: v[0] for k, v in summarize_paths(one, m, is_isa, apply_inflation).items()}
+
+    sim_df = pd.DataFrame({
+        "년차": np.arange(m + 1) / 12,
+        "자산총액": (one['isa_bal'][0] + one['general_bal'][0]) / 10000,
+        "총원금": (one['isa_principal'][0] + one['general_principal'][0]) / 10000,
+        "실제월배당": one['monthly_div'][0]
+    })
+
+    if is_isa: tax_msg = f"예상 세금 {summary['tax_isa']/10000:,.0f}만원 (9.9% 분리과세)"
+    else: tax_msg = f"기납부 세금 {summary['tax_general']/10000:,.0f}만원 (15.4% 원천징수)"
+
+    return {
+        "df": sim_df,
+        "real_money": summary['real_money'],
+        "final_principal": summary['final_principal'],
+        "monthly_pocket": summary['monthly_pocket'],
         "tax_msg": tax_msg,
-        "general_bal": general_bal,
+        "general_bal": summary['general_bal'],
         "is_isa": is_isa
     }
 
+def run_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, apply_inflation):
+    """
+    [로직] ISA/일반 계좌별 미래 자산 성장 시뮬레이션 (simulate_paths 1건 실행 + 요약)
+    """
+    paths = simulate_paths(start_money, monthly_add, years * 12, avg_y, is_isa)
+    return _build_result(paths, 0, years, is_isa, apply_inflation)
+
+
+# =======================================================
+# [PART 2-0] 파라미터 스윕 (기간 x 월 적립금 x 계좌 종류)
+# =======================================================
+
+SWEEP_MONTHLY_ADDS = np.arange(0, 3000 + 1, 10) * 10000  # 월 적립 입력 범위 (0~3,000만원, 10만원 단위)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def build_sweep_grid(start_money, avg_y):
+    """
+    [배치] 모든 (월 적립금 x ISA/일반) 조합을 최장 기간으로 1회 계산
+    - 납입/복리는 시간 순서대로만 진행되므로 짧은 기간은 최장 경로의 앞부분과 동일
+    - 물가상승률은 요약 단계의 할인이라 경로를 다시 계산할 필요 없음
+    * 약 10MB 배열이라 cache_data(조회마다 역직렬화/복사) 대신 cache_resource로 공유 -> 읽기 전용으로 고정
+    Returns: simulate_paths 결과 (행 = 계좌 종류(ISA, 일반) x 월 적립금 순서)
+    """
+    n = len(SWEEP_MONTHLY_ADDS)
+    is_isa = np.repeat([True, False], n)
+    adds = np.tile(SWEEP_MONTHLY_ADDS, 2)
+    grid = simulate_paths(start_money, adds, max(C.SIMULATION_YEARS) * 12, avg_y, is_isa)
+    for arr in grid.values(): arr.setflags(write=False)
+    return grid
+
+def _sweep_row(monthly_add, is_isa):
+    """스윕 격자의 행 번호 (격자에 없는 값이면 None)"""
+    pos = np.searchsorted(SWEEP_MONTHLY_ADDS, monthly_add)
+    if pos >= len(SWEEP_MONTHLY_ADDS) or SWEEP_MONTHLY_ADDS[pos] != monthly_add: return None
+    return int(pos) if is_isa else int(pos) + len(SWEEP_MONTHLY_ADDS)
+
+def lookup_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, apply_inflation):
+    """run_asset_simulation 과 같은 결과를 스윕 격자 조회로 반환 (격자 밖이면 직접 계산)"""
+    row = _sweep_row(monthly_add, is_isa)
+    if row is None or years * 12 > max(C.SIMULATION_YEARS) * 12:
+        return run_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, apply_inflation)
+    return _build_result(build_sweep_grid(start_money, avg_y), row, years, is_isa, apply_inflation)
+
+def memo_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, apply_inflation):
+    """run_asset_simulation(스윕 조회) 메모 버전"""
+    args = (_q_amount(start_money), _q_amount(monthly_add), int(years), _q_rate(avg_y), bool(is_isa), bool(apply_inflation))
+    return get_sim_memo().get_or_compute('asset', args, lambda: lookup_asset_simulation(*args))
+
+def sweep_final_assets(start_money, avg_y, is_isa, apply_inflation, monthly_adds):
+    """히트맵용: (기간 x 월 적립금) 별 최종 세후 자산 DataFrame (long format, 만원)"""
+    grid = build_sweep_grid(start_money, avg_y)
+    rows = [_sweep_row(a, is_isa) for a in monthly_adds]
+    sub = {k: v[rows] for k, v in grid.items() if k != 'years'}
+
+    records = []
+    for years in C.SIMULATION_YEARS:
+        real_money = summarize_paths(sub, years * 12, is_isa, apply_inflation)['real_money']
+        records.append(pd.DataFrame({"기간": years, "월적립": np.asarray(monthly_adds) / 10000, "최종자산": real_money / 10000}))
+    return pd.concat(records, ignore_index=True)
+
+
+# =======================================================
+# [PART 2-1] 몬테카를로 시뮬레이션 (Logic)
+# =======================================================
+
+def _parse_div_history(record):
+    """배당기록 문자열('35|35|...') -> 지급액 배열 (0 이하 제외)"""
+    try: values = np.array([float(v) for v in str(record).split('|') if v.strip()], dtype=float)
+    except ValueError: return np.array([])
+    return values[values > 0]
+
+def derive_mc_params(df_ana):
+    """
+    포트폴리오(비중/자산유형/환구분/배당기록) -> 몬테카를로 입력 파라미터 (월 단위)
+    - 가격 수익률·변동성: 자산유형 기본값의 비중 가중 평균
+    - 환율: 달러 노출 비중 x 원/달러 변동성
+    - 배당 변동성/배당컷: 배당기록에서 추정 (기록이 평탄하면 자산유형 기본값이 하한)
+    """
+    weights = df_ana['비중'].astype(float).to_numpy()
+    weights = weights / weights.sum() if weights.sum() > 0 else np.full(len(weights), 1 / max(len(weights), 1))
+
+    fx_col = df_ana['환구분'] if '환구분' in df_ana else pd.Series('-', index=df_ana.index)
+    record_col = df_ana['배당기록'] if '배당기록' in df_ana else pd.Series('', index=df_ana.index)
+
+    rows = []
+    for asset_type, fx, record in zip(df_ana['자산유형'], fx_col, record_col):
+        mu, vol, div_vol, cut_p, cut_size = C.MC_ASSET_PARAMS.get(asset_type, C.MC_ASSET_PARAMS['📈 주식형'])
+
+        hist = _parse_div_history(record)
+        if len(hist) >= 3:
+            ratios = hist[1:] / hist[:-1]
+            cuts = ratios < C.MC_CUT_THRESHOLD
+            payouts_per_year = len(hist)  # 배당기록은 최근 1년치
+            div_vol = max(div_vol, float(np.std(np.log(ratios[~cuts]))) * np.sqrt(payouts_per_year) if (~cuts).sum() > 1 else 0)
+            cut_p = max(cut_p, cuts.mean() * payouts_per_year)
+            if cuts.any(): cut_size = max(cut_size, float(np.mean(1 - ratios[cuts])))
+
+        usd = 1.0 if ('달러' in str(fx) or '환노출' in str(fx)) else 0.0
+        rows.append((mu, vol, div_vol, min(cut_p, 12.0), cut_size, usd))
+
+    mu, vol, div_vol, cut_p, cut_size, usd = (weights @ np.array(rows)) if rows else (0, 0, 0, 0, 0, 0)
+    return {
+        "mu": mu / 12,
+        "sigma": np.sqrt(vol ** 2 + (usd * C.MC_FX_VOL) ** 2) / np.sqrt(12),
+        "div_sigma": div_vol / np.sqrt(12),
+        "cut_prob": cut_p / 12,
+        "cut_size": cut_size
+    }
+
+def run_monte_carlo(start_money, monthly_add, years, avg_y, is_isa, params, apply_inflation=False,
+                    n_paths=C.MC_PATHS, chunk=C.MC_CHUNK, seed=C.MC_SEED):
+    """
+    [벡터 엔진] (경로 x 개월) 배열로 자산/월배당 경로를 한 번에 생성
+    - 매월: 적립 -> 배당 지급(배당률은 랜덤워크 + 배당컷 점프) -> 재투자 -> 가격·환율 변동
+    - 경로는 chunk 단위로 생성하여 중간 배열(float64) 메모리 상한 유지, 결과는 float32로 보관
+    - 백분위 밴드는 차트 해상도(최대 약 120개 시점)로만 계산 (예: 30년 -> 3개월 간격)
+    Returns: {"years", "asset": (3, T) 만원, "dividend": (3, T) 원} (행 = p10, p50, p90)
+    """
+    months = years * 12
+    step = max(1, months // 120)
+    grid = np.arange(step, months + 1, step) - 1  # 월별 배열(1개월차 = 0열)에서 뽑을 열
+
+    rng = np.random.default_rng(seed)
+    tax_factor = 1.0 if is_isa else C.AFTER_TAX_RATIO
+    base_yld = avg_y / 100 / 12
+    drift = np.float32(params['mu'] - 0.5 * params['sigma'] ** 2)
+    cut_log = np.float32(np.log1p(-min(params['cut_size'], 0.99)))
+
+    asset = np.empty((n_paths, len(grid) + 1), dtype=np.float32)
+    dividend = np.empty((n_paths, len(grid) + 1), dtype=np.float32)
+    asset[:, 0], dividend[:, 0] = start_money, 0
+
+    for s in range(0, n_paths, chunk):
+        n = min(chunk, n_paths - s)
+
+        # 1. 배당률 경로 (로그 랜덤워크 + 베르누이 배당컷)
+        shocks = rng.standard_normal((n, months), dtype=np.float32) * np.float32(params['div_sigma'])
+        if params['cut_prob'] > 0:
+            shocks += (rng.random((n, months), dtype=np.float32) < params['cut_prob']) * cut_log
+        yld = base_yld * np.exp(np.cumsum(shocks, axis=1, dtype=np.float64))
+
+        # 2. 월 성장률: 가격·환율(로그정규) x (1 + 세후 배당 재투자)
+        log_growth = rng.standard_normal((n, months), dtype=np.float32) * np.float32(params['sigma']) + drift
+        log_growth = log_growth + np.log1p(yld * tax_factor)
+
+        # 3. b[m] = (b[m-1] + 적립) * R[m]  ->  누적곱 닫힌 식 (월 반복문 없음)
+        P = np.exp(np.cumsum(log_growth, axis=1))
+        P_prev = np.concatenate([np.ones((n, 1)), P[:, :-1]], axis=1)
+        bal = P * (start_money + monthly_add * np.cumsum(1 / P_prev, axis=1))
+
+        bal_prev = np.concatenate([np.full((n, 1), float(start_money)), bal[:, :-1]], axis=1)
+        asset[s:s + n, 1:] = bal[:, grid]
+        dividend[s:s + n, 1:] = (bal_prev[:, grid] + monthly_add) * yld[:, grid]
+
+    q = np.percentile(asset, [10, 50, 90], axis=0) / 10000
+    d = np.percentile(dividend, [10, 50, 90], axis=0)
+
+    years_axis = np.concatenate([[0], grid + 1]) / 12
+    if apply_inflation:
+        discount = (1.0 + C.INFLATION_RATE) ** years_axis
+        q, d = q / discount, d / discount
+
+    return {"years": years_axis, "asset": q, "dividend": d}
+
+@st.cache_data(show_spinner=False)
+def _cached_monte_carlo(start_money, monthly_add, years, avg_y, is_isa, params_items, apply_inflation):
+    """같은 조건 재실행(탭 이동, 위젯 조작) 시 재계산 방지"""
+    return run_monte_carlo(start_money, monthly_add, years, avg_y, is_isa, dict(params_items), apply_inflation)
+
 
 # =======================================================
 # [PART 3] 10년 자산 시뮬레이션 (UI)
 # =======================================================
 
-def render_10y_sim_page(total_invest, avg_y, saved_monthly):
-    """10년 자산 시뮬레이션 탭 전체 화면 표시"""
+def render_10y_sim_page(total_invest, avg_y, saved_monthly, df_ana=None):
+    """10년 자산 시뮬레이션 탭 전체 화면 표시 (df_ana: 선택 종목 구성, 몬테카를로 모드용)"""
     start_money = total_invest
     is_over_100m = start_money > 100000000
     
@@ -193,14 +461,25 @@ def render_10y_sim_page(total_invest, avg_y, saved_monthly):
     if is_isa_mode and monthly_add > isa_limit_mo:
         st.warning(f"⚠️ **ISA 연간 한도 제한:** 월 납입금이 **약 {isa_limit_mo/10000:,.0f}만원**을 초과하면 초과분은 일반 계좌로 자동 계산됩니다.")
 
-    result = run_asset_simulation(start_money, monthly_add, years_sim, avg_y, is_isa_mode, apply_inflation)
+    # 같은 조건은 세션 공유 메모에서, 새 조건도 캐시된 스윕 격자 조회만 수행
+    result = memo_asset_simulation(start_money, monthly_add, years_sim, avg_y, is_isa_mode, apply_inflation)
     
     base = alt.Chart(result['df']).encode(x=alt.X('년차:Q', title='경과 기간 (년)'))
     area = base.mark_area(opacity=0.3, color='#0068c9').encode(y=alt.Y('자산총액:Q', title='자산 (만원)'))
     line = base.mark_line(color='#ff9f43', strokeDash=[5,5]).encode(y='총원금:Q')
     st.altair_chart((area + line).properties(height=280), use_container_width=True)
 
+    if df_ana is not None and not df_ana.empty:
+        use_mc = st.toggle("🎲 변동성 반영 (몬테카를로 시뮬레이션)", value=False, help="주가·환율 변동과 배당컷을 무작위로 반영한 1만 개 시나리오의 분포를 보여줍니다.")
+        if use_mc:
+            _render_monte_carlo(df_ana, start_money, monthly_add, years_sim, avg_y, is_isa_mode, apply_inflation)
+
     _render_result_card(result, years_sim, apply_inflation)
+
+    with st.expander("🗺️ 기간 x 월 적립금별 최종 자산 한눈에 보기"):
+        # expander 본문은 접혀 있어도 매번 실행되므로 사용자가 켰을 때만 계산
+        if st.toggle("히트맵 보기", value=False, key="toggle_sweep_heatmap"):
+            _render_sweep_heatmap(start_money, avg_y, is_isa_mode, apply_inflation, monthly_add)
     
     annual_div = result['monthly_pocket'] * 12
     if annual_div > C.ISA_YEARLY_CAP: 
@@ -212,6 +491,46 @@ def render_10y_sim_page(total_invest, avg_y, saved_monthly):
             2. 재투자가 매월 이루어진다는 가정하에 계산된 복리 결과입니다.
             """)
 
+def _render_sweep_heatmap(start_money, avg_y, is_isa, apply_inflation, monthly_add):
+    """[내부함수] (기간 x 월 적립금) 최종 세후 자산 히트맵"""
+    top = min(3000, max(500, int(monthly_add / 10000) * 2))
+    adds = sorted({a for a in range(0, top + 1, max(10, top // 10 // 10 * 10))} | {int(monthly_add / 10000) // 10 * 10})
+    df_heat = sweep_final_assets(start_money, avg_y, is_isa, apply_inflation, [a * 10000 for a in adds])
+    df_heat['라벨'] = (df_heat['최종자산'] / 10000).map(lambda v: f"{v:.1f}억")
+
+    base = alt.Chart(df_heat).encode(
+        x=alt.X('월적립:O', title='월 적립금 (만원)'),
+        y=alt.Y('기간:O', title='투자 기간 (년)')
+    )
+    rect = base.mark_rect().encode(
+        color=alt.Color('최종자산:Q', title='최종 자산 (만원)', scale=alt.Scale(scheme='blues')),
+        tooltip=['기간', '월적립', alt.Tooltip('최종자산:Q', format=',.0f')]
+    )
+    text = base.mark_text(fontSize=10).encode(
+        text='라벨:N',
+        color=alt.condition(alt.datum.최종자산 > df_heat['최종자산'].median(), alt.value('white'), alt.value('#333'))
+    )
+    st.altair_chart((rect + text).properties(height=260), use_container_width=True)
+    st.caption(f"💡 {'ISA' if is_isa else '일반'} 계좌 · 세후 기준{' · 현재가치 환산' if apply_inflation else ''}")
+
+def _render_monte_carlo(df_ana, start_money, monthly_add, years, avg_y, is_isa, apply_inflation):
+    """[내부함수] 몬테카를로 백분위 밴드 차트 (p10 ~ p90, 중앙값)"""
+    params = derive_mc_params(df_ana)
+    mc = _cached_monte_carlo(start_money, monthly_add, years, avg_y, is_isa, tuple(sorted((k, float(v)) for k, v in params.items())), apply_inflation)
+
+    df_band = pd.DataFrame({"년차": mc['years'], "하위10%": mc['asset'][0], "중앙값": mc['asset'][1], "상위10%": mc['asset'][2]})
+    base = alt.Chart(df_band).encode(x=alt.X('년차:Q', title='경과 기간 (년)'))
+    band = base.mark_area(opacity=0.25, color='#7950f2').encode(y=alt.Y('하위10%:Q', title='자산 (만원)'), y2='상위10%:Q')
+    median = base.mark_line(color='#7950f2').encode(y='중앙값:Q', tooltip=['년차', '하위10%', '중앙값', '상위10%'])
+    st.altair_chart((band + median).properties(height=240), use_container_width=True)
+
+    pocket = mc['dividend'][:, -1] * (1.0 if is_isa else C.AFTER_TAX_RATIO)
+    p10, p50, p90 = mc['asset'][:, -1]
+    st.caption(
+        f"🎲 {years}년 뒤 자산 (10/50/90%): **{p10:,.0f} / {p50:,.0f} / {p90:,.0f}만원** · "
+        f"월 배당금: **{pocket[0]/10000:,.1f} / {pocket[1]/10000:,.1f} / {pocket[2]/10000:,.1f}만원**"
+    )
+
 def _render_result_card(res, years, inflation):
     """[내부함수] 결과 카드 HTML 생성"""
     real_money = res['real_money']
@@ -308,7 +627,7 @@ def render_goal_sim_page(selected_stocks, avg_y, total_invest):
         st.caption(f"보유: {total_invest/10000:,.0f}만원")
 
     # [내부 호출] 계산 로직 실행
-    sim_result = calculate_goal_simulation(
+    sim_result = memo_goal_simulation(
         target_monthly_goal, 
         avg_y, 
         total_invest, 
@@ -345,6 +664,10 @@ def render_goal_sim_page(selected_stocks, avg_y, total_invest):
             else:
                 st.success("🎉 이미 목표 달성! 은퇴하셔도 됩니다.")
         
+    # 목표 금액별 소요 기간 곡선 (해석해라 목표 수백 개도 한 번에 계산)
+    if avg_y > 0:
+        _render_goal_curve(input_val, avg_y, total_invest, use_start_money)
+
     st.write("") 
     st.info("💡 이 계산은 **추가 납입 없이**, 배당금 재투자만으로 목표에 도달하는 기준입니다.")
     st.error("""
@@ -352,3 +675,33 @@ def render_goal_sim_page(selected_stocks, avg_y, total_invest):
             1. 본 결과는 주가·환율 변동을 제외하고, 현재 배당률로만 계산한 단순 결과입니다.
             2. 재투자가 매월 이루어진다는 가정하에 계산된 복리 결과입니다.
             """)
+
+def _render_goal_curve(target_man, avg_y, total_invest, use_start_money):
+    """[내부함수] 목표 월 배당금(만원) vs 달성 기간(년) 곡선"""
+    targets = np.arange(10, max(500, target_man * 2) + 1, 10)
+    monthly_add = st.session_state.get("shared_monthly_input", 0) * 10000
+
+    scenarios = {"재투자만": 0}
+    if monthly_add > 0: scenarios[f"재투자 + 월 {monthly_add/10000:,.0f}만원 적립"] = monthly_add
+
+    frames = []
+    for label, add in scenarios.items():
+        res = calculate_goal_simulation(targets * 10000, avg_y, total_invest, use_start_money, monthly_add=add)
+        frames.append(pd.DataFrame({
+            "목표월배당": targets,
+            "달성기간": np.where(res['is_impossible'], np.nan, res['months_passed'] / 12),
+            "조건": label
+        }))
+    df_curve = pd.concat(frames, ignore_index=True)
+
+    st.write("")
+    st.markdown("**📈 목표 금액별 달성 기간**")
+    line = alt.Chart(df_curve).mark_line().encode(
+        x=alt.X('목표월배당:Q', title='목표 월 배당금 (만원, 세후)'),
+        y=alt.Y('달성기간:Q', title='달성 기간 (년)'),
+        color=alt.Color('조건:N', legend=alt.Legend(orient='bottom', title=None)),
+        tooltip=['조건', '목표월배당', alt.Tooltip('달성기간:Q', format='.1f')]
+    )
+    rule = alt.Chart(pd.DataFrame({"목표월배당": [target_man]})).mark_rule(color='#ff6b6b', strokeDash=[4, 4]).encode(x='목표월배당:Q')
+    st.altair_chart((line + rule).properties(height=260), use_container_width=True)
+    st.caption("💡 빨간 점선은 현재 입력한 목표입니다. 60년 이상 걸리는 구간은 표시하지 않습니다.")
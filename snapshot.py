@@ -0,0 +1,101 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: snapshot.py
+설명: 가공된 종목 데이터의 Parquet 스냅샷 (새 워커 콜드 스타트 시 즉시 표시 -> 가격은 백그라운드 갱신)
+"""
+
+import os
+import json
+import time
+import threading
+import pandas as pd
+from logger import logger
+import constants as C
+import dividend_calendar
+import universe
+
+# 오늘 날짜 기준으로 다시 계산하는 컬럼 (스냅샷에는 저장하지 않음)
+_DERIVED_COLS = ['배당규칙', '배당일', '영업일기준', '배당시기', '배당락일목록']
+_META_KEY = b'dividend_snapshot'
+_save_lock = threading.Lock()
+_last_saved_at = None  # 마지막 저장 시각 (프로세스 메모리, None이면 아직 모름 -> 백그라운드에서 파일 메타로 확인)
+
+# =============================================================================
+# [SECTION 1] 저장
+# =============================================================================
+
+def read_meta():
+    """스냅샷 메타 정보 {'saved_at', 'rows'} (없으면 None)"""
+    if not os.path.exists(C.SNAPSHOT_FILE): return None
+    try:
+        import pyarrow.parquet as pq
+        meta = pq.read_schema(C.SNAPSHOT_FILE).metadata or {}
+        return json.loads(meta[_META_KEY]) if _META_KEY in meta else None
+    except Exception as e:
+        logger.error(f"Snapshot Meta Error: {e}")
+        return None
+
+def save_snapshot(df):
+    """가공 데이터(현재가 포함)를 Parquet 1개 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    frame = df.drop(columns=[c for c in _DERIVED_COLS if c in df.columns])
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    meta = {'saved_at': time.time(), 'rows': len(frame)}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(meta).encode()})
+
+    tmp_path = C.SNAPSHOT_FILE + ".tmp"
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, C.SNAPSHOT_FILE)
+    return meta
+
+def save_snapshot_if_stale(df):
+    """
+    마지막 저장 후 C.SNAPSHOT_SAVE_INTERVAL이 지났을 때만 백그라운드 저장 (동시에 1개만)
+    * 요청 스레드는 메모리의 저장 시각만 확인 (파일 메타 확인/쓰기는 모두 백그라운드 스레드)
+    """
+    if _last_saved_at is not None and time.time() - _last_saved_at < C.SNAPSHOT_SAVE_INTERVAL: return
+    if not _save_lock.acquire(blocking=False): return
+
+    def _worker():
+        global _last_saved_at
+        try:
+            if _last_saved_at is None:  # 프로세스 첫 확인: 다른 워커가 최근에 저장했으면 건너뜀
+                meta = read_meta()
+                if meta and time.time() - meta['saved_at'] < C.SNAPSHOT_SAVE_INTERVAL:
+                    _last_saved_at = meta['saved_at']
+                    return
+            saved = save_snapshot(df)
+            _last_saved_at = saved['saved_at']
+            logger.info(f"💾 데이터 스냅샷 저장 완료 ({saved['rows']}건)")
+        except Exception as e:
+            _last_saved_at = time.time()  # 실패 시에도 다음 시도는 저장 간격 이후
+            logger.error(f"Snapshot Save Error: {e}")
+        finally:
+            _save_lock.release()
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+
+# =============================================================================
+# [SECTION 2] 로드
+# =============================================================================
+
+def load_snapshot(max_age=C.SNAPSHOT_MAX_AGE):
+    """
+    스냅샷 로드 -> (가공 데이터, 가격 dict, 메타) / 없거나 너무 오래됐으면 None
+    * 배당 일정 컬럼은 오늘 날짜 기준으로 다시 계산
+    """
+    meta = read_meta()
+    if not meta or time.time() - meta['saved_at'] > max_age: return None
+    try:
+        frame = pd.read_parquet(C.SNAPSHOT_FILE)
+    except Exception as e:
+        logger.error(f"Snapshot Load Error: {e}")
+        return None
+
+    prices = {(code, str(cat)): float(p) for code, cat, p in zip(frame['코드'], frame['분류'], frame['현재가']) if p > 0}
+    frame = universe.to_universe(dividend_calendar.normalize_calendar(frame))
+    return frame, prices, meta
@@ -0,0 +1,14 @@
+-- 포트폴리오 일괄 재평가용: 요약 필드(ticker_data.summary)만 병합 (구성 등 나머지 필드는 DB 쪽 최신 값 유지)
+-- 적용: supabase db push 또는 Supabase SQL Editor에서 1회 실행
+-- 호출: db.bulk_update_summaries -> rpc('merge_portfolio_summaries', {'rows': [{'id', 'summary'}, ...]}) -> 반영된 건수
+
+create or replace function merge_portfolio_summaries(rows jsonb) returns integer
+language sql as $$
+  with updated as (
+    update portfolios p
+       set ticker_data = jsonb_set(coalesce(p.ticker_data, '{}'::jsonb), '{summary}', r.summary)
+      from jsonb_to_recordset(rows) as r(id text, summary jsonb)
+     where p.id::text = r.id
+    returning 1)
+  select count(*)::integer from updated;
+$$;
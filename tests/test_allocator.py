@@ -0,0 +1,126 @@
+import numpy as np
+
+import allocator
+import constants as C
+
+
+def _random_batch(rng, B=300, K=4):
+    """무작위 후보 조합 (종목 수 2~K, 일부는 원픽 고정 비중 포함)"""
+    n = rng.integers(2, K + 1, B)
+    mask = np.arange(K)[None, :] < n[:, None]
+    fixed = np.full((B, K), np.nan)
+    has_focus = rng.random(B) < 0.3
+    fixed[has_focus, 0] = rng.choice([0.1, 0.2, 0.3], has_focus.sum())
+    yields = rng.uniform(2, 15, (B, K))
+    style_group = rng.random((B, K)) < 0.4
+    usd = rng.random((B, K)) < 0.4
+    timing_ok = rng.random((B, K)) < 0.6
+    return yields, mask, fixed, style_group, usd, timing_ok
+
+
+def _witness(rng, mask, fixed, tries=200):
+    """제약과 무관하게 상·하한/합계만 맞춘 무작위 비중 여러 개 (행별 충족 가능성 확인용)"""
+    lo, hi, _, _ = allocator._bounds(mask, fixed)
+    return [allocator.project_box_simplex(rng.uniform(-1, 1, mask.shape), lo, hi) for _ in range(tries)]
+
+
+def test_project_box_simplex_matches_bisection():
+    rng = np.random.default_rng(0)
+    v = rng.normal(size=(50, 4))
+    lo, hi = np.full((50, 4), 0.1), np.full((50, 4), 0.5)
+    lo[:, 3] = hi[:, 3] = 0.0
+    w = allocator.project_box_simplex(v, lo, hi)
+    assert np.allclose(w.sum(axis=1), 1)
+    for b in range(50):
+        a, c = -10.0, 10.0
+        for _ in range(100):
+            t = (a + c) / 2
+            if np.clip(v[b] - t, lo[b], hi[b]).sum() > 1: a = t
+            else: c = t
+        assert np.allclose(np.clip(v[b] - t, lo[b], hi[b]), w[b], atol=1e-7)
+
+
+def test_constraints_hold_on_feasible_inputs():
+    rng = np.random.default_rng(1)
+    yields, mask, fixed, style_group, usd, timing_ok = _random_batch(rng)
+    cons = dict(style_group=style_group, style_min=0.5, usd=usd, timing_ok=timing_ok)
+
+    feasible = np.zeros(len(mask), dtype=bool)
+    for w0 in _witness(rng, mask, fixed):
+        feasible |= allocator.check_constraints(w0, mask, fixed, **cons)
+    assert feasible.sum() > 50
+
+    w, objective, _ = allocator.allocate_batch(yields, mask, fixed, 7.0, **cons)
+    ok = allocator.check_constraints(w, mask, fixed, **cons, tol=1e-4)
+    assert np.isfinite(objective[feasible]).all()
+    assert ok[feasible].all()
+    assert not np.isfinite(objective[~ok]).any()  # 제약을 못 지킨 조합은 항상 탈락
+
+
+def test_safe_style_bond_floor_is_hard():
+    # 채권 1개(저배당) + 고배당 2개: 목표 배당률이 높아도 채권 50%는 지켜야 함
+    yields = np.array([[3.0, 12.0, 14.0]])
+    mask = np.ones((1, 3), dtype=bool)
+    fixed = np.full((1, 3), np.nan)
+    bond = np.array([[True, False, False]])
+    w, objective, _ = allocator.allocate_batch(yields, mask, fixed, 12.0, style_group=bond, style_min=0.5)
+    assert np.isfinite(objective[0])
+    assert w[0, 0] >= 0.5 - 1e-6
+
+
+def test_max_weight_is_never_loosened():
+    # 2종목 중 원픽 5% 고정 -> 나머지 1종목이 95%가 되어야 하므로 불가
+    yields = np.array([[5.0, 8.0]])
+    mask = np.ones((1, 2), dtype=bool)
+    fixed = np.array([[0.05, np.nan]])
+    w, objective, _ = allocator.allocate_batch(yields, mask, fixed, 7.0)
+    assert not np.isfinite(objective[0])
+    assert (w[0] <= C.ALLOC_MAX_WEIGHT + 1e-9).all()
+
+
+def test_all_fixed_not_summing_to_one_is_rejected():
+    yields = np.array([[5.0, 8.0]])
+    mask = np.ones((1, 2), dtype=bool)
+    fixed = np.array([[0.2, 0.2]])
+    _, objective, _ = allocator.allocate_batch(yields, mask, fixed, 7.0)
+    assert not np.isfinite(objective[0])
+
+
+def test_to_percent_sums_to_100():
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        w = rng.dirichlet(np.ones(rng.integers(1, 5)))
+        pct = allocator.to_percent(w)
+        assert sum(pct) == 100
+        assert all(abs(p - x * 100) < 1 for p, x in zip(pct, w))
+
+
+def _universe(rows):
+    """추천 엔진용 최소 가공 데이터 [(이름, 분류, 자산유형, 연배당률), ...]"""
+    import pandas as pd
+    return pd.DataFrame([{'pure_name': n, '분류': cat, '자산유형': asset, '연배당률': y, '배당시기': 'end'}
+                         for n, cat, asset, y in rows])
+
+
+def test_recommendation_relaxes_style_floor_when_universe_has_no_bonds():
+    import recommendation
+    df = _universe([(f"국내고배당{c}", '국내', '📈 주식형', 4.0 + i) for i, c in enumerate("ABCDEF")])
+    for _ in range(5):
+        title, picks, weights = recommendation.get_smart_recommendation(df, {'style': 'safe', 'count': 3, 'target_yield': 6.0})
+        assert "(자산군 비중 완화)" in title
+        assert len(picks) == 3 and sum(weights.values()) == 100
+        assert max(weights.values()) <= C.ALLOC_MAX_WEIGHT * 100
+
+
+def test_recommendation_relaxes_usd_cap_for_foreign_only_universe():
+    import recommendation
+    df = _universe([(f"US{c}", '해외', '📈 주식형', 3.0 + i) for i, c in enumerate("ABCDEF")])
+    title, picks, weights = recommendation.get_smart_recommendation(df, {'style': 'balance', 'count': 3, 'target_yield': 5.0})
+    assert "(달러 비중 완화)" in title and "(자산군 비중 완화)" not in title
+    assert sum(weights.values()) == 100
+
+
+def test_recommendation_reports_no_match_when_caps_cannot_be_met():
+    import recommendation
+    df = _universe([("국내고배당A", '국내', '📈 주식형', 5.0)])  # 1종목 -> 최대 비중 50%로 100%를 채울 수 없음
+    assert recommendation.get_smart_recommendation(df, {'style': 'safe', 'count': 3}) == ("조건에 맞는 종목 없음", [], {})
@@ -0,0 +1,95 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import business_calendar as bc
+import constants as C
+import logic
+
+D = datetime.date
+
+
+@pytest.fixture(scope="module")
+def krx():
+    return bc.get_calendar(bc.KRX)
+
+
+@pytest.fixture(scope="module")
+def nyse():
+    return bc.get_calendar(bc.NYSE)
+
+
+def test_weekends_and_holidays_are_closed(krx, nyse):
+    assert krx.is_business_day(D(2026, 2, 13))
+    for day in (D(2026, 2, 14), D(2026, 2, 15), D(2026, 2, 16), D(2026, 2, 17), D(2026, 2, 18), D(2026, 12, 31)):
+        assert not krx.is_business_day(day)                          # 주말 / 설 연휴 / 연말 휴장
+    for day in (D(2026, 4, 3), D(2026, 7, 3), D(2026, 11, 26), D(2025, 1, 9)):
+        assert not nyse.is_business_day(day)                         # Good Friday / 7-4 대체 / 추수감사절 / 임시 휴장
+    assert nyse.is_business_day(D(2026, 2, 18)) and krx.is_business_day(D(2026, 4, 3))
+
+
+def test_roll_back_and_forward(krx):
+    assert krx.roll_back(D(2026, 2, 18)) == D(2026, 2, 13)
+    assert krx.roll_forward(D(2026, 2, 18)) == D(2026, 2, 19)
+    assert krx.roll_back(D(2026, 3, 1)) == D(2026, 2, 27)           # 일요일 + 삼일절
+    assert krx.roll_back(D(2026, 2, 19)) == D(2026, 2, 19)           # 영업일은 그대로
+    assert krx.roll_forward(D(2026, 2, 19)) == D(2026, 2, 19)
+
+
+def test_business_day_offsets_skip_holidays(krx):
+    # 2026-02-20(금) D-4: 19(목) / 13(금) / 12(목) / 11(수) -> 설 연휴 3일 + 주말 건너뜀
+    assert krx.business_days_before(D(2026, 2, 20), 4) == D(2026, 2, 11)
+    # 기준일이 휴장일이어도 기준일 제외 N 영업일 전
+    assert krx.business_days_before(D(2026, 2, 15), 1) == D(2026, 2, 13)
+    assert krx.business_days_after(D(2026, 2, 13), 1) == D(2026, 2, 19)
+    assert krx.business_days_after(D(2026, 2, 14), 1) == D(2026, 2, 19)
+
+
+def test_offsets_match_naive_day_walk(krx, nyse):
+    def walk(cal, day, n):
+        while n:
+            day -= datetime.timedelta(days=1)
+            if cal.is_business_day(day): n -= 1
+        return day
+
+    days = np.arange(np.datetime64('2025-01-01'), np.datetime64('2027-12-31'))
+    for cal in (krx, nyse):
+        got = cal.business_days_before(days, C.BUY_LEAD_BUSINESS_DAYS)
+        expected = [walk(cal, d.item(), C.BUY_LEAD_BUSINESS_DAYS) for d in days]
+        assert [g.item() for g in got] == expected
+
+
+def test_month_edges(krx, nyse):
+    assert krx.last_business_day(2026, 1) == D(2026, 1, 30)
+    assert krx.last_business_day(2026, 12) == D(2026, 12, 30)
+    assert krx.first_business_day(2026, 3) == D(2026, 3, 3)        # 03-02 대체공휴일
+    assert nyse.first_business_day(2026, 1) == D(2026, 1, 2)
+    ends = krx.last_business_day(np.array([2026, 2026]), np.array([1, 12]))
+    assert [d.item() for d in ends] == [D(2026, 1, 30), D(2026, 12, 30)]
+
+
+def test_buy_date_before_uses_exchange_calendar():
+    assert logic.buy_date_before(D(2026, 2, 20), '국내') == D(2026, 2, 11)
+    assert logic.buy_date_before(D(2026, 2, 20), '해외') == D(2026, 2, 13)  # 2-16 Washington's Birthday
+
+
+def test_out_of_range_dates_raise(krx):
+    with pytest.raises(ValueError):
+        krx.roll_back(D(C.BIZCAL_YEARS[1] + 1, 1, 1))
+
+
+def test_schedules_stop_at_last_year_with_a_holiday_table():
+    last = max(bc._KRX_HOLIDAYS)
+    today = D(last, 6, 1)
+    assert bc.last_reliable_year(bc.KRX, today) == last
+    assert bc.last_reliable_year(bc.KRX, D(last + 2, 1, 1)) == last + 2  # 표가 오래돼도 올해 일정은 유지
+    assert bc.last_reliable_year(bc.NYSE, today) == C.BIZCAL_YEARS[1]
+
+    import dividend_calendar as dc
+    krx_dates = dc.next_ex_dates("매월 15일(영업일 기준)", today, count=24)
+    assert krx_dates and max(d.year for d in krx_dates) == last
+    assert len(dc.next_ex_dates("매월 15일(영업일 기준)", today, count=24, market=bc.NYSE)) == 24
+
+    ics = "\n".join(logic.iter_portfolio_ics([{'종목': 'A', '배당락일': '매월 15일', '분류': '국내'}], years=3, today=today))
+    assert f"DTSTART;VALUE=DATE:{last}12" in ics and f"DTSTART;VALUE=DATE:{last + 1}" not in ics
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import classifier
+import constants as C
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- 기존 if-chain (리팩토링 전 logic.classify_asset / get_hedge_status / analysis._get_clean_data) ---
+
+def _old_asset(name, symbol):
+    name, symbol = str(name).upper(), str(symbol).upper()
+    if any(k in name or k in symbol for k in ['커버드콜', 'COVERED', 'QYLD', 'JEPI', 'JEPQ', 'NVDY', 'TSLY', 'QQQI', '타겟위클리']): return '🛡️ 커버드콜'
+    if any(k in name or k in symbol for k in ['채권', '국채', 'BOND', 'TLT', '하이일드', 'HI-YIELD']): return '🏦 채권형'
+    if '리츠' in name or 'REITS' in name or 'INFRA' in name or '인프라' in name: return '🏢 리츠형'
+    if '혼합' in name: return '⚖️ 혼합형'
+    return '📈 주식형'
+
+def _old_hedge(name, category):
+    name_str = str(name).upper()
+    if category == '해외': return "💲달러(직투)"
+    if "환노출" in name_str or "UNHEDGED" in name_str: return "⚡환노출"
+    if any(x in name_str for x in ["(H)", "헤지"]): return "🛡️환헤지(H)"
+    return "⚡환노출" if any(x in name_str for x in ['미국', 'GLOBAL', 'S&P500', '나스닥', '국제']) else "-"
+
+def _old_holding(raw_name, raw_sector):
+    name = str(raw_name).upper().strip()
+    if any(x in name for x in C.EXCLUDE_KEYWORDS):
+        if not any(safe in name for safe in C.SECTOR_KEYWORDS['Cash']):
+            return None, None
+    clean_name = name
+    for standard_name, keywords in C.STOCK_NAME_MAPPING.items():
+        if any(k in name for k in keywords):
+            clean_name = standard_name
+            break
+    sector = str(raw_sector)
+    if any(k in clean_name for k in C.SECTOR_KEYWORDS['HighYield']) or '고수익' in sector: sector = "🔥 하이일드"
+    elif any(k in clean_name for k in C.SECTOR_KEYWORDS['Cash']): sector = "🛡️ 현금"
+    elif any(k in clean_name for k in C.SECTOR_KEYWORDS['Bond_Long']): sector = "📉 국채"
+    elif clean_name in C.SECTOR_KEYWORDS['BigTech']: sector = "💻 빅테크"
+    elif '금융' in sector or '은행' in clean_name or '지주' in clean_name: sector = "💰 금융"
+    elif '리츠' in sector or '부동산' in clean_name or '인프라' in clean_name: sector = "🏢 리츠"
+    elif '산업재' in sector or '자동차' in clean_name: sector = "🚗 산업재"
+    elif '필수소비재' in sector: sector = "🛒 소비재"
+    return clean_name, sector
+
+
+def _fuzz_names(n=3000, seed=0):
+    """키워드 조각을 이어 붙인 이름 (키워드 겹침/접두어/대소문자 섞임)"""
+    words = sorted(classifier._KEYWORDS) + ['kodex', 'bil', 'Tlt', '미국', '배당', ' ', '(H)', '30년', 'CORP', '고수익', 'ABC']
+    rng = np.random.default_rng(seed)
+    return ["".join(rng.choice(words, rng.integers(1, 5))) for _ in range(n)]
+
+
+def test_listed_stock_classification_matches_old_if_chain():
+    stocks = pd.read_csv(os.path.join(ROOT, 'stocks.csv'), dtype=str).fillna('')
+    cases = list(zip(stocks['종목명'], stocks['종목코드'], stocks['분류']))
+    cases += [(n, s, cat) for n, s in zip(_fuzz_names(), _fuzz_names(seed=1)) for cat in ('국내', '해외')]
+    for name, symbol, category in cases:
+        got = classifier.classify(name, symbol, category)
+        assert got.asset_type == _old_asset(name, symbol), (name, symbol)
+        assert got.hedge == _old_hedge(name, category), (name, category)
+
+
+def test_holding_classification_matches_old_if_chain():
+    sectors = ['기타', '금융', '리츠', '산업재', '필수소비재', '고수익채권', 'IT']
+    names = ['NVIDIA CORP', 'APPLE INC', 'USD CASH', 'KRW 현금', 'BILIBILI INC', 'ISHARES 20+ TLT', '신한지주',
+             'KODEX 200', '현대자동차', '맥쿼리인프라', 'ALPHABET INC CLASS A', '  meta platforms  ', '원화예금']
+    names += _fuzz_names(seed=2)
+    for i, name in enumerate(names):
+        sector = sectors[i % len(sectors)]
+        assert tuple(classifier.classify_holding(name, sector)) == _old_holding(name, sector), (name, sector)
@@ -0,0 +1,100 @@
+import calendar
+import datetime
+import re
+
+import pandas as pd
+import pytest
+
+import dividend_calendar as dc
+
+D = datetime.date
+
+
+@pytest.mark.parametrize("text, kind, day, business", [
+    ("2026.03.15", dc.RULE_DATE, 15, False),
+    ("2026/3/5", dc.RULE_DATE, 5, False),
+    ("매월 말일", dc.RULE_MONTH_END, 0, False),
+    ("매월 마지막영업일", dc.RULE_MONTH_END, 0, True),
+    ("매월 하순(20~25일)", dc.RULE_MONTH_END, 0, False),
+    ("월말 (END)", dc.RULE_MONTH_END, 0, False),
+    ("매월 초(1~3일 전후)", dc.RULE_MONTH_START, 0, False),
+    ("매월 15일(영업일 기준)", dc.RULE_DAY, 15, True),
+    ("매월 20일 전후 (미국 현지 시간)", dc.RULE_DAY, 20, False),
+    ("중순", dc.RULE_DAY, 15, False),
+    ("매월 45일", dc.RULE_DAY, 31, False),
+    ("-", dc.RULE_UNKNOWN, 0, False),
+    ("nan", dc.RULE_UNKNOWN, 0, False),
+])
+def test_parse_rule(text, kind, day, business):
+    rule = dc.parse_rule(text)
+    assert (rule.kind, rule.day, rule.business_adjusted) == (kind, day, business)
+
+
+def test_timing_category_and_representative_day():
+    cases = {"매월 초": ('early', 1), "매월 5일": ('early', 5), "매월 15일": ('mid', 15),
+             "매월 25일": ('end', 25), "매월 마지막영업일": ('end', 30), "-": ('unknown', 15)}
+    for text, (timing, day) in cases.items():
+        rule = dc.parse_rule(text)
+        assert dc.timing_category(rule) == timing and dc.representative_day(rule) == day
+
+
+# --- 기존 parse_dividend_date (규칙 인덱스 도입 전, today 주입 가능하게) ---
+
+def _old_parse(date_str, today):
+    s = dc.standardize_date_format(str(date_str))
+    try:
+        return datetime.datetime.strptime(s, "%Y-%m-%d").date()
+    except ValueError:
+        pass
+    is_end = any(k in s for k in ['말일', '월말', '마지막', '하순', 'END'])
+    is_start = any(k in s for k in ['매월 초', '월초', '1~3일', 'BEGIN'])
+    day_match = re.search(r'(\d+)', s)
+    if not (is_end or is_start or (day_match and ('매월' in s or '일' in s))): return None
+    day = calendar.monthrange(today.year, today.month)[1] if is_end else 1 if is_start else int(day_match.group(1))
+    target = D(today.year, today.month, min(day, calendar.monthrange(today.year, today.month)[1]))
+    if target >= today: return target
+    year, month = (today.year, today.month + 1) if today.month < 12 else (today.year + 1, 1)
+    last = calendar.monthrange(year, month)[1]
+    return D(year, month, last if is_end else 1 if is_start else min(day, last))
+
+
+def test_next_ex_date_matches_old_parser_for_calendar_day_rules():
+    texts = ["매월 말일", "매월 하순(20~25일)", "매월 초(1~3일 사이)", "매월 15일", "매월 20일 전후 (미국 현지 시간)",
+             "매월 31일", "매월 30일", "2026-03-15", "-"]
+    today = D(2026, 1, 1)
+    while today < D(2027, 1, 1):
+        for text in texts:
+            assert dc.next_ex_date(text, today) == _old_parse(text, today), (text, today)
+        today += datetime.timedelta(days=1)
+
+
+def test_next_ex_dates_rolls_business_rules_back_over_holidays():
+    # 2026-12-31 KRX 휴장 -> 12-30 / 2027-01-31 일요일 -> 01-29
+    assert dc.next_ex_dates("매월 마지막영업일", D(2026, 12, 1), count=2) == (D(2026, 12, 30), D(2027, 1, 29))
+    # 2026-02-15 일요일 (설 연휴 직전) -> 02-13
+    assert dc.next_ex_dates("매월 15일(영업일 기준)", D(2026, 2, 1), count=1) == (D(2026, 2, 13),)
+    # NYSE: 2026-05-25 Memorial Day 는 KRX 영업일이지만 NYSE 휴장
+    assert dc.next_ex_dates("매월 25일(영업일)", D(2026, 5, 1), count=1, market='NYSE') == (D(2026, 5, 22),)
+    assert dc.next_ex_dates("매월 25일(영업일)", D(2026, 5, 1), count=1, market='KRX') == (D(2026, 5, 22),)  # 05-25 대체공휴일
+    # 영업일 기준 월초 -> 그 달 첫 영업일 (2026-03-01 일요일, 03-02 대체공휴일)
+    assert dc.next_ex_dates("매월 초 (영업일)", D(2026, 3, 1), count=1) == (D(2026, 3, 3),)
+
+
+def test_next_ex_dates_counts_and_fixed_dates():
+    dates = dc.next_ex_dates("매월 15일", D(2026, 10, 16), count=12)
+    assert len(dates) == 12 and dates[0] == D(2026, 11, 15) and dates[-1] == D(2027, 10, 15)
+    assert dc.next_ex_dates("2026-03-15", D(2026, 1, 1)) == (D(2026, 3, 15),)
+    assert dc.next_ex_dates("2026-03-15", D(2026, 4, 1)) == ()
+    assert dc.next_ex_date("2026-03-15", D(2026, 4, 1)) == D(2026, 3, 15)  # 지난 특정일도 그 날짜
+    assert dc.next_ex_dates("-", D(2026, 4, 1)) == ()
+
+
+def test_normalize_calendar_adds_structured_columns():
+    df = pd.DataFrame({'배당락일': ["매월 15일(영업일 기준)", "매월 마지막영업일", None], '분류': ['국내', '해외', '국내']})
+    out = dc.normalize_calendar(df, today=D(2026, 5, 1))
+    assert out['배당규칙'].tolist() == [dc.RULE_DAY, dc.RULE_MONTH_END, dc.RULE_UNKNOWN]
+    assert out['배당시기'].tolist() == ['mid', 'end', 'unknown']
+    assert out['영업일기준'].tolist() == [True, True, False]
+    assert out['배당락일목록'][0][0] == D(2026, 5, 15)
+    assert out['배당락일목록'][1][0] == D(2026, 5, 29)   # NYSE: 05-29 금요일
+    assert out['배당락일목록'][2] == ()
@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+import constants as C
+import logic
+
+
+def test_same_fingerprint_compares_date_and_amount():
+    fp = {'date': '2026-03-31', 'amount': '65', 'etag': 'x'}
+    assert logic._same_fingerprint(fp, {'date': '2026-03-31', 'amount': '65'})
+    assert not logic._same_fingerprint(fp, {'date': '2026-04-30', 'amount': '65'})
+    assert not logic._same_fingerprint(fp, {'date': '2026-03-31', 'amount': '70'})
+    assert not logic._same_fingerprint(None, fp)
+    assert not logic._same_fingerprint(fp, None)
+
+
+@pytest.fixture
+def update_env(monkeypatch):
+    """
+    국내 A(변경 없음) / B(새 지급) / C(304 Not Modified) + 해외 X(변경 없음) / Y(새 지급)
+    """
+    df = pd.DataFrame({
+        '종목명': ['A', 'B', 'C', 'X', 'Y'],
+        '종목코드': ['A', 'B', 'C', 'X', 'Y'],
+        '분류': ['국내', '국내', '국내', '해외', '해외'],
+        '신규상장개월수': [0] * 5,
+        '연배당금_크롤링_auto': [0.0] * 5,
+    })
+    saved = {
+        'A': {'date': '2026-03-31', 'amount': '65', 'etag': 'a1'},
+        'B': {'date': '2026-02-27', 'amount': '60', 'etag': 'b1'},
+        'C': {'date': '2026-03-31', 'amount': '50', 'etag': 'c1'},
+        'X': {'date': '2026-03-20', 'amount': '0.250000'},
+        'Y': {'date': '2026-02-20', 'amount': '0.300000'},
+    }
+    domestic_probe = {
+        'A': {'date': '2026-03-31', 'amount': '65', 'etag': 'a2'},
+        'B': {'date': '2026-03-31', 'amount': '62', 'etag': 'b2'},
+        'C': {'not_modified': True},
+    }
+    overseas_probe = {'X': {'date': '2026-03-20', 'amount': '0.250000'}, 'Y': {'date': '2026-03-20', 'amount': '0.310000'}}
+    sensed = []
+
+    monkeypatch.setattr(logic, 'load_stock_data_from_csv', lambda: df.copy())
+    monkeypatch.setattr(logic, '_load_fingerprints', lambda: {k: dict(v) for k, v in saved.items()})
+    monkeypatch.setattr(logic, '_probe_domestic_fingerprint', lambda code, etag=None: domestic_probe[code])
+    monkeypatch.setattr(logic, '_probe_overseas_fingerprints', lambda codes: {c: overseas_probe[c] for c in codes})
+    monkeypatch.setattr(logic, '_fetch_domestic_sensor', lambda code: sensed.append(code) or (744.0, 7.5))
+    monkeypatch.setattr(logic, '_fetch_overseas_sensor', lambda code: sensed.append(code) or (3.7, 6.1))
+    monkeypatch.setattr(logic, '_save_fingerprints', lambda fp: pytest.fail("지문은 CSV 저장 후에만 기록"))
+    monkeypatch.setattr(C, 'SENSOR_MIN_INTERVAL', {'국내': 0.0, '해외': 0.0})
+    return saved, sensed
+
+
+def test_incremental_update_only_crawls_tickers_with_new_payments(update_env):
+    saved, sensed = update_env
+    success, msg, failed, df, fingerprints = logic.smart_update_and_save(incremental=True)
+
+    assert success and failed == []
+    assert sorted(sensed) == ['B', 'Y']
+    assert '변경없음:3' in msg and '성공:2' in msg
+    assert fingerprints['B']['amount'] == '62' and fingerprints['Y']['amount'] == '0.310000'
+    assert fingerprints['A'] == saved['A'] and fingerprints['C'] == saved['C'] and fingerprints['X'] == saved['X']
+    updated = df.set_index('종목코드')['연배당금_크롤링_auto']
+    assert updated['B'] == 744.0 and updated['Y'] == 3.7 and updated['A'] == 0.0
+
+
+def test_full_update_crawls_everything_and_returns_no_fingerprints(update_env):
+    _, sensed = update_env
+    success, msg, _, _, fingerprints = logic.smart_update_and_save(incremental=False)
+    assert success and fingerprints is None
+    assert sorted(sensed) == ['A', 'B', 'C', 'X', 'Y']
+
+
+def test_failed_sensor_does_not_record_a_fingerprint(update_env, monkeypatch):
+    monkeypatch.setattr(logic, '_fetch_domestic_sensor', lambda code: (0.0, 0.0))
+    _, _, failed, _, fingerprints = logic.smart_update_and_save(incremental=True)
+    assert failed == ['B']
+    assert fingerprints['B']['amount'] == '60'                # 다음 증분 갱신에서 다시 조회
+
+
+def test_fingerprints_are_saved_only_after_a_successful_csv_save(monkeypatch):
+    written = []
+    monkeypatch.setattr(logic, '_save_fingerprints', written.append)
+
+    monkeypatch.setattr(logic, 'save_to_github', lambda df: (False, "❌ 저장 실패"))
+    assert logic.save_smart_update(pd.DataFrame(), {'A': {}}) == (False, "❌ 저장 실패")
+    assert written == []
+
+    monkeypatch.setattr(logic, 'save_to_github', lambda df: (True, "✅ 깃허브 저장 성공!"))
+    logic.save_smart_update(pd.DataFrame(), {'A': {}})
+    logic.save_smart_update(pd.DataFrame(), None)
+    assert written == [{'A': {}}]
+
+
+def test_empty_csv_returns_five_values(monkeypatch):
+    monkeypatch.setattr(logic, 'load_stock_data_from_csv', pd.DataFrame)
+    assert logic.smart_update_and_save() == (False, "❌ CSV 파일을 찾을 수 없습니다.", [], None, None)
@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+import constants as C
+import portfolio_metrics as pm
+import universe
+
+
+def _processed():
+    return universe.to_universe(pd.DataFrame({
+        'pure_name': ['KODEX 배당', 'SCHD', 'TIGER 리츠', 'JEPI'],
+        '분류': ['국내', '해외', '국내', '해외'],
+        '연배당률': [6.0, 3.5, 8.0, 7.5],
+        '배당시기': ['end', 'mid', 'early', 'unknown'],
+    }))
+
+
+def _naive(df, weights, total_invest, monthly_expense):
+    """종목별 반복 계산 (커널 도입 전 계산기 방식)"""
+    rows = df.set_index('pure_name')
+    gross = {n: total_invest * w / 100 * float(rows.loc[n, '연배당률']) / 100 for n, w in weights.items() if n in rows.index}
+    timing = dict.fromkeys(pm.TIMING_LABELS, 0.0)
+    label = {'early': 0, 'mid': 1, 'end': 2, 'unknown': 1}
+    for n, g in gross.items():
+        timing[pm.TIMING_LABELS[label[str(rows.loc[n, '배당시기'])]]] += g * C.AFTER_TAX_RATIO
+    total_y_net = sum(gross.values()) * C.AFTER_TAX_RATIO
+    return {
+        'avg_yield': sum(w * float(rows.loc[n, '연배당률']) for n, w in weights.items() if n in rows.index) / 100,
+        'total_m_net': total_y_net / 12,
+        'coverage': total_y_net / 12 / (monthly_expense * 10000),
+        'timing_data': timing,
+    }
+
+
+def test_metrics_match_naive_per_stock_sum():
+    df = _processed()
+    weights = {'KODEX 배당': 40, 'SCHD': 30, 'TIGER 리츠': 20, 'JEPI': 10, '없는 종목': 50}
+    got = pm.portfolio_metrics(df, weights, 100_000_000, 300)
+    want = _naive(df, weights, 100_000_000, 300)
+    assert got.avg_yield == pytest.approx(want['avg_yield'], rel=1e-6)
+    assert got.total_m_net == pytest.approx(want['total_m_net'], rel=1e-6)
+    assert got.coverage == pytest.approx(want['coverage'], rel=1e-6)
+    assert got.timing_data == pytest.approx(want['timing_data'], rel=1e-6)
+
+
+def test_memo_hits_across_copies_with_the_same_content():
+    df = _processed()
+    first = pm.portfolio_metrics(df, {'SCHD': 50, 'JEPI': 50}, 10_000_000)
+    assert pm.portfolio_metrics(df.copy(), {'JEPI': 50, 'SCHD': 50}, 10_000_000) is first
+
+
+def test_memo_is_invalidated_when_the_content_changes():
+    df = _processed()
+    before = pm.portfolio_metrics(df, {'SCHD': 50, 'JEPI': 50}, 10_000_000)
+
+    changed = df.copy()
+    changed.loc[changed['pure_name'] == 'SCHD', '연배당률'] = 4.5
+    after = pm.portfolio_metrics(changed, {'SCHD': 50, 'JEPI': 50}, 10_000_000)
+    assert after.avg_yield == pytest.approx(before.avg_yield + 0.5)
+
+    moved = df.copy()
+    moved['배당시기'] = moved['배당시기'].cat.set_categories(universe.TIMING_DTYPE.categories)
+    moved.loc[moved['pure_name'] == 'SCHD', '배당시기'] = 'end'
+    timing = pm.portfolio_metrics(moved, {'SCHD': 50, 'JEPI': 50}, 10_000_000).timing_data
+    assert timing[pm.TIMING_LABELS[2]] > 0 and timing != before.timing_data
+
+
+def test_universe_token_follows_content():
+    a = _processed()
+    assert universe.get_index(a) is universe.get_index(a)
+    assert universe.get_index(a).token == universe.get_index(a.copy()).token
+    c = a.copy()
+    c.loc[0, '연배당률'] = 7.0
+    assert universe.get_index(c).token != universe.get_index(a).token
+
+
+
+def test_evaluate_batch_matches_single_metrics():
+    df = _processed()
+    portfolios = [
+        {'id': 1, 'ticker_data': {'total_money': 50_000_000, 'monthly_expense': 200, 'composition': {'KODEX 배당': 60, 'JEPI': 40}}},
+        {'id': 2, 'ticker_data': {'total_money': 0, 'composition': {}}},
+        {'id': 3, 'ticker_data': {'total_money': 10_000_000, 'monthly_expense': 100, 'composition': {'SCHD': 100, '상장폐지': 10}}},
+    ]
+    batch = pm.evaluate_batch(df, portfolios)
+    for p, summary in zip(portfolios, batch):
+        data = p['ticker_data']
+        one = pm.portfolio_metrics(df, data['composition'], data['total_money'], data.get('monthly_expense', 0))
+        assert summary['yield'] == pytest.approx(one.avg_yield)
+        assert summary['monthly_net'] == pytest.approx(one.total_m_net)
+        assert summary['coverage'] == pytest.approx(one.coverage)
+    assert [s['missing'] for s in batch] == [0, 0, 1]
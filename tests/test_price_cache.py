@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+import constants as C
+import price_cache
+
+A, B = ('A', '국내'), ('B', '해외')
+
+
+class _Fetcher:
+    def __init__(self, prices):
+        self.prices, self.calls = dict(prices), []
+
+    def __call__(self, items):
+        self.calls.append(list(items))
+        return {k: self.prices.get(k) for k in items}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(price_cache, 'get_price_ttl', lambda category, now=None: 100)
+    return price_cache.PriceCache()
+
+
+def _age(cache, key, seconds):
+    price, _ = cache._data[key]
+    cache._data[key] = (price, time.time() - seconds)
+
+
+def _wait_refresh(cache, timeout=2.0):
+    end = time.time() + timeout
+    while cache._refreshing and time.time() < end: time.sleep(0.01)
+    assert not cache._refreshing
+
+
+def test_missing_prices_are_fetched_once_and_then_served_from_cache(cache):
+    fetch = _Fetcher({A: 100, B: 20.5})
+    assert cache.get_prices([A, B, A], fetch) == {A: 100, B: 20.5}
+    assert cache.get_prices([A, B], fetch) == {A: 100, B: 20.5}
+    assert fetch.calls == [[A, B]]
+
+
+def test_stale_price_is_returned_immediately_and_refreshed_in_background(cache):
+    cache.get_prices([A], _Fetcher({A: 100}))
+    _age(cache, A, 101)
+
+    release = threading.Event()
+    fetch = _Fetcher({A: 110})
+    slow = lambda items: release.wait(2) and fetch(items)
+    assert cache.get_prices([A], slow) == {A: 100}    # 갱신이 끝나기 전에 오래된 값 먼저
+    release.set()
+    _wait_refresh(cache)
+    assert fetch.calls == [[A]]
+    assert cache.get_prices([A], fetch) == {A: 110}
+    assert fetch.calls == [[A]]                       # 갱신 후에는 다시 조회하지 않음
+
+
+def test_failed_fetch_is_retried_after_short_ttl(cache):
+    fetch = _Fetcher({})
+    assert cache.get_prices([A], fetch) == {A: None}
+    assert cache._split([A]) == ([], [])              # 재시도 간격 전에는 그대로
+    _age(cache, A, C.PRICE_TTL_FAILED + 1)
+    assert cache._split([A]) == ([], [A])             # 장 마감 TTL(100초)보다 먼저 다시 조회
+
+
+def test_failed_refresh_keeps_last_good_price(cache):
+    cache.get_prices([A], _Fetcher({A: 100}))
+    generation = cache.generation
+    _age(cache, A, 101)
+
+    cache.get_prices([A], _Fetcher({}))
+    _wait_refresh(cache)
+    assert cache.get_prices([A], _Fetcher({})) == {A: 100}
+    assert cache.generation == generation
+
+
+def test_generation_changes_only_when_a_price_changes(cache):
+    cache.get_prices([A], _Fetcher({A: 100}))
+    _, generation = cache.get_prices([A], _Fetcher({}), with_generation=True)
+
+    cache._store({A: 100})
+    assert cache.generation == generation
+    cache._store({A: 101})
+    assert cache.generation == generation + 1
+
+
+def test_seed_keeps_existing_prices_and_bumps_generation_only_on_insert(cache):
+    cache.get_prices([A], _Fetcher({A: 100}))
+    generation = cache.generation
+
+    cache.seed({A: 1}, time.time())
+    assert cache.generation == generation and cache._data[A][0] == 100
+    cache.seed({B: 2.0}, time.time())
+    assert cache.generation == generation + 1 and cache._data[B][0] == 2.0
+
+
+def test_market_aware_ttl():
+    import datetime
+    import pytz
+    seoul = pytz.timezone('Asia/Seoul')
+    open_time = seoul.localize(datetime.datetime(2026, 3, 4, 10, 0))    # 수요일 장중
+    closed_time = seoul.localize(datetime.datetime(2026, 3, 7, 10, 0))  # 토요일
+    assert price_cache.get_price_ttl('국내', open_time) == C.PRICE_TTL_MARKET_OPEN
+    assert price_cache.get_price_ttl('국내', closed_time) == C.PRICE_TTL_MARKET_CLOSED
+    assert price_cache.get_price_ttl('해외', open_time) == C.PRICE_TTL_MARKET_CLOSED  # 뉴욕은 밤 9시
@@ -0,0 +1,70 @@
+import logic
+
+
+class _Broker:
+    """한투 API 대역 (조회한 코드 기록)"""
+
+    def __init__(self, prices):
+        self.prices, self.calls = prices, []
+
+    def fetch_price(self, code):
+        self.calls.append(code)
+        price = self.prices.get(code)
+        return {'output': {'stck_prpr': str(price)}} if price else {'output': {}}
+
+
+def _patch_sources(monkeypatch, naver, yf, single=None):
+    calls = {'naver': [], 'yf': [], 'single': []}
+
+    def _naver(codes, chunk_size=40):
+        calls['naver'].append(list(codes))
+        return {c: naver[c] for c in codes if c in naver}
+
+    def _yf(tickers):
+        calls['yf'].append(list(tickers))
+        return {t: yf[t] for t in tickers if t in yf}
+
+    def _single(broker, code, category):
+        calls['single'].append(code)
+        return (single or {}).get(code)
+
+    monkeypatch.setattr(logic, '_fetch_naver_prices_bulk', _naver)
+    monkeypatch.setattr(logic, '_fetch_yf_prices_bulk', _yf)
+    monkeypatch.setattr(logic, 'get_safe_price', _single)
+    return calls
+
+
+def test_domestic_fallback_order_naver_then_kis_then_yfinance(monkeypatch):
+    calls = _patch_sources(monkeypatch, naver={'A': 100}, yf={'C.KS': 300.0})
+    broker = _Broker({'A': 999, 'B': 200})
+    items = [(c, '국내') for c in 'ABCD']
+
+    prices = logic.fetch_prices_batch(broker, items)
+
+    assert prices == {('A', '국내'): 100, ('B', '국내'): 200, ('C', '국내'): 300.0, ('D', '국내'): None}
+    assert calls['naver'] == [['A', 'B', 'C', 'D']]
+    assert sorted(broker.calls) == ['B', 'C', 'D']           # 네이버에서 받은 종목은 한투 조회 안 함
+    assert calls['yf'][0] == ['C.KS', 'D.KS']                # 한투에서도 없는 종목만 .KS 일괄
+    assert calls['single'] == []
+
+
+def test_domestic_skips_kis_without_broker(monkeypatch):
+    calls = _patch_sources(monkeypatch, naver={}, yf={'B.KS': 50.0})
+    prices = logic.fetch_prices_batch(None, [('A', '국내'), ('B', '국내')])
+    assert prices == {('A', '국내'): None, ('B', '국내'): 50.0}
+    assert calls['yf'][0] == ['A.KS', 'B.KS']
+
+
+def test_overseas_bulk_then_single_retry(monkeypatch):
+    calls = _patch_sources(monkeypatch, naver={}, yf={'SCHD': 27.5}, single={'JEPI': 57.0})
+    prices = logic.fetch_prices_batch(None, [('SCHD', '해외'), ('JEPI', '해외'), ('SCHD', '해외')])
+    assert prices == {('SCHD', '해외'): 27.5, ('JEPI', '해외'): 57.0}
+    assert calls['naver'] == [[]]
+    assert calls['yf'] == [['JEPI', 'SCHD']]                 # 중복 없이 1회 다운로드
+    assert calls['single'] == ['JEPI']                       # 일괄에서 빠진 종목만 개별 조회
+
+
+def test_same_code_in_both_markets_keeps_categories_apart(monkeypatch):
+    _patch_sources(monkeypatch, naver={'X': 10}, yf={'X': 20.0})
+    prices = logic.fetch_prices_batch(None, [('X', '국내'), ('X', '해외')])
+    assert prices == {('X', '국내'): 10, ('X', '해외'): 20.0}
@@ -0,0 +1,144 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import constants as C
+import simulation
+
+
+# --- 기존 월 단위 반복문 (벡터 엔진 도입 전 run_asset_simulation) ---
+
+def _old_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, apply_inflation):
+    monthly_yld = avg_y / 100 / 12
+    isa_bal = start_money if (is_isa and start_money <= C.ISA_TOTAL_CAP) else 0
+    general_bal = max(0, start_money - C.ISA_TOTAL_CAP) if is_isa else start_money
+    isa_principal, general_principal = isa_bal, general_bal
+    total_tax_paid_general = 0
+    sim_data = [{"년차": 0, "자산총액": (isa_bal + general_bal) / 10000, "총원금": (isa_principal + general_principal) / 10000, "실제월배당": 0}]
+    year_tracker, yearly_contribution = 0, 0
+
+    for m in range(1, years * 12 + 1):
+        if m // 12 > year_tracker:
+            yearly_contribution = 0
+            year_tracker = m // 12
+        if is_isa:
+            actual_isa_add = min(monthly_add, max(0, C.ISA_YEARLY_CAP - yearly_contribution), max(0, C.ISA_TOTAL_CAP - isa_principal))
+            isa_bal += actual_isa_add
+            isa_principal += actual_isa_add
+            yearly_contribution += actual_isa_add
+            general_bal += monthly_add - actual_isa_add
+            general_principal += monthly_add - actual_isa_add
+        else:
+            general_bal += monthly_add
+            general_principal += monthly_add
+        div_isa = isa_bal * monthly_yld
+        isa_bal += div_isa
+        div_gen = general_bal * monthly_yld
+        total_tax_paid_general += div_gen * C.TAX_RATE_GENERAL
+        general_bal += div_gen * (1 - C.TAX_RATE_GENERAL)
+        sim_data.append({"년차": m / 12, "자산총액": (isa_bal + general_bal) / 10000,
+                         "총원금": (isa_principal + general_principal) / 10000, "실제월배당": div_isa + div_gen})
+
+    final_asset = isa_bal + general_bal
+    monthly_div_final = sim_data[-1]['실제월배당']
+    if is_isa:
+        tax_isa = max(0, isa_bal - isa_principal - 200 * 10000) * C.TAX_RATE_ISA_OVER
+        real_money, monthly_pocket = final_asset - tax_isa, monthly_div_final
+        tax_msg = f"예상 세금 {tax_isa/10000:,.0f}만원 (9.9% 분리과세)"
+    else:
+        real_money, monthly_pocket = final_asset, monthly_div_final * C.AFTER_TAX_RATIO
+        tax_msg = f"기납부 세금 {total_tax_paid_general/10000:,.0f}만원 (15.4% 원천징수)"
+    if apply_inflation:
+        discount_rate = (1.0 + C.INFLATION_RATE) ** years
+        real_money, monthly_pocket = real_money / discount_rate, monthly_pocket / discount_rate
+    return {"df": pd.DataFrame(sim_data), "real_money": real_money, "final_principal": isa_principal + general_principal,
+            "monthly_pocket": monthly_pocket, "tax_msg": tax_msg, "general_bal": general_bal, "is_isa": is_isa}
+
+
+_ASSET_CASES = list(itertools.product(
+    [0, 30_000_000, 150_000_000],        # 시작 금액 (ISA 총 한도 초과 포함)
+    [0, 500_000, 2_000_000, 5_000_000],  # 월 적립 (연간 한도 초과 포함)
+    [1, 3, 10],
+    [0.0, 5.0, 12.5],
+    [True, False],
+))
+
+
+@pytest.mark.parametrize("start_money, monthly_add, years, avg_y, is_isa", _ASSET_CASES)
+def test_vectorized_asset_simulation_matches_monthly_loop(start_money, monthly_add, years, avg_y, is_isa):
+    for inflation in (False, True):
+        new = simulation.run_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, inflation)
+        old = _old_asset_simulation(start_money, monthly_add, years, avg_y, is_isa, inflation)
+        pd.testing.assert_frame_equal(new['df'], old['df'], check_dtype=False, rtol=1e-9)
+        for key in ('real_money', 'final_principal', 'monthly_pocket', 'general_bal'):
+            assert new[key] == pytest.approx(old[key], rel=1e-9, abs=1e-6), key
+        assert new['tax_msg'] == old['tax_msg'] and new['is_isa'] == old['is_isa']
+
+
+def test_simulate_paths_batches_conditions_like_single_runs():
+    starts = np.array([0, 30_000_000, 150_000_000, 80_000_000])
+    adds = np.array([2_000_000, 0, 500_000, 5_000_000])
+    ylds = np.array([5.0, 12.5, 0.0, 7.0])
+    isa = np.array([True, False, True, True])
+    batch = simulation.simulate_paths(starts, adds, 120, ylds, isa)
+    for i in range(len(starts)):
+        one = simulation.simulate_paths(starts[i], adds[i], 120, ylds[i], isa[i])
+        for key, arr in one.items():
+            if key == 'years': continue
+            np.testing.assert_allclose(batch[key][i], arr[0], rtol=1e-12)
+
+
+# --- 기존 목표 달성 반복문 (해석해 도입 전 calculate_goal_simulation, 월 적립 포함으로 확장) ---
+
+def _old_months_to_goal(start_balance, required_asset, monthly_rate, monthly_add=0.0, max_months=simulation.GOAL_MAX_MONTHS):
+    bal, months = start_balance, 0
+    if required_asset > 0 and bal < required_asset:
+        while months < max_months:
+            if bal >= required_asset: break
+            bal += bal * monthly_rate + monthly_add
+            months += 1
+    return months
+
+
+_GOAL_CASES = list(itertools.product(
+    [500_000, 1_000_000, 3_000_000, 10_000_000],  # 목표 월 배당
+    [0.0, 0.5, 3.0, 7.0, 12.0, 35.0],            # 배당률
+    [0, 10_000_000, 100_000_000, 2_000_000_000],  # 투자금 (이미 달성 포함)
+    [True, False],
+))
+
+
+@pytest.mark.parametrize("goal, avg_y, invest, use_start", _GOAL_CASES)
+def test_closed_form_goal_solver_matches_loop(goal, avg_y, invest, use_start):
+    res = simulation.calculate_goal_simulation(goal, avg_y, invest, use_start)
+    rate = avg_y / 100 / 12 * C.AFTER_TAX_RATIO
+    start = invest if use_start else 0
+    assert res['months_passed'] == _old_months_to_goal(start, res['required_asset'], rate)
+    assert res['is_impossible'] == (res['months_passed'] >= simulation.GOAL_MAX_MONTHS)
+
+
+def test_goal_solver_with_monthly_add_matches_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        start, required = rng.uniform(0, 5e8), rng.uniform(1e7, 2e9)
+        rate, add = rng.choice([0.0, rng.uniform(0, 0.03)]), rng.choice([0.0, rng.uniform(0, 5e6)])
+        assert simulation.solve_months_to_goal(start, required, rate, add) == _old_months_to_goal(start, required, rate, add)
+
+
+def test_goal_solver_is_exact_on_month_boundaries():
+    # 정확히 n개월째에 도달하는 목표는 n개월 (부동소수 오차로 n+1 이 되지 않음)
+    for n in (1, 12, 120, 600):
+        required = 1e8 * 1.005 ** n
+        assert simulation.solve_months_to_goal(1e8, required, 0.005) == n
+    assert simulation.solve_months_to_goal(0, 1e8, 0.0, 1e6) == 100
+
+
+def test_goal_simulation_accepts_target_arrays():
+    goals = np.array([500_000, 1_000_000, 3_000_000])
+    batch = simulation.calculate_goal_simulation(goals, 7.0, 100_000_000, True, 1_000_000)
+    for i, goal in enumerate(goals):
+        single = simulation.calculate_goal_simulation(goal, 7.0, 100_000_000, True, 1_000_000)
+        assert batch['months_passed'][i] == single['months_passed']
+        assert batch['required_asset'][i] == pytest.approx(single['required_asset'])
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import universe
+
+
+def _processed():
+    return pd.DataFrame({
+        'pure_name': ['KODEX 배당', 'SCHD', 'TIGER 리츠'],
+        '분류': ['국내', '해외', '국내'],
+        '현재가': [12345.0, 27.456, 5000.0],
+        '연배당금': [744.0, 1.0234, 420.0],
+        '연배당률': [6.03, 3.73, 8.4],
+        '신규상장개월수': [0.0, 0.0, 7.0],
+        '자산유형': ['📈 주식형', '📈 주식형', '🏢 리츠형'],
+        '배당시기': ['end', 'mid', 'early'],
+    })
+
+
+def test_to_universe_applies_compact_dtypes_and_keeps_values():
+    raw = _processed()
+    uni = universe.to_universe(raw)
+    assert uni['현재가'].dtype == np.float32 and uni['연배당률'].dtype == np.float32
+    assert uni['신규상장개월수'].dtype == np.int32
+    assert isinstance(uni['분류'].dtype, pd.CategoricalDtype) and isinstance(uni['자산유형'].dtype, pd.CategoricalDtype)
+    assert uni['배당시기'].dtype == universe.TIMING_DTYPE
+    np.testing.assert_allclose(uni['연배당률'], raw['연배당률'], rtol=1e-6)
+    assert uni['분류'].astype(str).tolist() == raw['분류'].tolist()
+    assert raw['현재가'].dtype == np.float64                  # 원본은 그대로
+
+
+def test_view_formats_money_by_market_without_touching_the_universe():
+    uni = universe.to_universe(_processed())
+    shown = universe.view(uni)
+    assert shown['현재가'].tolist() == ['12,345원', '$27.46', '5,000원']
+    assert shown['연배당금'].tolist() == ['744원', '$1.02', '420원']
+    assert uni['현재가'].dtype == np.float32                  # 계산용 유니버스는 숫자 유지
+
@@ -1,75 +1,27 @@
 import streamlit as st
-import re  # 정규식 모듈
+import portfolio_metrics  # 포트폴리오 지표 커널
 
 # ---------------------------------------------------------
-# 1. [순수 로직] 날짜 파싱 및 통계 계산 (UI 코드 없음)
+# 1. [순수 로직] 통계 계산 (UI 코드 없음)
 # ---------------------------------------------------------
-def _parse_day_from_string(date_str):
-    """문자열에서 날짜 숫자만 추출 (예: '매월 15일' -> 15)"""
-    if not isinstance(date_str, str): return 15
-    match = re.search(r'(\d+)', date_str)
-    if match:
-        day = int(match.group(1))
-        return min(day, 30)
-    if '말' in date_str or '마지막' in date_str:
-        return 30
-    return 15 
-
 def calculate_roadmap_stats(df, weights, total_invest, monthly_expense):
     """
-    생활비 방어율 및 배당 입금 타이밍 계산 로직
+    생활비 방어율 및 배당 입금 타이밍 계산 로직 (portfolio_metrics 커널 공용)
     Returns: (성공여부, 결과Dict)
     """
     if total_invest <= 0:
         return False, None
 
-    total_y_div = 0.0
-    timing_data = {"월초(1~10일)": 0.0, "월중(11~20일)": 0.0, "월말(21~말일)": 0.0}
-    
-    # 1. 종목별 배당금 계산
-    for stock, w in weights.items():
-        if w <= 0: continue
-        row_match = df[df['pure_name'] == stock]
-        if row_match.empty: continue
-        row = row_match.iloc[0]
-        
-        # 연배당금 계산 (세후)
-        raw_annual = total_invest * (w / 100) * (row['연배당률'] / 100)
-        net_annual = raw_annual * 0.846 
-        total_y_div += net_annual
-        
-        # 입금 시기 분석
-        ex_date_str = str(row.get('배당락일', '15일'))
-        day_num = _parse_day_from_string(ex_date_str)
-        
-        if day_num <= 10:
-            timing_data["월초(1~10일)"] += net_annual
-        elif day_num >= 21:
-            timing_data["월말(21~말일)"] += net_annual
-        else:
-            timing_data["월중(11~20일)"] += net_annual
-            
-    # 2. 통계 집계
-    total_m_div = total_y_div / 12
-    avg_yield = (total_y_div / total_invest * 100) if total_invest > 0 else 0
-    user_expense_real = monthly_expense * 10000 
-    
-    coverage = (total_m_div / user_expense_real) if user_expense_real > 0 else 0
-    gap = user_expense_real - total_m_div
-    
-    needed_capital = 0
-    if gap > 0 and avg_yield > 0:
-        needed_capital = (gap * 12) / (avg_yield / 100)
-
+    m = portfolio_metrics.portfolio_metrics(df, weights, total_invest, monthly_expense)
     return True, {
-        "total_y_div": total_y_div,
-        "total_m_div": total_m_div,
-        "avg_yield": avg_yield,
-        "timing_data": timing_data,
-        "coverage": coverage,
-        "gap": gap,
-        "needed_capital": needed_capital,
-        "user_expense_real": user_expense_real
+        "total_y_div": m.total_y_net,
+        "total_m_div": m.total_m_net,
+        "avg_yield": m.net_yield,
+        "timing_data": m.timing_data,
+        "coverage": m.coverage,
+        "gap": m.gap,
+        "needed_capital": m.needed_capital,
+        "user_expense_real": m.user_expense_real
     }
 
 # ---------------------------------------------------------
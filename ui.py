@@ -2,6 +2,7 @@ import streamlit as st
 import html
 import re
 import pandas as pd
+import universe
 # ---------------------------------------------------------
 # [SECTION] UI 렌더링 모듈 (CSS 내장형 - 파일 로드 문제 원천 차단)
 # ---------------------------------------------------------
@@ -142,6 +143,7 @@ def render_custom_table(data_frame, key_suffix="default"):
     if data_frame.empty:
         st.info("📭 표시할 데이터가 없습니다.")
         return
+    data_frame = universe.view(data_frame)  # 금액 -> 통화 문자열 (표시 단계에서만)
 
     # 1. 보기 모드 선택
     view_mode = st.radio(
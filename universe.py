@@ -0,0 +1,144 @@
+"""
+프로젝트: 배당 팽이 (Dividend Top)
+파일명: universe.py
+설명: 종목 유니버스 타입 정의 (수치는 float32/int32, 반복 문자열은 범주형, 표시용 문자열은 view 단계에서만 생성)
+"""
+
+import weakref
+import threading
+import numpy as np
+import pandas as pd
+import dividend_calendar
+
+# =============================================================================
+# [SECTION 1] 컬럼 타입
+# =============================================================================
+
+FLOAT_COLS = ['현재가', '연배당금', '연배당률']      # 현재가/연배당금: 국내는 원, 해외는 달러
+INT_COLS = ['신규상장개월수', '배당일']
+CATEGORY_COLS = ['분류', '유형', '자산유형', '환구분', '배당규칙']
+TIMING_DTYPE = pd.CategoricalDtype(['early', 'mid', 'end', 'unknown'])  # 배당시기 (값 고정)
+
+def to_universe(df):
+    """가공 데이터 -> 타입 지정 유니버스 (없는 컬럼은 건너뜀)"""
+    if df.empty: return df
+
+    types = {}
+    for c in FLOAT_COLS:
+        if c in df.columns: types[c] = np.float32
+    for c in INT_COLS:
+        if c in df.columns: types[c] = np.int32
+    for c in CATEGORY_COLS:
+        if c in df.columns: types[c] = 'category'
+    if '배당시기' in df.columns: types['배당시기'] = TIMING_DTYPE
+    return df.astype(types)
+
+
+# =============================================================================
+# [SECTION 2] 표시용 변환 (view)
+# =============================================================================
+
+def format_money(value, category='국내'):
+    """금액 표시 (국내: 원 단위 정수, 해외: 달러 소수 2자리)"""
+    try: value = float(value)
+    except (TypeError, ValueError): return str(value)
+    return f"{int(value):,}원" if category == '국내' else f"${value:.2f}"
+
+def view(df):
+    """화면 표시용 사본 (현재가/연배당금 -> 통화 문자열)"""
+    if df.empty: return df
+    out = df.copy()
+    categories = out['분류'].astype(str) if '분류' in out.columns else pd.Series('국내', index=out.index)
+    for c in ['현재가', '연배당금']:
+        if c in out.columns:
+            out[c] = [format_money(v, cat) for v, cat in zip(out[c], categories)]
+    return out
+
+
+# =============================================================================
+# [SECTION 3] 조회 인덱스 (pure_name / 코드 / 검색라벨 -> 행 위치)
+# =============================================================================
+
+class UniverseIndex:
+    """
+    가공 데이터 1개당 1회 생성하는 조회 인덱스
+    - 키 -> 행 위치 해시 (같은 키가 여러 행이면 첫 행, df[df[...] == key].iloc[0]과 동일)
+    - 연배당률/해외 여부/배당시기 코드는 행 위치로 바로 읽는 NumPy 배열
+    * 원본 DataFrame은 약한 참조로만 보관 (인덱스가 데이터 수명을 늘리지 않음)
+    """
+
+    def __init__(self, df):
+        self._df = weakref.ref(df)
+        self._by_name = self._positions(df, 'pure_name')
+        self._by_code = self._positions(df, '코드')
+        self._by_label = self._positions(df, '검색라벨')
+        self.yields = df['연배당률'].to_numpy(np.float64) if '연배당률' in df.columns else np.zeros(len(df))
+        self.is_foreign = (df['분류'].astype(str) == '해외').to_numpy() if '분류' in df.columns else np.zeros(len(df), bool)
+        self.timing = self._timing_codes(df)
+        # 내용 지문 (같은 종목 배치/배당률/시기면 DataFrame 객체가 달라도 같은 값 -> 결과 메모 키)
+        self.token = hash((tuple(self._by_name.items()), self.yields.tobytes(), self.timing.tobytes()))
+
+    @staticmethod
+    def _timing_codes(df):
+        """배당시기 -> TIMING_DTYPE 범주 코드 (0: early, 1: mid, 2: end, 3: unknown)"""
+        if '배당시기' in df.columns: timing = df['배당시기']
+        elif '배당락일' in df.columns: timing = df['배당락일'].map(dividend_calendar.lookup_timing)
+        else: return np.full(len(df), 3, dtype=np.int8)
+        codes = {c: i for i, c in enumerate(TIMING_DTYPE.categories)}
+        return timing.astype(str).map(codes).fillna(codes['unknown']).to_numpy(np.int8)
+
+    @staticmethod
+    def _positions(df, col):
+        if col not in df.columns: return {}
+        keys = df[col].tolist()
+        return {k: i for i, k in reversed(list(enumerate(keys)))}
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def pos(self, name):
+        """pure_name -> 행 위치 (없으면 None)"""
+        return self._by_name.get(name)
+
+    def positions(self, names):
+        """pure_name 목록 -> 행 위치 배열 (없는 종목은 제외)"""
+        return np.array([self._by_name[n] for n in names if n in self._by_name], dtype=np.intp)
+
+    def _row(self, pos):
+        df = self._df()
+        return None if pos is None or df is None else df.iloc[pos]
+
+    def row(self, name):
+        """pure_name -> 행 (없으면 None)"""
+        return self._row(self._by_name.get(name))
+
+    def row_by_code(self, code):
+        return self._row(self._by_code.get(code))
+
+    def row_by_label(self, label):
+        return self._row(self._by_label.get(label))
+
+    def yield_of(self, name, default=0.0):
+        """pure_name -> 연배당률"""
+        pos = self._by_name.get(name)
+        return float(self.yields[pos]) if pos is not None else default
+
+    def foreign(self, name):
+        """해외 상장 여부"""
+        pos = self._by_name.get(name)
+        return bool(self.is_foreign[pos]) if pos is not None else False
+
+_indexes = {}  # {id(df): UniverseIndex} (df가 사라지면 자동 삭제)
+_index_lock = threading.Lock()
+
+def get_index(df):
+    """가공 데이터별 조회 인덱스 (같은 DataFrame이면 재사용)"""
+    key = id(df)
+    with _index_lock:
+        index = _indexes.get(key)
+        if index is not None and index._df() is df: return index
+
+        index = UniverseIndex(df)
+        _indexes[key] = index
+        weakref.finalize(df, _indexes.pop, key, None)
+        return index